@@ -1,4 +1,5 @@
-import json
+import orjson
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 
 class NotificationConsumer(AsyncWebsocketConsumer):
@@ -23,11 +24,47 @@ class NotificationConsumer(AsyncWebsocketConsumer):
 
     async def receive(self, text_data):
         # Just log received data if any
-        data = json.loads(text_data)
+        data = orjson.loads(text_data)
         print("Client said:", data)
 
     async def send_notification(self, event):
         # Send actual notification to client
-        await self.send(text_data=json.dumps({
-            'message': event['message']
-        }))
+        message = {'message': event['message']}
+        # Structured events (e.g. export progress) carry a name and data
+        if event.get('event'):
+            message.update(event=event['event'], data=event.get('data'))
+        await self.send(text_data=orjson.dumps(message).decode())
+
+
+class RollCallConsumer(AsyncWebsocketConsumer):
+    """
+    Pushes roll-call deltas (changed entry and counts) to every device on a
+    roll call. Only users who may run roll calls (any authenticated user, as
+    for the REST endpoints) can join: connect with ``?token=<JWT access token>``.
+    """
+    group_name = None
+
+    async def connect(self):
+        roll_call_id = int(self.scope['url_route']['kwargs']['roll_call_id'])
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated or not await self._roll_call_exists(roll_call_id):
+            await self.close()
+            return
+        self.group_name = f"rollcall_{roll_call_id}"
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    @database_sync_to_async
+    def _roll_call_exists(self, roll_call_id):
+        from visitors.models import RollCall
+
+        return RollCall.objects.filter(pk=roll_call_id).exists()
+
+    async def roll_call_delta(self, event):
+        await self.send(text_data=orjson.dumps(
+            {key: value for key, value in event.items() if key != 'type'}
+        ).decode())
@@ -0,0 +1,32 @@
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+
+
+@database_sync_to_async
+def _user_for_token(raw_token):
+    from django.contrib.auth.models import AnonymousUser
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Authenticates WebSocket connections with the API's JWT access token,
+    passed as ``?token=<access token>`` (browsers cannot set headers on a
+    WebSocket). Sets ``scope['user']``; without a token the session user
+    from ``AuthMiddlewareStack`` is kept.
+    """
+
+    async def __call__(self, scope, receive, send):
+        token = parse_qs(scope.get('query_string', b'').decode()).get('token')
+        if token:
+            scope = dict(scope, user=await _user_for_token(token[0]))
+        return await super().__call__(scope, receive, send)
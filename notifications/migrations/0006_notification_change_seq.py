@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 00:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_alter_notification_options_notification_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False, verbose_name='Change Sequence'),
+        ),
+    ]
@@ -1,7 +1,7 @@
 from django.db import models
-from visitors.models import CustomUser, Visitor
+from visitors.models import ChangeTracked, CustomUser, Visitor
 
-class Notification(models.Model):
+class Notification(ChangeTracked):
     # Recipient can be either staff or visitor
     staff = models.ForeignKey(
         CustomUser,
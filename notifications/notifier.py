@@ -11,7 +11,8 @@ from django.utils import timezone
 import logging
 from django.core.mail import send_mail
 import requests
-from visitors.models import Visitor, CustomUser, VisitorLog
+from visitors.audit import audit_log
+from visitors.models import Visitor, CustomUser
 from visitors.serializers import VisitorSerializer
 from visitors.permissions import IsAdminUser, IsReceptionistUser
 from asgiref.sync import async_to_sync
@@ -285,10 +286,11 @@ class NotificationViewSet(GenericViewSet):
 
         # Log the notification event
         if visitor:
-            VisitorLog.objects.create(
+            audit_log.log(
                 visitor=visitor,
                 action='NOTIFICATION_SENT',
-                details=f"Notification via {', '.join(channels)}: {message}",
+                channel=channels[0] if len(channels) == 1 else None,
+                payload={'channels': list(channels), 'message': message},
                 user=request.user
             )
 
@@ -329,9 +331,10 @@ class NotificationViewSet(GenericViewSet):
                 trigger_pusher_notification(channel, event, enhanced_data)
 
             # Log the manual notification
-            VisitorLog.objects.create(
+            audit_log.log(
                 action='MANUAL_NOTIFICATION',
-                details=f"Manual notification to {channel}: {data.get('message')}",
+                channel='pusher',
+                payload={'target': channel, 'event': event, 'message': data.get('message')},
                 user=request.user
             )
 
@@ -400,9 +403,9 @@ class NotificationViewSet(GenericViewSet):
                 results.append(result)
 
             # Log bulk notification
-            VisitorLog.objects.create(
+            audit_log.log(
                 action='BULK_NOTIFICATION',
-                details=f"Bulk notification to {len(users)} users",
+                payload={'recipients': len(users)},
                 user=request.user
             )
 
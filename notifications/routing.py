@@ -3,4 +3,5 @@ from . import consumers
 
 websocket_urlpatterns = [
     re_path(r'^ws/notifications/(?P<user_id>\d+)/$', consumers.NotificationConsumer.as_asgi()),
+    re_path(r'^ws/rollcall/(?P<roll_call_id>\d+)/$', consumers.RollCallConsumer.as_asgi()),
 ]
@@ -3,14 +3,17 @@ from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 import notifications.routing  # Make sure this file exists
+from notifications.middleware import JWTAuthMiddleware
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')  # or your actual settings module
 
 application = ProtocolTypeRouter({
     "http": get_asgi_application(),
     "websocket": AuthMiddlewareStack(
-        URLRouter(
-            notifications.routing.websocket_urlpatterns
+        JWTAuthMiddleware(
+            URLRouter(
+                notifications.routing.websocket_urlpatterns
+            )
         )
     ),
 })
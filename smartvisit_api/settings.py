@@ -82,6 +82,17 @@ DATABASES = {
     }
 }
 
+# Shared by every worker process: the generation counters behind the cached
+# host directory, form schema, kiosk bundle and visitor settings live here,
+# so a per-process cache would leave other workers serving stale copies.
+# The table is created by the visitors 0034 migration (or createcachetable).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+    }
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -116,6 +127,18 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Immutable columnar segments written by `manage.py archive_visits`
+VISIT_ARCHIVE_ROOT = os.path.join(BASE_DIR, 'archive')
+
+# Visitor log entries past retention, written by `manage.py archive_visitor_logs`
+VISITOR_LOG_ARCHIVE_ROOT = os.path.join(VISIT_ARCHIVE_ROOT, 'log-segments')
+VISITOR_LOG_RETENTION_DAYS = 365
+
+# Per-branch emergency roll call (JSON + PDF), rebuilt in the background this
+# many seconds after a check-in/out so bursts coalesce
+EMERGENCY_SNAPSHOT_ROOT = os.path.join(BASE_DIR, 'emergency')
+EMERGENCY_SNAPSHOT_DELAY = 0.5
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # CORS
@@ -131,8 +154,56 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    # orjson-backed JSON by default; MessagePack only when a client asks for it
+    'DEFAULT_RENDERER_CLASSES': (
+        'visitors.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'visitors.renderers.MessagePackRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'visitors.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'visitors.parsers.MessagePackParser',
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        'kiosk_lookup': '20/min',
+        'kiosk_sync': '30/min',
+    },
 }
 
+# Returning-visitor lookup keys: national phone numbers are stored in E.164
+# with this country code, and ID numbers are stored as a keyed hash
+DEFAULT_PHONE_COUNTRY_CODE = '254'
+VISITOR_ID_HASH_KEY = os.environ.get('VISITOR_ID_HASH_KEY', SECRET_KEY)
+
+# Public landing page statistics are served from a periodically refreshed snapshot
+LANDING_STATS_REFRESH_SECONDS = 60
+LANDING_STATS_CACHE_CONTROL = 'public, max-age=30, stale-while-revalidate=300'
+
+# Ad-hoc analytics run against an in-memory columnar snapshot of visitors
+ANALYTICS_FRAME_REFRESH_SECONDS = 300
+
+# Delta sync keeps deletion tombstones this long; older cursors must resync
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+
+# Audit log entries are queued and bulk-written every interval (seconds) or batch
+AUDIT_LOG_FLUSH_INTERVAL = 0.5
+AUDIT_LOG_BATCH_SIZE = 200
+AUDIT_LOG_MAX_PENDING = 10000
+
+# CSV exports read and stream this many visitors at a time
+VISITOR_EXPORT_CHUNK_SIZE = 2000
+
+# Background export jobs: run on a thread in the web process (set False when
+# `manage.py run_export_jobs` runs as a separate worker); signed download
+# links expire after EXPORT_DOWNLOAD_TTL seconds
+EXPORT_JOBS_IN_PROCESS = True
+EXPORT_DOWNLOAD_TTL = 3600
+# Finished export files; outside MEDIA_ROOT so they are only reachable
+# through the signed download view
+EXPORT_ROOT = os.path.join(BASE_DIR, 'exports')
+
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels.layers.InMemoryChannelLayer",  # 👈 Dev only (no Redis required)
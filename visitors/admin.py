@@ -3,13 +3,17 @@ from django.contrib.auth.admin import UserAdmin
 from .models import (
     Branch,
     CustomUser,
+    ExportJob,
+    RollCall,
     Visitor,
     VisitorLog,
     FormField,
     VisitorSetting,
     Blacklist,
     UserProfile,
-    
+    VisitDurationSketch,
+    Company,
+    HostVisitStats,
 )
 
 # --- Custom User Admin ---
@@ -52,6 +56,20 @@ class VisitorLogAdmin(admin.ModelAdmin):
     list_filter = ('action',)
     search_fields = ('visitor__first_name', 'visitor__last_name')
 
+# --- Export Job Admin ---
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'format', 'status', 'rows_written', 'rows_total', 'created_by', 'created_at')
+    list_filter = ('status', 'format')
+    readonly_fields = ('fingerprint', 'data_version', 'started_at', 'finished_at')
+
+# --- Roll Call Admin ---
+@admin.register(RollCall)
+class RollCallAdmin(admin.ModelAdmin):
+    list_display = ('id', 'branch', 'status', 'accounted', 'total', 'started_at', 'closed_at')
+    list_filter = ('status', 'branch')
+    readonly_fields = ('total', 'accounted', 'version')
+
 # --- Form Field Admin ---
 @admin.register(FormField)
 class FormFieldAdmin(admin.ModelAdmin):
@@ -87,6 +105,27 @@ class BranchAdmin(admin.ModelAdmin):
     search_fields = ('name', 'address')
     list_filter = ('is_active',)
 
+# --- Visit Duration Sketch Admin ---
+@admin.register(VisitDurationSketch)
+class VisitDurationSketchAdmin(admin.ModelAdmin):
+    list_display = ('day', 'branch', 'host', 'visitor_type', 'count', 'updated_at')
+    list_filter = ('visitor_type', 'branch')
+    date_hierarchy = 'day'
+    readonly_fields = ('sketch',)
+
+# --- Company Admin ---
+@admin.register(Company)
+class CompanyAdmin(admin.ModelAdmin):
+    list_display = ('name', 'normalized_name', 'visit_count', 'last_visit_at')
+    search_fields = ('name', 'normalized_name')
+    readonly_fields = ('visit_count', 'last_visit_at')
+
+# --- Host Visit Stats Admin ---
+@admin.register(HostVisitStats)
+class HostVisitStatsAdmin(admin.ModelAdmin):
+    list_display = ('host', 'visit_count', 'last_visit_at')
+    readonly_fields = ('visit_count', 'last_visit_at')
+
 # # --- Notification Admin ---
 # @admin.register(Notification)
 # class NotificationAdmin(admin.ModelAdmin):
@@ -0,0 +1,159 @@
+"""
+Buffered audit log writer.
+
+``audit_log.log(...)`` queues a ``VisitorLog`` row in memory instead of
+inserting it. A daemon thread writes the queue with one ``bulk_create``
+every ``AUDIT_LOG_FLUSH_INTERVAL`` seconds, or as soon as
+``AUDIT_LOG_BATCH_SIZE`` entries are waiting, so a burst of check-ins
+costs one insert and one fsync instead of one each.
+
+An entry logged inside a transaction is only queued when that transaction
+commits, so a rolled-back check-in leaves no audit row. The timestamp is
+taken when the event is logged, not when it is written.
+
+Loss is bounded: the queue holds at most ``AUDIT_LOG_MAX_PENDING`` entries
+(the oldest are dropped, with a warning, past that), and the queue is
+flushed at interpreter exit. A process killed outright loses at most the
+last flush interval's entries.
+"""
+import atexit
+import logging
+import threading
+from collections import deque
+from functools import partial
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogWriter:
+    def __init__(self, flush_interval, batch_size, max_pending, buffered=True):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.buffered = buffered
+        self.dropped = 0
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._stopping = False
+
+    def log(self, action, visitor=None, user=None, device_id=None, branch_id=None, channel=None,
+            payload=None, details=None):
+        """
+        Records an audit entry; written after the current transaction commits.
+        ``payload`` holds the event's structured data (JSON-serialisable);
+        device, branch (the visitor's by default) and channel are stored in
+        indexed columns. Display text is rendered from them when read.
+        """
+        from .models import VisitorLog
+
+        if user is not None and not user.is_authenticated:
+            user = None
+        entry = VisitorLog(
+            visitor=visitor,
+            action=action,
+            details=details,
+            payload=payload or {},
+            device_id=device_id or None,
+            branch_id=branch_id if branch_id is not None else getattr(visitor, 'branch_id', None),
+            channel=channel or None,
+            user=user,
+            timestamp=timezone.now(),
+        )
+        transaction.on_commit(partial(self._enqueue, entry))
+
+    def _enqueue(self, entry):
+        if not self.buffered:
+            self._write([entry])
+            return
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 1000 == 0:
+                    logger.warning("Audit log queue full; %s entries dropped so far", self.dropped)
+            self._pending.append(entry)
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+        self.start()
+
+    def flush(self):
+        """Writes every queued entry now; returns how many were written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [
+                        self._pending.popleft()
+                        for _ in range(min(self.batch_size, len(self._pending)))
+                    ]
+                if not batch:
+                    return written
+                written += self._write(batch)
+
+    def _write(self, entries):
+        from .models import VisitorLog
+
+        try:
+            with transaction.atomic():
+                VisitorLog.objects.bulk_create(VisitorLog.stamp_change_seqs(entries))
+            return len(entries)
+        except DatabaseError:
+            logger.exception("Bulk audit log write failed; writing entries one by one")
+
+        # One bad row (e.g. its visitor was deleted meanwhile) must not lose the batch
+        written = 0
+        for entry in entries:
+            entry.pk = None
+            try:
+                entry.save()
+                written += 1
+            except DatabaseError:
+                logger.exception("Dropping audit log entry %s: %s", entry.action, entry.payload)
+        return written
+
+    def start(self):
+        if self._stopping or (self._thread is not None and self._thread.is_alive()):
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+            self._thread.start()
+
+    def shutdown(self, timeout=5):
+        """Stops the writer thread and flushes what is left."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush %s audit log entries at shutdown", len(self._pending))
+
+    def _run(self):
+        while not self._stopping:
+            if self._wakeup.wait(self.flush_interval):
+                self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush the audit log queue")
+            finally:
+                close_old_connections()
+
+
+audit_log = AuditLogWriter(
+    flush_interval=getattr(settings, 'AUDIT_LOG_FLUSH_INTERVAL', 0.5),
+    batch_size=getattr(settings, 'AUDIT_LOG_BATCH_SIZE', 200),
+    max_pending=getattr(settings, 'AUDIT_LOG_MAX_PENDING', 10000),
+    buffered=getattr(settings, 'AUDIT_LOG_BUFFERED', True),
+)
+atexit.register(audit_log.shutdown)
@@ -0,0 +1,320 @@
+"""
+Emergency roll-call snapshots, kept current on every movement.
+
+For each branch, and site-wide under ``all``, the snapshot directory holds
+``rollcall.json`` (everyone on site, with thumbnail URLs instead of photos)
+and ``report.pdf`` (the printable evacuation report):
+
+    <EMERGENCY_SNAPSHOT_ROOT>/<branch id | all>/rollcall.json
+    <EMERGENCY_SNAPSHOT_ROOT>/<branch id | all>/report.pdf
+
+A visitor save that touches someone on site (check-in, check-out, edits)
+marks their branch dirty once the transaction commits. A daemon thread
+waits ``EMERGENCY_SNAPSHOT_DELAY`` seconds so a burst of movements costs
+one rebuild, then rewrites the files of the dirty branches atomically.
+Serving the report during an evacuation is a file read; a snapshot that
+does not exist yet is built on the spot.
+
+Each snapshot records the change counter it was read at (``change_seq``).
+With several worker processes a slow rebuild can finish after a newer
+one, so a rebuild never replaces a snapshot read at a later change.
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from io import BytesIO
+
+import orjson
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import Branch, ChangeCounter, Visitor
+from .utils.images import ensure_thumbnail
+from .utils.snapshots import json_version
+
+logger = logging.getLogger(__name__)
+
+SITE_WIDE = 'all'
+JSON_NAME = 'rollcall.json'
+PDF_NAME = 'report.pdf'
+ON_SITE_STATUSES = (Visitor.Status.CHECKED_IN, Visitor.Status.IN_MEETING)
+ROLL_CALL_FIELDS = (
+    'id', 'first_name', 'last_name', 'company', 'phone', 'badge_number', 'status',
+    'check_in_time', 'host_id', 'host__first_name', 'host__last_name', 'branch_id', 'branch__name',
+    'photo',
+)
+PROCEDURES = (
+    "1. Remain calm and follow evacuation routes",
+    "2. Assist visitors as needed",
+    "3. Account for all personnel at assembly points",
+    "4. Do not use elevators",
+    "5. Report to floor warden if present",
+)
+
+
+def snapshot_key(branch_id):
+    return SITE_WIDE if branch_id in (None, SITE_WIDE) else str(int(branch_id))
+
+
+class EmergencySnapshots:
+    def __init__(self, root, delay=0.5, background=True):
+        self.root = str(root)
+        self.delay = delay
+        self.background = background
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._styles = None
+
+    # ----- reading -----
+
+    def path(self, key, name):
+        return os.path.join(self.root, key, name)
+
+    def json_path(self, branch_id=None):
+        """Path of the branch's roll-call JSON, built first if missing."""
+        return self._ensure(snapshot_key(branch_id), JSON_NAME)
+
+    def pdf_path(self, branch_id=None):
+        """Path of the branch's pre-rendered PDF report, built first if missing."""
+        return self._ensure(snapshot_key(branch_id), PDF_NAME)
+
+    def read_json(self, branch_id=None):
+        with open(self.json_path(branch_id), 'rb') as f:
+            return orjson.loads(f.read())
+
+    def _ensure(self, key, name):
+        path = self.path(key, name)
+        if not os.path.exists(path):
+            if key != SITE_WIDE and not Branch.objects.filter(pk=int(key)).exists():
+                raise Branch.DoesNotExist(f"Branch {key} does not exist")
+            self.rebuild(key)
+        return path
+
+    # ----- building -----
+
+    def mark_dirty(self, *branch_ids):
+        """Schedules a rebuild of these branches' snapshots and the site-wide one."""
+        keys = {snapshot_key(branch_id) for branch_id in branch_ids if branch_id is not None}
+        keys.add(SITE_WIDE)
+        if not self.background:
+            for key in keys:
+                self.rebuild(key)
+            return
+        with self._lock:
+            self._dirty |= keys
+        self._wakeup.set()
+        self.start()
+
+    def rebuild(self, key):
+        """Writes the JSON and PDF snapshot for a branch key (or ``all``)."""
+        with self._build_lock:
+            # Read before the visitors, so the snapshot is at least this current
+            change_seq = ChangeCounter.current()
+            queryset = Visitor.objects.filter(status__in=ON_SITE_STATUSES)
+            branch = None
+            if key != SITE_WIDE:
+                queryset = queryset.filter(branch_id=int(key))
+                branch = Branch.objects.filter(pk=int(key)).values('id', 'name').first()
+            visitors = [
+                self._entry(*row)
+                for row in queryset.order_by('-check_in_time', '-id').values_list(*ROLL_CALL_FIELDS)
+            ]
+            generated_at = timezone.now()
+            roll_call = {
+                'branch': branch,
+                'generated_at': generated_at.isoformat(),
+                # The name the pre-snapshot emergency report used
+                'timestamp': generated_at.isoformat(),
+                'change_seq': change_seq,
+                'version': json_version(visitors),
+                'count': len(visitors),
+                'visitors': visitors,
+                'locations': self._locations(visitors),
+            }
+            directory = os.path.join(self.root, key)
+            os.makedirs(directory, exist_ok=True)
+            if self._written_change_seq(key) > change_seq:
+                # Another process already wrote a newer snapshot
+                return roll_call
+            self._write(os.path.join(directory, JSON_NAME), orjson.dumps(roll_call))
+            self._write(os.path.join(directory, PDF_NAME), self._render_pdf(roll_call, generated_at))
+        return roll_call
+
+    def _written_change_seq(self, key):
+        try:
+            with open(self.path(key, JSON_NAME), 'rb') as f:
+                return orjson.loads(f.read()).get('change_seq', -1)
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return -1
+
+    def rebuild_all(self):
+        keys = [SITE_WIDE] + [str(pk) for pk in Branch.objects.values_list('id', flat=True)]
+        for key in keys:
+            self.rebuild(key)
+        return keys
+
+    def _entry(self, pk, first_name, last_name, company, phone, badge_number, status, check_in_time,
+               host_id, host_first, host_last, branch_id, branch_name, photo):
+        # Thumbnails are made here, off the request path, so a roll call
+        # started during an alarm finds them ready
+        thumbnail = ensure_thumbnail(photo)
+        return {
+            'id': pk,
+            'full_name': f"{first_name} {last_name}",
+            'company': company,
+            'phone': phone,
+            'badge_number': badge_number,
+            'status': status,
+            'check_in_time': check_in_time.isoformat() if check_in_time else None,
+            'host': host_id,
+            'host_name': f"{host_first} {host_last}".strip() if host_id else None,
+            'branch': {'id': branch_id, 'name': branch_name} if branch_id else None,
+            'thumbnail_url': default_storage.url(thumbnail) if thumbnail else None,
+        }
+
+    def _locations(self, visitors):
+        counts = {}
+        for visitor in visitors:
+            name = visitor['branch']['name'] if visitor['branch'] else None
+            counts[name] = counts.get(name, 0) + 1
+        return [
+            {'location': name, 'count': count}
+            for name, count in sorted(counts.items(), key=lambda item: -item[1])
+        ]
+
+    def _write(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    # ----- PDF -----
+
+    def _pdf_styles(self):
+        # Built once per process; the layout never changes
+        if self._styles is None:
+            from reportlab.lib import colors
+            from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+            from reportlab.platypus import TableStyle
+
+            styles = getSampleStyleSheet()
+            self._styles = {
+                'title': ParagraphStyle('EmergencyTitle', parent=styles['Title'], fontSize=16, leading=20),
+                'heading': ParagraphStyle('EmergencyHeading', parent=styles['Heading2'], fontSize=12, spaceAfter=6),
+                'normal': styles['Normal'],
+                'small': ParagraphStyle('EmergencySmall', parent=styles['Normal'], fontSize=8),
+                'contacts': TableStyle([
+                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 10),
+                    ('BOX', (0, 0), (-1, -1), 1, colors.black),
+                ]),
+                'visitors': TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#003366')),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('FONTSIZE', (0, 0), (-1, -1), 8),
+                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ]),
+            }
+        return self._styles
+
+    def _render_pdf(self, roll_call, generated_at):
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table
+
+        styles = self._pdf_styles()
+        location = roll_call['branch']['name'] if roll_call['branch'] else "All branches"
+        elements = [
+            Paragraph(f"EMERGENCY VISITOR REPORT — {location}", styles['title']),
+            Paragraph(f"Generated: {timezone.localtime(generated_at):%Y-%m-%d %H:%M:%S}", styles['small']),
+            Paragraph(f"Total Visitors: {roll_call['count']}", styles['small']),
+            Spacer(1, 24),
+            Paragraph("EMERGENCY PROCEDURES", styles['heading']),
+            *(Paragraph(step, styles['normal']) for step in PROCEDURES),
+            Spacer(1, 24),
+            Paragraph("EMERGENCY CONTACTS", styles['heading']),
+        ]
+        contacts = Table([
+            ["Security", getattr(settings, 'EMERGENCY_SECURITY_NUMBER', '+1-555-123-4567')],
+            ["Fire Department", getattr(settings, 'EMERGENCY_FIRE_NUMBER', '+1-555-987-6543')],
+            ["Medical", getattr(settings, 'EMERGENCY_MEDICAL_NUMBER', '+1-555-789-0123')],
+            ["Facility Manager", getattr(settings, 'EMERGENCY_MANAGER_EMAIL', 'facility@example.com')],
+        ], colWidths=[150, 150])
+        contacts.setStyle(styles['contacts'])
+        elements += [contacts, Spacer(1, 24), Paragraph("CURRENT VISITORS", styles['heading'])]
+
+        rows = [["Name", "Company", "Phone", "Host", "Location", "Check-In", "Badge #"]]
+        for visitor in roll_call['visitors']:
+            check_in = visitor['check_in_time']
+            rows.append([
+                visitor['full_name'],
+                visitor['company'] or "N/A",
+                visitor['phone'] or "N/A",
+                visitor['host_name'] or "N/A",
+                visitor['branch']['name'] if visitor['branch'] else "N/A",
+                f"{timezone.localtime(datetime.fromisoformat(check_in)):%H:%M}" if check_in else "",
+                visitor['badge_number'] or "N/A",
+            ])
+        table = Table(rows, colWidths=[100, 80, 75, 85, 70, 45, 55], repeatRows=1)
+        table.setStyle(styles['visitors'])
+        elements.append(table)
+
+        buffer = BytesIO()
+        SimpleDocTemplate(
+            buffer, pagesize=letter, title="Emergency Visitor Report", author="Visitor Management System"
+        ).build(elements)
+        return buffer.getvalue()
+
+    # ----- background rebuilds -----
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='emergency-snapshots', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            # Let a burst of movements settle into one rebuild
+            self._wakeup.clear()
+            if self.delay:
+                time.sleep(self.delay)
+            with self._lock:
+                keys, self._dirty = self._dirty, set()
+            for key in sorted(keys):
+                try:
+                    self.rebuild(key)
+                except Exception:
+                    logger.exception("Failed to rebuild the emergency snapshot for %s", key)
+                finally:
+                    close_old_connections()
+
+
+emergency_snapshots = EmergencySnapshots(
+    root=getattr(settings, 'EMERGENCY_SNAPSHOT_ROOT', os.path.join(settings.BASE_DIR, 'emergency')),
+    delay=getattr(settings, 'EMERGENCY_SNAPSHOT_DELAY', 0.5),
+    background=getattr(settings, 'EMERGENCY_SNAPSHOT_BACKGROUND', True),
+)
@@ -0,0 +1,324 @@
+"""
+Background visitor export jobs.
+
+``request_export`` records an ``ExportJob`` and hands it to a worker, which
+reads visitors in chunks (the column definitions of the CSV export) and
+writes CSV, XLSX or Parquet to a temporary file before saving it to the
+private ``EXPORT_ROOT`` storage. Progress is stored on the job after every
+chunk and pushed to the requesting user's WebSocket group
+(``export_progress``, then ``export_completed`` or ``export_failed``); the
+pushes carry only the job id, status and row counts.
+
+A request identical to one of the same user's queued or running jobs (same
+format and filters) joins that job, and one whose rows are unchanged since
+their completed job (same count and highest ``change_seq``) gets its file.
+Downloads go through signed links that expire after ``EXPORT_DOWNLOAD_TTL``
+seconds, issued only by the authenticated job detail endpoint.
+
+Jobs run on a daemon thread in the web process unless
+``EXPORT_JOBS_IN_PROCESS`` is False; ``manage.py run_export_jobs`` runs
+queued jobs from a separate worker either way.
+"""
+import csv
+import io
+import logging
+import queue
+import tempfile
+import threading
+from itertools import islice
+
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Count, Max
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import ExportJob
+from .utils.csv_export import (
+    EXPORT_CHUNK_SIZE, VISITOR_EXPORT_FIELDS, VISITOR_EXPORT_HEADER, export_rows,
+    filter_export_visitors, visitor_export_row,
+)
+from .utils.snapshots import json_version
+
+logger = logging.getLogger(__name__)
+
+FILTER_KEYS = ('start_date', 'end_date', 'branch', 'status')
+DOWNLOAD_SALT = 'visitors.export-download'
+EXPORT_DOWNLOAD_TTL = getattr(settings, 'EXPORT_DOWNLOAD_TTL', 3600)
+
+
+# ----- writers -----
+
+class CsvExportWriter:
+    extension = 'csv'
+
+    def __init__(self, f, header):
+        self.text = io.TextIOWrapper(f, encoding='utf-8', newline='')
+        self.writer = csv.writer(self.text)
+        self.writer.writerow(header)
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.text.flush()
+        self.text.detach()
+
+
+class XlsxExportWriter:
+    extension = 'xlsx'
+
+    def __init__(self, f, header):
+        from openpyxl import Workbook
+
+        self.f = f
+        # Write-only workbooks stream rows to disk instead of keeping cells
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet('Visitors')
+        self.sheet.append(list(header))
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.f)
+
+
+class ParquetExportWriter:
+    extension = 'parquet'
+
+    def __init__(self, f, header):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.header = list(header)
+        self.schema = pa.schema([(name, pa.string()) for name in self.header])
+        self.writer = pq.ParquetWriter(f, self.schema, compression='zstd')
+
+    def write_rows(self, rows):
+        # One row group per chunk
+        columns = list(zip(*rows)) if rows else [[] for _ in self.header]
+        arrays = [
+            self.pa.array([None if value is None else str(value) for value in column], self.pa.string())
+            for column in columns
+        ]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {
+    ExportJob.Format.CSV: CsvExportWriter,
+    ExportJob.Format.XLSX: XlsxExportWriter,
+    ExportJob.Format.PARQUET: ParquetExportWriter,
+}
+
+
+# ----- requesting -----
+
+class ExportConflict(Exception):
+    """A concurrent identical request holds the job slot but its job cannot be found."""
+
+
+def normalize_filters(params):
+    """The export filters present in ``params``; raises ValueError if one is malformed."""
+    filters = {key: str(params[key]).strip() for key in FILTER_KEYS if params.get(key)}
+    filter_export_visitors(filters)
+    return filters
+
+
+def data_version(queryset):
+    """Changes whenever a visitor in ``queryset`` is added, updated or removed."""
+    stats = queryset.order_by().aggregate(rows=Count('id'), last_seq=Max('change_seq'))
+    return f"{stats['rows']}-{stats['last_seq'] or 0}", stats['rows']
+
+
+def request_export(export_format, params, user=None):
+    """
+    Returns ``(job, created)``: the user's active or still-current job for
+    the same request, or a new queued one. Raises ValueError for bad
+    filters and ExportConflict when a racing request's job vanished.
+    """
+    if export_format not in WRITERS:
+        raise ValueError(f"Unsupported format: {export_format}")
+    user = user if user is not None and user.is_authenticated else None
+    filters = normalize_filters(params)
+    # Per user, so a job is only ever shared with (and reported to) its owner
+    fingerprint = json_version({
+        'user': user.pk if user else None, 'format': export_format, 'filters': filters
+    })
+    version, rows = data_version(filter_export_visitors(filters))
+
+    existing = _reusable_job(fingerprint, version)
+    if existing:
+        return existing, False
+    try:
+        with transaction.atomic():
+            job = ExportJob.objects.create(
+                format=export_format,
+                filters=filters,
+                fingerprint=fingerprint,
+                data_version=version,
+                rows_total=rows,
+                created_by=user,
+            )
+    except IntegrityError:
+        # An identical request queued the job first. It may already have
+        # finished against rows that changed again since, so fall back to
+        # the newest job for this request whatever its data version.
+        job = _reusable_job(fingerprint, version) or ExportJob.objects.filter(fingerprint=fingerprint).first()
+        if job is None:
+            raise ExportConflict("An identical export is being started; retry shortly")
+        return job, False
+    transaction.on_commit(lambda: export_worker.submit(job.pk))
+    return job, True
+
+
+def _reusable_job(fingerprint, version):
+    active = ExportJob.objects.filter(
+        fingerprint=fingerprint, status__in=[ExportJob.Status.QUEUED, ExportJob.Status.RUNNING]
+    ).first()
+    if active:
+        return active
+    completed = ExportJob.objects.filter(
+        fingerprint=fingerprint, status=ExportJob.Status.COMPLETED, data_version=version
+    ).exclude(file='').exclude(file__isnull=True).first()
+    if completed and completed.file.storage.exists(completed.file.name):
+        return completed
+    return None
+
+
+# ----- running -----
+
+def run_export_job(job_id):
+    """Runs a queued job; returns False if another worker already claimed it."""
+    claimed = ExportJob.objects.filter(pk=job_id, status=ExportJob.Status.QUEUED).update(
+        status=ExportJob.Status.RUNNING, started_at=timezone.now()
+    )
+    if not claimed:
+        return False
+    job = ExportJob.objects.select_related('created_by').get(pk=job_id)
+    try:
+        _write_export(job)
+    except Exception as exc:
+        logger.exception("Export job %s failed", job.pk)
+        job.status = ExportJob.Status.FAILED
+        job.error = str(exc)[:1000]
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+        _notify(job, 'export_failed', f"Export #{job.pk} failed", {'error': job.error})
+        return True
+
+    # No download link here: it is issued by the authenticated detail endpoint
+    _notify(job, 'export_completed', f"Export #{job.pk} is ready")
+    return True
+
+
+def _write_export(job):
+    visitors = filter_export_visitors(job.filters)
+    job.data_version, job.rows_total = data_version(visitors)
+    job.save(update_fields=['data_version', 'rows_total'])
+
+    rows = export_rows(visitors, VISITOR_EXPORT_FIELDS, visitor_export_row)
+    with tempfile.TemporaryFile() as f:
+        writer = WRITERS[job.format](f, VISITOR_EXPORT_HEADER)
+        written = 0
+        while True:
+            chunk = list(islice(rows, EXPORT_CHUNK_SIZE))
+            if not chunk:
+                break
+            writer.write_rows(chunk)
+            written += len(chunk)
+            ExportJob.objects.filter(pk=job.pk).update(rows_written=written)
+            job.rows_written = written
+            _notify(job, 'export_progress', f"Export #{job.pk}: {written} of {job.rows_total} rows")
+        writer.close()
+
+        f.seek(0)
+        stamp = timezone.localtime().strftime('%Y%m%d-%H%M%S')
+        job.file.save(f"visitors-{stamp}-{job.pk}.{writer.extension}", File(f), save=False)
+
+    job.status = ExportJob.Status.COMPLETED
+    job.finished_at = timezone.now()
+    job.save(update_fields=['file', 'status', 'rows_written', 'finished_at'])
+
+
+def _notify(job, event, message, data=None):
+    if job.created_by is None:
+        return
+    from notifications.notifier import send_realtime_notification
+
+    payload = {
+        'job': job.pk, 'status': job.status, 'progress': job.progress,
+        'rows_written': job.rows_written, 'rows_total': job.rows_total,
+        **(data or {}),
+    }
+    try:
+        send_realtime_notification(job.created_by, message, event=event, data=payload, channel=None)
+    except Exception:
+        # Progress can always be polled; a channel layer outage must not fail the export
+        logger.warning("Could not send %s for export job %s", event, job.pk, exc_info=True)
+
+
+# ----- downloads -----
+
+def download_path(job):
+    """A signed download path for a completed job, valid for EXPORT_DOWNLOAD_TTL seconds."""
+    token = signing.dumps([job.pk, job.file.name], salt=DOWNLOAD_SALT, compress=True)
+    return f"{reverse('export-job-download', args=[job.pk])}?token={token}"
+
+
+def job_for_token(job_id, token):
+    """The completed job a download token was issued for; raises signing.BadSignature."""
+    signed_id, file_name = signing.loads(token, salt=DOWNLOAD_SALT, max_age=EXPORT_DOWNLOAD_TTL)
+    if signed_id != job_id:
+        raise signing.BadSignature("Token is for another export")
+    job = ExportJob.objects.filter(pk=job_id, status=ExportJob.Status.COMPLETED, file=file_name).first()
+    if job is None:
+        raise signing.BadSignature("Export is no longer available")
+    return job
+
+
+# ----- worker -----
+
+class ExportWorker:
+    """Runs submitted jobs one at a time on a daemon thread."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, job_id):
+        if not self.enabled:
+            return
+        self._queue.put(job_id)
+        self.start()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='export-worker', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                run_export_job(job_id)
+            except Exception:
+                logger.exception("Export worker failed on job %s", job_id)
+            finally:
+                close_old_connections()
+
+
+export_worker = ExportWorker(enabled=getattr(settings, 'EXPORT_JOBS_IN_PROCESS', True))
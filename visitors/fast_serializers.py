@@ -0,0 +1,165 @@
+"""
+Read-only "projection" serializers for hot list endpoints.
+
+A projection is compiled once from an existing DRF serializer: each output
+field becomes a plain function over a ``.values()`` row, with related
+names fetched by the same SQL query. Output is identical to the DRF
+serializer; only the per-row cost differs.
+"""
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+
+from .serializers import (
+    Base64ImageField,
+    EmergencyVisitorSerializer,
+    SparseFieldsetSerializerMixin,
+    VisitorSerializer,
+)
+from .utils.images import image_data_uri
+
+# Field types whose representation of a non-None value is the value itself
+IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.ReadOnlyField,
+    PrimaryKeyRelatedField,
+)
+
+
+def _datetime(value):
+    if not value:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _format_duration(check_in_time, check_out_time):
+    if check_out_time and check_in_time:
+        seconds = int((check_out_time - check_in_time).total_seconds())
+        hours, remainder = divmod(seconds, 3600)
+        minutes, _ = divmod(remainder, 60)
+        return f"{hours}h {minutes}m"
+    return "—"
+
+
+class Projection:
+    """
+    Compiled, read-only equivalent of ``serializer_class`` over ``.values()``
+    rows. ``computed`` maps method/property fields to ``(columns, function)``
+    where the function receives those column values. With
+    ``inline_images=False``, base64 image fields are sent as media URLs.
+    """
+
+    def __init__(self, serializer_class, computed=None, inline_images=True):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.computed = computed or {}
+        self.inline_images = inline_images
+        self._plans = {}
+
+    def columns(self, fields=None, expand=()):
+        return self._plan(fields, expand)[0]
+
+    def serialize(self, rows, request=None, fields=None, expand=()):
+        """Returns the representation of each ``.values()`` row."""
+        _, steps = self._plan(fields, expand)
+        return [{name: step(row, request) for name, step in steps} for row in rows]
+
+    def serialize_queryset(self, queryset, request=None, fields=None, expand=()):
+        rows = queryset.values(*self.columns(fields, expand))
+        return self.serialize(rows, request, fields, expand)
+
+    def _plan(self, fields, expand):
+        key = (tuple(fields) if fields is not None else None, tuple(expand or ()))
+        plan = self._plans.get(key)
+        if plan is None:
+            if issubclass(self.serializer_class, SparseFieldsetSerializerMixin):
+                serializer = self.serializer_class(fields=fields, expand=expand)
+            else:
+                serializer = self.serializer_class()
+            columns, steps = set(), []
+            for name, field in serializer.fields.items():
+                if field.write_only:
+                    continue
+                step = self._compile(name, field, columns)
+                steps.append((name, step))
+            plan = self._plans[key] = (sorted(columns), steps)
+        return plan
+
+    def _compile(self, name, field, columns, prefix=''):
+        if not prefix and name in self.computed:
+            sources, function = self.computed[name]
+            columns.update(sources)
+            return lambda row, request: function(*(row[source] for source in sources))
+
+        if isinstance(field, serializers.BaseSerializer):
+            return self._compile_nested(name, field, columns)
+
+        column = prefix + field.source
+        columns.add(column)
+        model_field = self._model_field(column)
+
+        if isinstance(field, Base64ImageField) and self.inline_images:
+            storage, default = model_field.storage, field.default_image
+            return lambda row, request: (
+                row[column] and image_data_uri(storage.path(row[column]))
+            ) or default
+
+        if isinstance(field, serializers.FileField):
+            storage = model_field.storage
+
+            def file_url(row, request):
+                if not row[column]:
+                    return None
+                url = storage.url(row[column])
+                return request.build_absolute_uri(url) if request is not None else url
+            return file_url
+
+        if isinstance(field, serializers.DateTimeField):
+            return lambda row, request: _datetime(row[column])
+
+        if isinstance(field, IDENTITY_FIELDS):
+            return lambda row, request: row[column]
+
+        # Anything else (decimals, dates, ...) uses the DRF field itself
+        def represent(row, request):
+            value = row[column]
+            return None if value is None else field.to_representation(value)
+        return represent
+
+    def _compile_nested(self, name, serializer, columns):
+        pk = f"{name}__{serializer.Meta.model._meta.pk.name}"
+        columns.add(pk)
+        steps = [
+            (child_name, self._compile(child_name, child, columns, prefix=f"{name}__"))
+            for child_name, child in serializer.fields.items()
+            if not child.write_only
+        ]
+        return lambda row, request: None if row[pk] is None else {
+            child_name: step(row, request) for child_name, step in steps
+        }
+
+    def _model_field(self, column):
+        model, *path, attribute = [self.model, *column.split('__')]
+        for relation in path:
+            model = model._meta.get_field(relation).related_model
+        return model._meta.get_field(attribute)
+
+
+visitor_projection = Projection(VisitorSerializer, computed={
+    'duration': (('check_in_time', 'check_out_time'), _format_duration),
+})
+
+# Delta sync: a local replica fetches photos and signatures on demand
+visitor_sync_projection = Projection(VisitorSerializer, computed={
+    'duration': (('check_in_time', 'check_out_time'), _format_duration),
+}, inline_images=False)
+
+emergency_visitor_projection = Projection(EmergencyVisitorSerializer, computed={
+    'full_name': (('first_name', 'last_name'), lambda first, last: f"{first} {last}"),
+})
@@ -1,6 +1,18 @@
+import json
+import re
+
 import django_filters
-from .models import Visitor
+from django.db.models import Q
+from django.db.models.fields.json import KeyTransform
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from .models import CustomUser, Visitor
 from .models import VisitorLog
+from .search import get_search_backend
+
+PAYLOAD_KEY = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
 
 class VisitorLogFilter(django_filters.FilterSet):
     start_date = django_filters.DateFilter(field_name='timestamp', lookup_expr='gte')
@@ -8,10 +20,39 @@ class VisitorLogFilter(django_filters.FilterSet):
     action = django_filters.CharFilter(field_name='action', lookup_expr='iexact')
     user_email = django_filters.CharFilter(field_name='user__email', lookup_expr='icontains')
     visitor_name = django_filters.CharFilter(field_name='visitor__full_name', lookup_expr='icontains')
+    month = django_filters.DateFilter(method='filter_by_month', input_formats=['%Y-%m'])
+    device_id = django_filters.CharFilter(field_name='device_id')
+    branch = django_filters.NumberFilter(field_name='branch_id')
+    channel = django_filters.CharFilter(field_name='channel')
+    payload = django_filters.CharFilter(method='filter_by_payload')
 
     class Meta:
         model = VisitorLog
-        fields = ['start_date', 'end_date', 'action', 'user_email', 'visitor_name']
+        fields = [
+            'start_date', 'end_date', 'action', 'user_email', 'visitor_name', 'month',
+            'device_id', 'branch', 'channel', 'payload'
+        ]
+
+    def filter_by_month(self, queryset, name, value):
+        # ?month=YYYY-MM stays within one partition of the log table
+        return queryset.in_month(value)
+
+    def filter_by_payload(self, queryset, name, value):
+        # ?payload=key:value matches a top-level payload key; device_id,
+        # branch and channel have indexed columns and their own filters
+        key, separator, expected = value.partition(':')
+        if not separator or not PAYLOAD_KEY.fullmatch(key):
+            raise ValidationError({'payload': "Expected key:value"})
+        # An explicit KeyTransform, so a key named like a lookup (contains,
+        # isnull, has_key...) is still matched as a key
+        queryset = queryset.alias(payload_value=KeyTransform(key, 'payload'))
+        condition = Q(payload_value=expected)
+        try:
+            # Also match numbers and booleans stored as JSON scalars
+            condition |= Q(payload_value=json.loads(expected))
+        except ValueError:
+            pass
+        return queryset.filter(condition)
 
 class VisitorFilter(django_filters.FilterSet):
     host_name = django_filters.CharFilter(method='filter_by_host_name')
@@ -21,7 +62,32 @@ class VisitorFilter(django_filters.FilterSet):
         fields = ['status', 'check_in_time', 'host_name']
 
     def filter_by_host_name(self, queryset, name, value):
-        return queryset.filter(
-            models.Q(host__first_name__icontains=value) | 
-            models.Q(host__last_name__icontains=value)
-        )
+        # Matching hosts is a lookup on the small users table; visitors are
+        # then selected through the indexed host column instead of a join.
+        hosts = CustomUser.objects.all()
+        for term in value.split():
+            hosts = hosts.filter(Q(first_name__istartswith=term) | Q(last_name__istartswith=term))
+        return queryset.filter(host_id__in=hosts.values('id'))
+
+class VisitorSearchFilter(BaseFilterBackend):
+    """
+    Drop-in replacement for SearchFilter on visitor lists: ``?search=``
+    prefix-matches names, company, email, phone, badge number and host name
+    through the full-text index instead of leading-wildcard LIKEs.
+    """
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return get_search_backend().filter(queryset, query)
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Prefix search over visitor names, company, contact details, badge and host',
+            'schema': {'type': 'string'},
+        }]
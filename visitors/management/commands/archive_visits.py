@@ -0,0 +1,201 @@
+from datetime import date
+
+import numpy as np
+import orjson
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from visitors.models import Branch, CustomUser, Visitor, VisitorLog
+from visitors.utils.archive import ColumnarArchive, month_bounds, month_key
+
+OPEN_STATUSES = ['checked_in', 'in_meeting']
+
+VISIT_FIELDS = [
+    'id', 'check_in_time', 'check_out_time', 'status', 'visitor_type', 'id_type',
+    'branch_id', 'host_id', 'company', 'health_declaration', 'badge_printed',
+    'first_name', 'last_name', 'email', 'phone', 'purpose', 'notes',
+    'badge_number', 'qr_code',
+]
+VISIT_CODED = ['status', 'visitor_type', 'id_type', 'branch', 'host', 'company']
+VISIT_STRINGS = [
+    'first_name', 'last_name', 'email', 'phone', 'purpose', 'notes', 'badge_number', 'qr_code'
+]
+
+
+def _epoch(value):
+    return int(value.timestamp()) if value else -1
+
+
+class _Dictionary:
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def __call__(self, value):
+        if value not in self.codes:
+            self.codes[value] = len(self.values)
+            self.values.append(value)
+        return self.codes[value]
+
+
+class Command(BaseCommand):
+    help = (
+        "Exports closed months of visitors and their logs into immutable, "
+        "memory-mapped columnar segments, optionally pruning the hot tables"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before',
+            help="Archive months strictly before this month (YYYY-MM). Defaults to the current month."
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help="Delete archived visitors (and, by cascade, their logs) from the database"
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        archive = ColumnarArchive()
+        cutoff_month = self._parse_month(options['before']) if options['before'] else timezone.localdate()
+        cutoff, _ = month_bounds(cutoff_month)
+
+        months = (
+            Visitor.objects.filter(check_in_time__lt=cutoff)
+            .annotate(month=TruncMonth('check_in_time'))
+            .values_list('month', flat=True)
+            .distinct()
+            .order_by('month')
+        )
+        for month_start in months:
+            month = month_key(month_start)
+            if not archive.has_segment('visits', month):
+                start, end = month_bounds(month_start)
+                visits = Visitor.objects.filter(check_in_time__gte=start, check_in_time__lt=end)
+                if visits.filter(status__in=OPEN_STATUSES).exists():
+                    self.stdout.write(self.style.WARNING(f"Skipping {month}: visits still open"))
+                    continue
+                ids = self._archive_visits(archive, month, visits, options['chunk_size'])
+                self._archive_logs(archive, month, ids, options['chunk_size'])
+                self.stdout.write(f"Archived {len(ids)} visits for {month}")
+
+            if options['prune']:
+                self._prune(archive, month, options['chunk_size'])
+
+    def _parse_month(self, value):
+        try:
+            year, month = (int(part) for part in value.split('-'))
+            return date(year, month, 1)
+        except ValueError:
+            raise CommandError("--before must be a month in YYYY-MM format")
+
+    def _archive_visits(self, archive, month, visits, chunk_size):
+        dictionaries = {name: _Dictionary() for name in VISIT_CODED}
+        numeric = {name: [] for name in ('id', 'check_in', 'local_check_in', 'check_out',
+                                         'health_declaration', 'badge_printed', *VISIT_CODED)}
+        strings = {name: [] for name in VISIT_STRINGS}
+
+        rows = visits.order_by('check_in_time', 'id').values(*VISIT_FIELDS).iterator(chunk_size=chunk_size)
+        for row in rows:
+            check_in = row['check_in_time']
+            numeric['id'].append(row['id'])
+            numeric['check_in'].append(_epoch(check_in))
+            numeric['local_check_in'].append(
+                _epoch(check_in) + int(timezone.localtime(check_in).utcoffset().total_seconds())
+            )
+            numeric['check_out'].append(_epoch(row['check_out_time']))
+            numeric['health_declaration'].append(row['health_declaration'])
+            numeric['badge_printed'].append(row['badge_printed'])
+            row['branch'] = row['branch_id']
+            row['host'] = row['host_id']
+            row['company'] = (row['company'] or '').strip() or None
+            for name in VISIT_CODED:
+                numeric[name].append(dictionaries[name](row[name]))
+            for name in VISIT_STRINGS:
+                strings[name].append(row[name])
+
+        columns = {
+            'id': np.array(numeric['id'], dtype=np.int64),
+            'check_in': np.array(numeric['check_in'], dtype=np.int64),
+            'local_check_in': np.array(numeric['local_check_in'], dtype=np.int64),
+            'check_out': np.array(numeric['check_out'], dtype=np.int64),
+            'health_declaration': np.array(numeric['health_declaration'], dtype=bool),
+            'badge_printed': np.array(numeric['badge_printed'], dtype=bool),
+        }
+        columns.update({name: np.array(numeric[name], dtype=np.int32) for name in VISIT_CODED})
+
+        values = {name: dictionary.values for name, dictionary in dictionaries.items()}
+        branch_names = dict(Branch.objects.filter(id__in=values['branch']).values_list('id', 'name'))
+        host_names = {
+            pk: f"{first} {last}".strip()
+            for pk, first, last in CustomUser.objects.filter(
+                id__in=values['host']
+            ).values_list('id', 'first_name', 'last_name')
+        }
+        values['branch_name'] = [branch_names.get(pk) for pk in values['branch']]
+        values['host_name'] = [host_names.get(pk) for pk in values['host']]
+
+        archive.write_segment('visits', month, columns, strings, values)
+        return numeric['id']
+
+    def _archive_logs(self, archive, month, visitor_ids, chunk_size):
+        actions = _Dictionary()
+        numeric = {name: [] for name in ('id', 'visitor_id', 'user_id', 'branch_id', 'timestamp', 'action')}
+        # payload is stored as JSON text; since structured payloads, details is often NULL
+        strings = {name: [] for name in ('details', 'payload', 'device_id', 'channel')}
+
+        for start in range(0, len(visitor_ids), chunk_size):
+            rows = (
+                VisitorLog.objects.filter(visitor_id__in=visitor_ids[start:start + chunk_size])
+                .order_by('timestamp', 'id')
+                .values_list(
+                    'id', 'visitor_id', 'user_id', 'branch_id', 'timestamp', 'action',
+                    'details', 'payload', 'device_id', 'channel'
+                )
+            )
+            for (log_id, visitor_id, user_id, branch_id, timestamp, action,
+                 detail, payload, device_id, channel) in rows:
+                numeric['id'].append(log_id)
+                numeric['visitor_id'].append(visitor_id)
+                numeric['user_id'].append(user_id if user_id is not None else -1)
+                numeric['branch_id'].append(branch_id if branch_id is not None else -1)
+                numeric['timestamp'].append(_epoch(timestamp))
+                numeric['action'].append(actions(action))
+                strings['details'].append(detail)
+                strings['payload'].append(orjson.dumps(payload).decode() if payload else None)
+                strings['device_id'].append(device_id)
+                strings['channel'].append(channel)
+
+        order = np.argsort(np.array(numeric['timestamp'], dtype=np.int64), kind='stable')
+        columns = {
+            name: np.array(values, dtype=np.int32 if name == 'action' else np.int64)[order]
+            for name, values in numeric.items()
+        }
+        archive.write_segment(
+            'logs', month, columns,
+            {name: [values[index] for index in order] for name, values in strings.items()},
+            {'action': actions.values}
+        )
+
+    def _prune(self, archive, month, chunk_size):
+        entry = archive.manifest()['segments'].get('visits', {}).get(month)
+        if not entry or entry.get('pruned'):
+            return
+
+        segment = archive.segment('visits', month)
+        ids = [int(pk) for pk in segment.column('id')]
+        deleted = 0
+        for start in range(0, len(ids), chunk_size):
+            with transaction.atomic():
+                # Visitors with an active blacklist entry stay in the hot table
+                chunk = Visitor.objects.filter(
+                    id__in=ids[start:start + chunk_size]
+                ).exclude(blacklist_entry__is_active=True)
+                deleted += chunk.delete()[1].get(Visitor._meta.label, 0)
+
+        archive.mark_pruned('visits', month)
+        archive.mark_pruned('logs', month)
+        self.stdout.write(f"Pruned {deleted} archived visits for {month}")
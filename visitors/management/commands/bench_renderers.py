@@ -0,0 +1,62 @@
+import json
+import time
+
+import msgpack
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from visitors.fast_serializers import visitor_projection
+from visitors.models import Visitor
+from visitors.renderers import MessagePackRenderer, ORJSONRenderer
+from visitors.utils.columnar import METRICS, VisitorFrame
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares rendering time and size of the default JSON renderer with "
+        "the orjson and MessagePack renderers on visitor list and analytics payloads"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help="Visitors in the list payload")
+        parser.add_argument('--repeat', type=int, default=20, help="Renders per renderer; the best is reported")
+
+    def handle(self, *args, **options):
+        request = Request(APIRequestFactory().get('/api/visitors/'))
+        queryset = Visitor.objects.order_by('-check_in_time', '-id')[:options['rows']]
+        payloads = [
+            ('visitor list', {'next': None, 'previous': None,
+                              'results': visitor_projection.serialize_queryset(queryset, request)}),
+            ('analytics', {'results': VisitorFrame.build().query(
+                group_by=('day', 'branch', 'status'), metrics=METRICS
+            )}),
+        ]
+        renderers = [('json', JSONRenderer()), ('orjson', ORJSONRenderer()), ('msgpack', MessagePackRenderer())]
+
+        for name, data in payloads:
+            baseline = JSONRenderer().render(data)
+            expected = json.loads(baseline)
+            self.stdout.write(f"{name}: {len(baseline)} bytes of JSON")
+            base_time = None
+            for label, renderer in renderers:
+                output = renderer.render(data)
+                decoded = msgpack.unpackb(output, raw=False) if label == 'msgpack' else json.loads(output)
+                if decoded != expected:
+                    self.stdout.write(self.style.ERROR(f"  {label}: output differs from the default renderer"))
+                    continue
+                elapsed = self._best(lambda: renderer.render(data), options['repeat'])
+                base_time = base_time or elapsed
+                self.stdout.write(
+                    f"  {label:8} {elapsed * 1e3:8.3f} ms  {len(output):9d} bytes  {base_time / elapsed:5.1f}x"
+                )
+
+    def _best(self, function, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
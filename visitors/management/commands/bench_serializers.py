@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from visitors.fast_serializers import emergency_visitor_projection, visitor_projection
+from visitors.models import Visitor
+from visitors.serializers import EmergencyVisitorSerializer, VisitorSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares per-row serialization cost of the DRF visitor serializers "
+        "with their compiled projections, and checks the output is identical"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help="Visitors to serialize per run")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per serializer; the best is reported")
+
+    def handle(self, *args, **options):
+        request = Request(APIRequestFactory().get('/api/visitors/'))
+        queryset = Visitor.objects.order_by('-check_in_time', '-id')[:options['rows']]
+        rows = len(queryset)
+        if not rows:
+            self.stdout.write("No visitors to serialize")
+            return
+
+        cases = [
+            ('VisitorSerializer', VisitorSerializer, visitor_projection),
+            ('EmergencyVisitorSerializer', EmergencyVisitorSerializer, emergency_visitor_projection),
+        ]
+        for name, serializer_class, projection in cases:
+            def drf():
+                return serializer_class(queryset.all(), many=True, context={'request': request}).data
+
+            def fast():
+                return projection.serialize_queryset(queryset.all(), request)
+
+            if [dict(row) for row in drf()] != fast():
+                self.stdout.write(self.style.ERROR(f"{name}: projection output differs"))
+                continue
+            drf_time = self._best(drf, options['repeat'])
+            fast_time = self._best(fast, options['repeat'])
+            self.stdout.write(
+                f"{name}: {rows} rows | DRF {drf_time / rows * 1e6:.1f} us/row | "
+                f"projection {fast_time / rows * 1e6:.1f} us/row | {drf_time / fast_time:.1f}x"
+            )
+
+    def _best(self, function, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
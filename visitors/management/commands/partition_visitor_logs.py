@@ -0,0 +1,124 @@
+import re
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from visitors.models import VisitorLog
+from visitors.utils.archive import month_bounds
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class Command(BaseCommand):
+    help = (
+        "PostgreSQL only: turns the visitor log table into a table range-partitioned "
+        "by month on timestamp (first run) and creates the upcoming monthly "
+        "partitions (every run). Schedule it monthly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead', type=int, default=3,
+            help="Create partitions for this many months after the current one"
+        )
+        parser.add_argument(
+            '--keep-unpartitioned', action='store_true',
+            help="Keep the original table (renamed *_unpartitioned) after converting"
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            # SQLite has no native partitioning; there closed months are
+            # rolled out of the hot table by archive_visits --prune instead.
+            self.stdout.write(self.style.WARNING(
+                f"Native partitioning needs PostgreSQL, not {connection.vendor}; nothing to do"
+            ))
+            return
+
+        self.table = VisitorLog._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            if not self._is_partitioned(cursor):
+                self._convert(cursor, options['keep_unpartitioned'])
+            current = timezone.localdate().replace(day=1)
+            for offset in range(options['ahead'] + 1):
+                self._create_partition(cursor, _add_months(current, offset))
+
+    def _is_partitioned(self, cursor):
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [self.table]
+        )
+        return cursor.fetchone() is not None
+
+    def _partition_name(self, month):
+        return f"{self.table}_y{month.year:04d}m{month.month:02d}"
+
+    def _create_partition(self, cursor, month):
+        start, end = month_bounds(month)
+        name = self._partition_name(month)
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {name} PARTITION OF {self.table} '
+            f'FOR VALUES FROM (%s) TO (%s)',
+            [start, end]
+        )
+
+    def _convert(self, cursor, keep_unpartitioned):
+        table = self.table
+        old = f"{table}_unpartitioned"
+        sequence = f"{table}_partitioned_id_seq"
+
+        cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(
+            "SELECT c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = to_regclass(%s) AND NOT i.indisprimary",
+            [table]
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [table]
+        )
+        foreign_keys = cursor.fetchall()
+
+        # Free the table, index and constraint names for the partitioned table
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {old}")
+        for name, _ in indexes:
+            cursor.execute(f'ALTER INDEX "{name}" RENAME TO "{name[:54]}_unpart"')
+        for name, _ in foreign_keys:
+            cursor.execute(f'ALTER TABLE {old} RENAME CONSTRAINT "{name}" TO "{name[:54]}_unpart"')
+
+        # The primary key of a partitioned table has to include the partition
+        # key; ids still come from a single sequence, so they stay unique.
+        cursor.execute(f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE ("timestamp")')
+        cursor.execute(f"CREATE SEQUENCE {sequence} OWNED BY {table}.id")
+        cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+        cursor.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, "timestamp")')
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+        for _, definition in indexes:
+            # Definitions were read before the rename, so they name the new table
+            cursor.execute(re.sub(
+                rf' ON (ONLY )?(\S+\.)?"?{table}"? ', f' ON {table} ', definition, count=1
+            ))
+
+        cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        cursor.execute(f'SELECT min("timestamp") FROM {old}')
+        first = cursor.fetchone()[0]
+        if first is not None:
+            month = timezone.localtime(first).date().replace(day=1)
+            current = timezone.localdate().replace(day=1)
+            while month <= current:
+                self._create_partition(cursor, month)
+                month = _add_months(month, 1)
+
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+        cursor.execute(f"SELECT setval('{sequence}', coalesce((SELECT max(id) FROM {table}), 0) + 1, false)")
+        if not keep_unpartitioned:
+            cursor.execute(f"DROP TABLE {old}")
+        self.stdout.write(self.style.SUCCESS(f"Converted {table} to monthly partitions"))
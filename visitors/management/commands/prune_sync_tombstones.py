@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from visitors.models import ChangeCounter, ChangeTombstone
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes delta-sync tombstones older than the retention window. Clients "
+        "whose cursor predates the pruned tombstones are asked to resync from zero"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+            help="Keep tombstones from the last N days"
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        with transaction.atomic():
+            expired = ChangeTombstone.objects.filter(deleted_at__lt=cutoff)
+            horizon = expired.aggregate(horizon=Max('change_seq'))['horizon']
+            if horizon is None:
+                self.stdout.write("No tombstones to prune")
+                return
+            deleted, _ = expired.delete()
+            ChangeCounter.objects.update_or_create(
+                name=ChangeCounter.TOMBSTONE_HORIZON, defaults={'value': horizon}
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Pruned {deleted} tombstones; cursors before {horizon} must resync"
+        ))
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from visitors.models import Visitor, VisitDurationSketch
+from visitors.utils.quantile_sketch import DurationSketch
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the daily visit duration sketches from completed visits"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help="Only rebuild days on or after this date (YYYY-MM-DD). Defaults to all history."
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError("--since must be a date in YYYY-MM-DD format")
+
+        visits = Visitor.objects.filter(check_out_time__isnull=False)
+        sketches = VisitDurationSketch.objects.all()
+        if since:
+            # Sketches are keyed by local check-in day, so widen the raw filter by a day
+            visits = visits.filter(check_in_time__date__gte=since - timedelta(days=1))
+            sketches = sketches.filter(day__gte=since)
+
+        groups = {}
+        rows = visits.values_list(
+            'check_in_time', 'check_out_time', 'branch_id', 'host_id', 'visitor_type'
+        ).iterator(chunk_size=options['chunk_size'])
+        for check_in, check_out, branch_id, host_id, visitor_type in rows:
+            day = timezone.localdate(check_in)
+            if since and day < since:
+                continue
+            key = (day, branch_id, host_id, visitor_type)
+            sketch = groups.get(key)
+            if sketch is None:
+                sketch = groups[key] = DurationSketch()
+            sketch.add((check_out - check_in).total_seconds())
+
+        with transaction.atomic():
+            deleted, _ = sketches.delete()
+            VisitDurationSketch.objects.bulk_create(
+                [
+                    VisitDurationSketch(
+                        day=day,
+                        branch_id=branch_id,
+                        host_id=host_id,
+                        visitor_type=visitor_type,
+                        count=sketch.count,
+                        sketch=sketch.to_dict(),
+                    )
+                    for (day, branch_id, host_id, visitor_type), sketch in groups.items()
+                ],
+                batch_size=500
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {len(groups)} duration sketches (replaced {deleted})"
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from visitors.emergency_snapshot import emergency_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the emergency roll-call JSON and PDF for every branch and the "
+        "whole site, e.g. after a deploy or a bulk import that sent no signals"
+    )
+
+    def handle(self, *args, **options):
+        keys = emergency_snapshots.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {len(keys)} emergency snapshots in {emergency_snapshots.root}"
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from visitors.search import BACKENDS
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the visitor full-text search index from the visitors table, "
+        "creating the index and its triggers if they are missing"
+    )
+
+    def handle(self, *args, **options):
+        backend = BACKENDS.get(connection.vendor)
+        if backend is None:
+            self.stdout.write(f"No search index for the {connection.vendor} backend; nothing to do")
+            return
+
+        with transaction.atomic():
+            backend.install(connection)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the {backend.vendor} visitor search index"))
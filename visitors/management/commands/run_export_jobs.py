@@ -0,0 +1,47 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from visitors.exports import run_export_job
+from visitors.models import ExportJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs queued visitor export jobs, oldest first. With --watch it keeps "
+        "polling, for use as a dedicated worker (EXPORT_JOBS_IN_PROCESS = False)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true', help="Keep polling for new jobs")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds between polls")
+        parser.add_argument(
+            '--requeue-after', type=int, default=60,
+            help="Requeue jobs left running for this many minutes (e.g. by a crashed worker)"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            stale = ExportJob.objects.filter(
+                status=ExportJob.Status.RUNNING,
+                started_at__lt=timezone.now() - timedelta(minutes=options['requeue_after'])
+            ).update(status=ExportJob.Status.QUEUED, rows_written=0)
+            if stale:
+                self.stdout.write(f"Requeued {stale} stale export jobs")
+
+            job_ids = list(
+                ExportJob.objects.filter(status=ExportJob.Status.QUEUED)
+                .order_by('created_at').values_list('id', flat=True)
+            )
+            for job_id in job_ids:
+                if run_export_job(job_id):
+                    job = ExportJob.objects.get(pk=job_id)
+                    self.stdout.write(f"Export #{job.pk}: {job.status} ({job.rows_written} rows)")
+            close_old_connections()
+
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
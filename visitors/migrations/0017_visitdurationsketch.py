@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-19 00:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0016_alter_customuser_managers_alter_customuser_branch_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitDurationSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('visitor_type', models.CharField(choices=[('guest', 'Guest'), ('contractor', 'Contractor'), ('vendor', 'Vendor'), ('interview', 'Interviewee'), ('delivery', 'Delivery')], max_length=20, verbose_name='Visitor Type')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Completed Visits')),
+                ('sketch', models.JSONField(default=dict, verbose_name='Sketch Data')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duration_sketches', to='visitors.branch', verbose_name='Branch')),
+                ('host', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duration_sketches', to=settings.AUTH_USER_MODEL, verbose_name='Host')),
+            ],
+            options={
+                'verbose_name': 'Visit Duration Sketch',
+                'verbose_name_plural': 'Visit Duration Sketches',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day', 'branch', 'host', 'visitor_type'], name='visitors_vi_day_a0d3e6_idx'), models.Index(fields=['host', 'day'], name='visitors_vi_host_id_677170_idx'), models.Index(fields=['branch', 'day'], name='visitors_vi_branch__3133f9_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.4 on 2026-10-19 00:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0017_visitdurationsketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Company',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Name')),
+                ('normalized_name', models.CharField(max_length=100, unique=True, verbose_name='Normalized Name')),
+                ('visit_count', models.PositiveIntegerField(default=0, verbose_name='Visits')),
+                ('last_visit_at', models.DateTimeField(blank=True, null=True, verbose_name='Last Visit')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Company',
+                'verbose_name_plural': 'Companies',
+                'ordering': ['name'],
+                'indexes': [models.Index(fields=['-visit_count', 'id'], name='visitors_co_visit_c_55f2cd_idx'), models.Index(fields=['-last_visit_at'], name='visitors_co_last_vi_827ae1_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='visitor',
+            name='normalized_company',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='visitors', to='visitors.company', verbose_name='Normalized Company'),
+        ),
+        migrations.CreateModel(
+            name='HostVisitStats',
+            fields=[
+                ('host', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='visit_stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Host')),
+                ('visit_count', models.PositiveIntegerField(default=0, verbose_name='Visits')),
+                ('last_visit_at', models.DateTimeField(blank=True, null=True, verbose_name='Last Visit')),
+            ],
+            options={
+                'verbose_name': 'Host Visit Stats',
+                'verbose_name_plural': 'Host Visit Stats',
+                'indexes': [models.Index(fields=['-visit_count', 'host'], name='visitors_ho_visit_c_8c2aad_idx')],
+            },
+        ),
+    ]
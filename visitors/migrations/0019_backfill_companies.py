@@ -0,0 +1,53 @@
+from django.db import migrations
+from django.db.models import Count, Max, Q
+
+from visitors.utils.companies import clean_company_name, normalize_company_name
+
+VISITED_STATUSES = ('checked_in', 'in_meeting', 'checked_out')
+
+
+def backfill(apps, schema_editor):
+    Company = apps.get_model('visitors', 'Company')
+    HostVisitStats = apps.get_model('visitors', 'HostVisitStats')
+    Visitor = apps.get_model('visitors', 'Visitor')
+
+    companies = {}
+    names = Visitor.objects.exclude(company__isnull=True).values_list('company', flat=True).distinct()
+    for name in names.iterator():
+        key = normalize_company_name(name)
+        if not key:
+            continue
+        if key not in companies:
+            companies[key] = Company.objects.get_or_create(
+                normalized_name=key, defaults={'name': clean_company_name(name)[:100]}
+            )[0]
+        Visitor.objects.filter(company=name).update(normalized_company=companies[key])
+
+    visited = Q(visitors__status__in=VISITED_STATUSES)
+    for company in Company.objects.annotate(
+        visits=Count('visitors', filter=visited),
+        last_visit=Max('visitors__check_in_time', filter=visited),
+    ).iterator():
+        Company.objects.filter(pk=company.pk).update(visit_count=company.visits, last_visit_at=company.last_visit)
+
+    hosts = (
+        Visitor.objects.filter(host__isnull=False, status__in=VISITED_STATUSES)
+        .values('host')
+        .annotate(visits=Count('id'), last_visit=Max('check_in_time'))
+    )
+    for row in hosts.iterator():
+        HostVisitStats.objects.update_or_create(
+            host_id=row['host'],
+            defaults={'visit_count': row['visits'], 'last_visit_at': row['last_visit']}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0018_company_host_visit_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-19 00:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0019_backfill_companies'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='visitor',
+            name='visitors_vi_check_i_436612_idx',
+        ),
+        migrations.AddIndex(
+            model_name='visitor',
+            index=models.Index(fields=['check_in_time', 'id'], name='visitors_vi_check_i_8b359f_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+import logging
+
+from django.db import OperationalError, migrations
+
+from visitors.search import BACKENDS
+
+logger = logging.getLogger(__name__)
+
+
+def install_search_index(apps, schema_editor):
+    backend = BACKENDS.get(schema_editor.connection.vendor)
+    if backend is None:
+        return
+    try:
+        backend.install(schema_editor.connection)
+    except OperationalError:
+        if backend.vendor != 'sqlite':
+            raise
+        logger.warning("SQLite was built without FTS5; visitor search stays unindexed")
+
+
+def uninstall_search_index(apps, schema_editor):
+    backend = BACKENDS.get(schema_editor.connection.vendor)
+    if backend is not None:
+        backend.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0020_visitor_check_in_time_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
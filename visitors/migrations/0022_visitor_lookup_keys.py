@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-19 00:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0021_visitor_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visitor',
+            name='email_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=254, null=True, verbose_name='Normalized Email'),
+        ),
+        migrations.AddField(
+            model_name='visitor',
+            name='id_number_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, verbose_name='ID Number Hash'),
+        ),
+        migrations.AddField(
+            model_name='visitor',
+            name='phone_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=16, null=True, verbose_name='Normalized Phone'),
+        ),
+        migrations.AddIndex(
+            model_name='visitor',
+            index=models.Index(fields=['phone_normalized', '-check_in_time'], name='visitors_vi_phone_n_18b073_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visitor',
+            index=models.Index(fields=['email_normalized', '-check_in_time'], name='visitors_vi_email_n_7ef66d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visitor',
+            index=models.Index(fields=['id_number_hash', '-check_in_time'], name='visitors_vi_id_numb_d02062_idx'),
+        ),
+    ]
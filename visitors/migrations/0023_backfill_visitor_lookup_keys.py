@@ -0,0 +1,31 @@
+from django.db import migrations
+
+from visitors.utils.identity import hash_id_number, normalize_email, normalize_phone
+
+BATCH_SIZE = 1000
+
+
+def backfill(apps, schema_editor):
+    Visitor = apps.get_model('visitors', 'Visitor')
+    batch = []
+    for visitor in Visitor.objects.only('id', 'phone', 'email', 'id_number').iterator(chunk_size=BATCH_SIZE):
+        visitor.phone_normalized = normalize_phone(visitor.phone)
+        visitor.email_normalized = normalize_email(visitor.email)
+        visitor.id_number_hash = hash_id_number(visitor.id_number)
+        batch.append(visitor)
+        if len(batch) >= BATCH_SIZE:
+            Visitor.objects.bulk_update(batch, ['phone_normalized', 'email_normalized', 'id_number_hash'])
+            batch = []
+    if batch:
+        Visitor.objects.bulk_update(batch, ['phone_normalized', 'email_normalized', 'id_number_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0022_visitor_lookup_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-19 00:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0023_backfill_visitor_lookup_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='visitor',
+            index=models.Index(fields=['updated_at'], name='visitors_vi_updated_196df8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visitor',
+            index=models.Index(fields=['status', 'updated_at'], name='visitors_vi_status_f6f074_idx'),
+        ),
+    ]
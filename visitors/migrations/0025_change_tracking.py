@@ -0,0 +1,56 @@
+# Generated by Django 5.2.4 on 2026-10-19 00:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from visitors.search import resume_after_table_rebuild, suspend_for_table_rebuild
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0024_visitor_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(suspend_for_table_rebuild, resume_after_table_rebuild),
+        migrations.CreateModel(
+            name='ChangeCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Name')),
+                ('value', models.BigIntegerField(default=0, verbose_name='Value')),
+            ],
+            options={
+                'verbose_name': 'Change Counter',
+                'verbose_name_plural': 'Change Counters',
+            },
+        ),
+        migrations.AddField(
+            model_name='visitor',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False, verbose_name='Change Sequence'),
+        ),
+        migrations.AddField(
+            model_name='visitorlog',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False, verbose_name='Change Sequence'),
+        ),
+        migrations.CreateModel(
+            name='ChangeTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=30, verbose_name='Kind')),
+                ('object_id', models.BigIntegerField(verbose_name='Object ID')),
+                ('change_seq', models.BigIntegerField(unique=True, verbose_name='Change Sequence')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='Deleted At')),
+                ('owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Owner')),
+            ],
+            options={
+                'verbose_name': 'Change Tombstone',
+                'verbose_name_plural': 'Change Tombstones',
+                'ordering': ['change_seq'],
+            },
+        ),
+        migrations.RunPython(resume_after_table_rebuild, suspend_for_table_rebuild),
+    ]
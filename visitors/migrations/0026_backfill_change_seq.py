@@ -0,0 +1,41 @@
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+# Existing rows are numbered oldest write first, table by table
+SOURCES = [
+    ('visitors', 'Visitor', 'updated_at'),
+    ('visitors', 'VisitorLog', 'timestamp'),
+    ('notifications', 'Notification', 'created_at'),
+]
+
+
+def backfill(apps, schema_editor):
+    seq = 0
+    for app_label, model_name, order in SOURCES:
+        model = apps.get_model(app_label, model_name)
+        batch = []
+        for row in model.objects.only('id').order_by(order, 'id').iterator(chunk_size=BATCH_SIZE):
+            seq += 1
+            row.change_seq = seq
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                model.objects.bulk_update(batch, ['change_seq'])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, ['change_seq'])
+
+    ChangeCounter = apps.get_model('visitors', 'ChangeCounter')
+    ChangeCounter.objects.update_or_create(name='changes', defaults={'value': seq})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0025_change_tracking'),
+        ('notifications', '0006_notification_change_seq'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-19 00:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from visitors.search import resume_after_table_rebuild, suspend_for_table_rebuild
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0026_backfill_change_seq'),
+    ]
+
+    operations = [
+        migrations.RunPython(suspend_for_table_rebuild, resume_after_table_rebuild),
+        migrations.AddField(
+            model_name='visitor',
+            name='offline_checkin',
+            field=models.BooleanField(default=False, verbose_name='Checked In Offline'),
+        ),
+        migrations.CreateModel(
+            name='KioskSyncEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device_id', models.CharField(max_length=64, verbose_name='Device ID')),
+                ('idempotency_key', models.CharField(max_length=64, verbose_name='Idempotency Key')),
+                ('event_type', models.CharField(choices=[('check_in', 'Check-in'), ('check_out', 'Check-out'), ('walk_in', 'Walk-in')], max_length=20, verbose_name='Event Type')),
+                ('occurred_at', models.DateTimeField(blank=True, null=True, verbose_name='Occurred At (device time)')),
+                ('outcome', models.CharField(choices=[('applied', 'Applied'), ('rejected', 'Rejected')], max_length=20, verbose_name='Outcome')),
+                ('result', models.JSONField(default=dict, verbose_name='Result')),
+                ('received_at', models.DateTimeField(auto_now_add=True, verbose_name='Received At')),
+                ('visitor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='kiosk_sync_events', to='visitors.visitor', verbose_name='Visitor')),
+            ],
+            options={
+                'verbose_name': 'Kiosk Sync Event',
+                'verbose_name_plural': 'Kiosk Sync Events',
+                'constraints': [models.UniqueConstraint(fields=('device_id', 'idempotency_key'), name='unique_kiosk_sync_event_key')],
+            },
+        ),
+        migrations.RunPython(resume_after_table_rebuild, suspend_for_table_rebuild),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-19 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0027_kiosk_sync_events'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='visitorlog',
+            index=models.Index(fields=['timestamp'], name='visitors_vi_timesta_ff7e40_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visitorlog',
+            index=models.Index(fields=['action', 'timestamp'], name='visitors_vi_action_1516c2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visitorlog',
+            index=models.Index(fields=['visitor', 'timestamp'], name='visitors_vi_visitor_3ac8fb_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-19 00:41
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0028_visitorlog_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='visitorlog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Timestamp'),
+        ),
+        migrations.AlterField(
+            model_name='visitorlog',
+            name='visitor',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='logs', to='visitors.visitor', verbose_name='Visitor'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-19 00:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0029_visitorlog_audit_writes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visitorlog',
+            name='branch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='visitors.branch', verbose_name='Branch'),
+        ),
+        migrations.AddField(
+            model_name='visitorlog',
+            name='channel',
+            field=models.CharField(blank=True, max_length=30, null=True, verbose_name='Channel'),
+        ),
+        migrations.AddField(
+            model_name='visitorlog',
+            name='device_id',
+            field=models.CharField(blank=True, max_length=100, null=True, verbose_name='Device ID'),
+        ),
+        migrations.AddField(
+            model_name='visitorlog',
+            name='payload',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Payload'),
+        ),
+        migrations.AlterField(
+            model_name='visitorlog',
+            name='action',
+            field=models.CharField(choices=[('pre_register', 'Pre-Registered'), ('check_in', 'Checked In'), ('check_out', 'Checked Out'), ('status_change', 'Status Changed'), ('document_upload', 'Document Uploaded'), ('blacklisted', 'Blacklisted'), ('notification_sent', 'Notification Sent')], max_length=50, verbose_name='Action'),
+        ),
+        migrations.AddIndex(
+            model_name='visitorlog',
+            index=models.Index(fields=['device_id', 'timestamp'], name='visitors_vi_device__995133_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visitorlog',
+            index=models.Index(fields=['branch', 'timestamp'], name='visitors_vi_branch__094f50_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visitorlog',
+            index=models.Index(fields=['channel', 'timestamp'], name='visitors_vi_channel_ebedb9_idx'),
+        ),
+    ]
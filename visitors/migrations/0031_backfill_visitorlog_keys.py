@@ -0,0 +1,56 @@
+import re
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 1000
+
+# Device ids embedded in the free-text details written before payloads
+DEVICE_PATTERNS = {
+    'QR_CHECK_IN': (re.compile(r' from device (\S+)$'), 'qr'),
+    'check_in': (re.compile(r' on kiosk (\S+) at '), 'offline_sync'),
+    'check_out': (re.compile(r' on kiosk (\S+) at '), 'offline_sync'),
+}
+CHANNELS = {
+    'KIOSK_CHECK_IN': 'kiosk',
+    'OFFLINE_CHECKIN': 'offline',
+}
+
+
+def backfill(apps, schema_editor):
+    VisitorLog = apps.get_model('visitors', 'VisitorLog')
+    Visitor = apps.get_model('visitors', 'Visitor')
+
+    VisitorLog.objects.filter(visitor__isnull=False, branch__isnull=True).update(
+        branch_id=Subquery(Visitor.objects.filter(pk=OuterRef('visitor_id')).values('branch_id')[:1])
+    )
+    for action, channel in CHANNELS.items():
+        VisitorLog.objects.filter(action=action, channel__isnull=True).update(channel=channel)
+
+    batch = []
+    rows = VisitorLog.objects.filter(
+        action__in=list(DEVICE_PATTERNS), device_id__isnull=True, details__isnull=False
+    ).only('id', 'action', 'details').iterator(chunk_size=BATCH_SIZE)
+    for row in rows:
+        pattern, channel = DEVICE_PATTERNS[row.action]
+        match = pattern.search(row.details)
+        if match:
+            row.device_id = match.group(1)[:100]
+            row.channel = channel
+            batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            VisitorLog.objects.bulk_update(batch, ['device_id', 'channel'])
+            batch = []
+    if batch:
+        VisitorLog.objects.bulk_update(batch, ['device_id', 'channel'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0030_visitorlog_payload'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-19 00:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0031_backfill_visitorlog_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('xlsx', 'Excel (XLSX)'), ('parquet', 'Parquet')], max_length=10, verbose_name='Format')),
+                ('filters', models.JSONField(default=dict, verbose_name='Filters')),
+                ('fingerprint', models.CharField(max_length=40, verbose_name='Fingerprint')),
+                ('data_version', models.CharField(max_length=40, verbose_name='Data Version')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='queued', max_length=20, verbose_name='Status')),
+                ('rows_total', models.PositiveIntegerField(default=0, verbose_name='Rows Total')),
+                ('rows_written', models.PositiveIntegerField(default=0, verbose_name='Rows Written')),
+                ('file', models.FileField(blank=True, null=True, upload_to='exports/%Y/%m/', verbose_name='File')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Created By')),
+            ],
+            options={
+                'verbose_name': 'Export Job',
+                'verbose_name_plural': 'Export Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['fingerprint', 'status'], name='visitors_ex_fingerp_5890b9_idx'), models.Index(fields=['status', 'created_at'], name='visitors_ex_status_051670_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('fingerprint',), name='unique_active_export_job')],
+            },
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.4 on 2026-10-19 00:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0032_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollCall',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(blank=True, max_length=100, verbose_name='Reason')),
+                ('status', models.CharField(choices=[('open', 'Open'), ('closed', 'Closed')], default='open', max_length=10, verbose_name='Status')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Total')),
+                ('accounted', models.PositiveIntegerField(default=0, verbose_name='Accounted')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Version')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='Started At')),
+                ('closed_at', models.DateTimeField(blank=True, null=True, verbose_name='Closed At')),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='roll_calls', to='visitors.branch', verbose_name='Branch')),
+                ('started_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Started By')),
+            ],
+            options={
+                'verbose_name': 'Roll Call',
+                'verbose_name_plural': 'Roll Calls',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AssemblyPointCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assembly_point', models.CharField(max_length=100, verbose_name='Assembly Point')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Count')),
+                ('roll_call', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assembly_counts', to='visitors.rollcall', verbose_name='Roll Call')),
+            ],
+            options={
+                'verbose_name': 'Assembly Point Count',
+                'verbose_name_plural': 'Assembly Point Counts',
+            },
+        ),
+        migrations.CreateModel(
+            name='RollCallEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('full_name', models.CharField(max_length=201, verbose_name='Full Name')),
+                ('company', models.CharField(blank=True, max_length=100, verbose_name='Company')),
+                ('host_name', models.CharField(blank=True, max_length=301, verbose_name='Host Name')),
+                ('badge_number', models.CharField(blank=True, max_length=20, verbose_name='Badge Number')),
+                ('thumbnail', models.CharField(blank=True, max_length=255, verbose_name='Thumbnail')),
+                ('status', models.CharField(choices=[('unaccounted', 'Unaccounted'), ('accounted', 'Accounted')], default='unaccounted', max_length=20, verbose_name='Status')),
+                ('assembly_point', models.CharField(blank=True, max_length=100, verbose_name='Assembly Point')),
+                ('accounted_at', models.DateTimeField(blank=True, null=True, verbose_name='Accounted At')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Version')),
+                ('accounted_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Accounted By')),
+                ('roll_call', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='visitors.rollcall', verbose_name='Roll Call')),
+                ('visitor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='visitors.visitor', verbose_name='Visitor')),
+            ],
+            options={
+                'verbose_name': 'Roll Call Entry',
+                'verbose_name_plural': 'Roll Call Entries',
+                'ordering': ['full_name', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='rollcall',
+            index=models.Index(fields=['status', 'branch'], name='visitors_ro_status_15390e_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='assemblypointcount',
+            constraint=models.UniqueConstraint(fields=('roll_call', 'assembly_point'), name='unique_roll_call_assembly_point'),
+        ),
+        migrations.AddIndex(
+            model_name='rollcallentry',
+            index=models.Index(fields=['roll_call', 'version'], name='visitors_ro_roll_ca_b4e4c6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rollcallentry',
+            index=models.Index(fields=['roll_call', 'status'], name='visitors_ro_roll_ca_4e4d5d_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:13
+
+import visitors.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0034_create_cache_table'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='file',
+            field=models.FileField(blank=True, null=True, storage=visitors.models.export_storage, upload_to='%Y/%m/', verbose_name='File'),
+        ),
+    ]
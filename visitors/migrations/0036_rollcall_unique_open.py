@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:14
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def close_duplicate_open_roll_calls(apps, schema_editor):
+    # Keep the newest open roll call per branch so the constraint can be added
+    RollCall = apps.get_model('visitors', 'RollCall')
+    seen = set()
+    duplicates = []
+    for pk, branch_id in RollCall.objects.filter(status='open').order_by('-started_at', '-id').values_list('id', 'branch_id'):
+        if branch_id in seen:
+            duplicates.append(pk)
+        seen.add(branch_id)
+    RollCall.objects.filter(pk__in=duplicates).update(status='closed', closed_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visitors', '0035_exportjob_private_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(close_duplicate_open_roll_calls, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='rollcall',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('branch', models.Value(0), output_field=models.BigIntegerField()), condition=models.Q(('status', 'open')), name='unique_open_roll_call'),
+        ),
+    ]
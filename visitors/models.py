@@ -1,12 +1,24 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.conf import settings
 from django.core.files import File
+from django.core.files.storage import FileSystemStorage
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import RegexValidator
+from django.utils import timezone
 from io import BytesIO
+from string import Formatter
 import qrcode
 import uuid
 
+from .utils.archive import month_bounds
+from .utils.companies import clean_company_name, normalize_company_name
+from .utils.identity import hash_id_number, normalize_email, normalize_phone
+from .utils.quantile_sketch import DurationSketch
+from .utils.versioned_cache import GenerationCache
+
 
 class CustomUserManager(BaseUserManager):
     """Custom user manager that uses email instead of username with enhanced superuser creation"""
@@ -162,7 +174,176 @@ class Branch(models.Model):
         return self.name
 
 
-class Visitor(models.Model):
+class ChangeCounter(models.Model):
+    """
+    Named monotonically increasing counters. ``changes`` numbers every
+    write to a change-tracked model; ``tombstone_horizon`` is the highest
+    change sequence whose tombstones have been pruned.
+    """
+    CHANGES = 'changes'
+    TOMBSTONE_HORIZON = 'tombstone_horizon'
+
+    name = models.CharField(
+        max_length=50,
+        primary_key=True,
+        verbose_name=_("Name")
+    )
+    value = models.BigIntegerField(
+        default=0,
+        verbose_name=_("Value")
+    )
+
+    class Meta:
+        verbose_name = _("Change Counter")
+        verbose_name_plural = _("Change Counters")
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+    @classmethod
+    def allocate(cls, count=1, name=CHANGES):
+        """
+        Reserves ``count`` sequence numbers and returns the last one.
+
+        The counter row stays write-locked until the caller's transaction
+        commits, so sequence numbers become visible in commit order and a
+        reader never sees a change numbered after one still in flight.
+        """
+        with transaction.atomic():
+            if not cls.objects.filter(name=name).update(value=F('value') + count):
+                cls.objects.get_or_create(name=name)
+                cls.objects.filter(name=name).update(value=F('value') + count)
+            return cls.objects.filter(name=name).values_list('value', flat=True).get()
+
+    @classmethod
+    def current(cls, name=CHANGES):
+        return cls.objects.filter(name=name).values_list('value', flat=True).first() or 0
+
+
+class ChangeTracked(models.Model):
+    """
+    Stamps every save with a fresh change sequence number, which delta
+    sync (``visitors.sync``) pages through. Saves take the counter lock, so
+    ``queryset.update()`` and ``bulk_create`` must set ``change_seq`` from
+    ``ChangeCounter.allocate()`` themselves.
+    """
+    change_seq = models.BigIntegerField(
+        default=0,
+        db_index=True,
+        editable=False,
+        verbose_name=_("Change Sequence")
+    )
+
+    class Meta:
+        abstract = True
+
+    @staticmethod
+    def stamp_change_seqs(objects):
+        """
+        Gives rows about to be bulk written consecutive fresh change
+        sequences. Call it in the transaction that writes them.
+        """
+        objects = list(objects)
+        if objects:
+            last_seq = ChangeCounter.allocate(len(objects))
+            for seq, obj in enumerate(objects, start=last_seq - len(objects) + 1):
+                obj.change_seq = seq
+        return objects
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            self.change_seq = ChangeCounter.allocate()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'change_seq'}
+            super().save(*args, **kwargs)
+
+
+class ChangeTombstone(models.Model):
+    """Records a deleted change-tracked row so sync clients can drop their copy"""
+    kind = models.CharField(
+        max_length=30,
+        verbose_name=_("Kind")
+    )
+    object_id = models.BigIntegerField(
+        verbose_name=_("Object ID")
+    )
+    owner = models.ForeignKey(
+        'CustomUser',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_("Owner")
+    )
+    change_seq = models.BigIntegerField(
+        unique=True,
+        verbose_name=_("Change Sequence")
+    )
+    deleted_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Deleted At")
+    )
+
+    class Meta:
+        verbose_name = _("Change Tombstone")
+        verbose_name_plural = _("Change Tombstones")
+        ordering = ['change_seq']
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id} deleted (seq {self.change_seq})"
+
+
+class Company(models.Model):
+    """Normalized company that visitors come from, with its running visit counter"""
+    name = models.CharField(
+        max_length=100,
+        verbose_name=_("Name")
+    )
+    normalized_name = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name=_("Normalized Name")
+    )
+    visit_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Visits")
+    )
+    last_visit_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name=_("Last Visit")
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Created At")
+    )
+
+    class Meta:
+        verbose_name = _("Company")
+        verbose_name_plural = _("Companies")
+        ordering = ['name']
+        indexes = [
+            models.Index(fields=['-visit_count', 'id']),
+            models.Index(fields=['-last_visit_at']),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def for_name(cls, name):
+        """Returns the company matching ``name``, creating it on first sight."""
+        key = normalize_company_name(name)
+        if not key:
+            return None
+        company, _ = cls.objects.get_or_create(
+            normalized_name=key,
+            defaults={'name': clean_company_name(name)[:100]}
+        )
+        return company
+
+
+class Visitor(ChangeTracked):
     """Model representing a visitor"""
     class Status(models.TextChoices):
         PRE_REGISTERED = 'pre_registered', _('Pre-Registered')
@@ -208,12 +389,42 @@ class Visitor(models.Model):
         null=True,
         verbose_name=_("Company")
     )
+    normalized_company = models.ForeignKey(
+        Company,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='visitors',
+        verbose_name=_("Normalized Company")
+    )
     id_number = models.CharField(
         max_length=50,
         blank=True,
         null=True,
         verbose_name=_("ID/Passport Number")
     )
+    # Normalized lookup keys for returning visitors, derived on save
+    phone_normalized = models.CharField(
+        max_length=16,
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name=_("Normalized Phone")
+    )
+    email_normalized = models.CharField(
+        max_length=254,
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name=_("Normalized Email")
+    )
+    id_number_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name=_("ID Number Hash")
+    )
     id_type = models.CharField(
         max_length=30,
         blank=True,
@@ -316,6 +527,10 @@ class Visitor(models.Model):
         default=False,
         verbose_name=_("Badge Printed")
     )
+    offline_checkin = models.BooleanField(
+        default=False,
+        verbose_name=_("Checked In Offline")
+    )
     badge_number = models.CharField(
         max_length=20,
         blank=True,
@@ -337,9 +552,17 @@ class Visitor(models.Model):
         ordering = ['-check_in_time']
         indexes = [
             models.Index(fields=['status']),
-            models.Index(fields=['check_in_time']),
+            # Keyset pagination seeks on (check_in_time, id)
+            models.Index(fields=['check_in_time', 'id']),
             models.Index(fields=['host']),
             models.Index(fields=['visitor_type']),
+            # Conditional GET validators: MAX(updated_at), overall and per status list
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['status', 'updated_at']),
+            # Returning-visitor lookups: latest visit for a phone, email or ID
+            models.Index(fields=['phone_normalized', '-check_in_time']),
+            models.Index(fields=['email_normalized', '-check_in_time']),
+            models.Index(fields=['id_number_hash', '-check_in_time']),
         ]
 
     def __str__(self):
@@ -357,7 +580,33 @@ class Visitor(models.Model):
         return None
     duration.fget.short_description = _("Visit Duration")
 
+    # Statuses that mean the visitor actually arrived; entering one of these
+    # from a new or pre-registered visitor counts as a check-in.
+    VISITED_STATUSES = (Status.CHECKED_IN, Status.IN_MEETING, Status.CHECKED_OUT)
+    # Loaded values remembered so save() (and post_save receivers) can tell what changed
+    TRACKED_FIELDS = ('company', 'status', 'branch_id')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values)
+            if name in cls.TRACKED_FIELDS and value is not models.DEFERRED
+        }
+        return instance
+
     def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_values', {})
+        deferred = self.get_deferred_fields()
+        if 'company' not in deferred and (self._state.adding or self.company != loaded.get('company')):
+            self.normalized_company = Company.for_name(self.company)
+        self._normalize_lookup_keys(deferred)
+        checking_in = (
+            'status' not in deferred
+            and self.status in self.VISITED_STATUSES
+            and loaded.get('status', self.Status.PRE_REGISTERED) == self.Status.PRE_REGISTERED
+        )
+
         if not self.qr_code:
             self.qr_code = f"KREP-{uuid.uuid4().hex[:8].upper()}"
             qr = qrcode.QRCode(
@@ -374,10 +623,83 @@ class Visitor(models.Model):
             filename = f"{self.qr_code}.png"
             buffer.seek(0)
             self.qr_image.save(filename, File(buffer), save=False)
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if checking_in:
+                self._record_check_in()
+        self._loaded_values = {
+            name: getattr(self, name) for name in self.TRACKED_FIELDS if name not in deferred
+        }
+
+    def _normalize_lookup_keys(self, deferred=()):
+        if 'phone' not in deferred:
+            self.phone_normalized = normalize_phone(self.phone)
+        if 'email' not in deferred:
+            self.email_normalized = normalize_email(self.email)
+        if 'id_number' not in deferred:
+            self.id_number_hash = hash_id_number(self.id_number)
+
+    @classmethod
+    def find_returning(cls, phone=None, email=None, id_number=None, last_name=None):
+        """
+        Returns the most recent visit matching the phone, else the email,
+        else the ID number, or None. Each key is one index seek. With
+        ``last_name``, only a visit under that last name (any case) matches.
+        """
+        lookups = (
+            ('phone_normalized', normalize_phone(phone)),
+            ('email_normalized', normalize_email(email)),
+            ('id_number_hash', hash_id_number(id_number)),
+        )
+        for field, value in lookups:
+            visitor = value and cls.objects.filter(**{field: value}).order_by('-check_in_time').first()
+            if visitor and (last_name is None or visitor.last_name.strip().lower() == last_name.strip().lower()):
+                return visitor
+        return None
 
+    def _record_check_in(self):
+        """Bumps the company and host visit counters behind the leaderboards."""
+        type(self).record_check_ins([self])
 
-class VisitorLog(models.Model):
+    @classmethod
+    def record_check_ins(cls, visitors):
+        """Counts check-ins for many visitors with one UPDATE per company and host."""
+        companies, hosts = {}, {}
+        for visitor in visitors:
+            when = visitor.check_in_time or timezone.now()
+            for counters, key in ((companies, visitor.normalized_company_id), (hosts, visitor.host_id)):
+                if key:
+                    count, latest = counters.get(key, (0, when))
+                    counters[key] = (count + 1, max(latest, when))
+
+        for pk, (count, when) in companies.items():
+            Company.objects.filter(pk=pk).update(
+                visit_count=F('visit_count') + count,
+                last_visit_at=Greatest(Coalesce('last_visit_at', Value(when)), Value(when)),
+            )
+        for host_id, (count, when) in hosts.items():
+            HostVisitStats.objects.get_or_create(host_id=host_id)
+            HostVisitStats.objects.filter(host_id=host_id).update(
+                visit_count=F('visit_count') + count,
+                last_visit_at=Greatest(Coalesce('last_visit_at', Value(when)), Value(when)),
+            )
+
+
+class VisitorLogQuerySet(models.QuerySet):
+    def in_month(self, month):
+        """
+        Logs written in the local calendar month containing ``month``. The
+        bounded timestamp range is a range scan on the timestamp index and,
+        on a partitioned PostgreSQL table, touches a single partition.
+        """
+        start, end = month_bounds(month)
+        return self.filter(timestamp__gte=start, timestamp__lt=end)
+
+    def current_month(self):
+        return self.in_month(timezone.localdate())
+
+
+class VisitorLog(ChangeTracked):
     """Model representing logs for visitor actions"""
     class Action(models.TextChoices):
         PRE_REGISTER = 'pre_register', _('Pre-Registered')
@@ -388,41 +710,670 @@ class VisitorLog(models.Model):
         BLACKLISTED = 'blacklisted', _('Blacklisted')
         NOTIFICATION_SENT = 'notification_sent', _('Notification Sent')
 
+    # Null for audit events without a visitor (logins, emergency reports...)
     visitor = models.ForeignKey(
         Visitor,
         on_delete=models.CASCADE,
+        null=True,
+        blank=True,
         related_name='logs',
         verbose_name=_("Visitor")
     )
     action = models.CharField(
-        max_length=20,
+        max_length=50,
         choices=Action.choices,
         verbose_name=_("Action")
     )
+    # Free text from older entries; new entries render it from the payload
     details = models.TextField(
         blank=True,
         null=True,
         verbose_name=_("Details")
     )
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name=_("Payload")
+    )
+    # Payload keys extracted into indexed columns
+    device_id = models.CharField(
+        max_length=100,
+        blank=True,
+        null=True,
+        verbose_name=_("Device ID")
+    )
+    branch = models.ForeignKey(
+        Branch,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_("Branch")
+    )
+    channel = models.CharField(
+        max_length=30,
+        blank=True,
+        null=True,
+        verbose_name=_("Channel")
+    )
     user = models.ForeignKey(
         CustomUser,
         on_delete=models.SET_NULL,
         null=True,
         verbose_name=_("Performed By")
     )
+    # Set when the event happens, not when a buffered write reaches the table
     timestamp = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         verbose_name=_("Timestamp")
     )
 
+    objects = VisitorLogQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Visitor Log")
         verbose_name_plural = _("Visitor Logs")
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['timestamp']),
+            models.Index(fields=['action', 'timestamp']),
+            # Per-visitor history, newest first
+            models.Index(fields=['visitor', 'timestamp']),
+            models.Index(fields=['device_id', 'timestamp']),
+            models.Index(fields=['branch', 'timestamp']),
+            models.Index(fields=['channel', 'timestamp']),
+        ]
+
+    # Display text per action, formatted from the payload and extracted keys
+    DETAIL_TEMPLATES = {
+        'QR_CHECK_IN': "Checked in via QR from device {device_id}",
+        'KIOSK_CHECK_IN': "Checked in via kiosk",
+        'OFFLINE_CHECKIN': "Synchronized from offline kiosk",
+        'check_in': "Offline {event_type} on kiosk {device_id} at {occurred_at}",
+        'check_out': "Offline {event_type} on kiosk {device_id} at {occurred_at}",
+        'NOTIFICATION_SENT': "Notification via {channels}: {message}",
+        'MANUAL_NOTIFICATION': "Manual notification to {target}: {message}",
+        'BULK_NOTIFICATION': "Bulk notification to {recipients} users",
+        'USER_LOGIN': "User logged in: {email}",
+        'USER_LOGOUT': "User logged out: {email}",
+        'USER_REGISTER': "New user registered: {email}",
+        'EMERGENCY_REPORT_GENERATED': "Emergency report generated with {visitor_count} visitors",
+        'EMERGENCY_PDF_GENERATED': "Generated PDF report with {visitor_count} visitors",
+        'EMERGENCY_NOTIFICATION_SENT': "Sent {emergency_type} alert via {channels} to {successful}/{hosts} hosts",
+        'ROLL_CALL_STARTED': "Roll call #{roll_call} started with {total} people on site",
+        'ROLL_CALL_ACCOUNTED': "Accounted at {assembly_point} in roll call #{roll_call}",
+        'ROLL_CALL_UNACCOUNTED': "Marked unaccounted in roll call #{roll_call}",
+        'ROLL_CALL_CLOSED': "Roll call #{roll_call} closed with {accounted}/{total} accounted",
+    }
 
     def __str__(self):
         return f"{self.visitor} - {self.get_action_display()} @ {self.timestamp}"
 
+    @property
+    def display_details(self):
+        """Human-readable details, rendered on demand from the payload."""
+        return render_log_details({
+            'action': self.action,
+            'details': self.details,
+            'payload': self.payload,
+            'device_id': self.device_id,
+            'branch_id': self.branch_id,
+            'channel': self.channel,
+        }, user_email=self.user.email if self.user_id else None)
+
+
+def render_log_details(entry, user_email=None):
+    """
+    Display text of a visitor log entry given as a dict with ``action``,
+    ``details``, ``payload``, ``device_id``, ``branch_id`` and ``channel``:
+    a model row, a sync row or an archived entry alike (segments written
+    before payloads existed lack all but ``details``).
+    """
+    if entry['details']:
+        return entry['details']
+    values = {
+        **(entry.get('payload') or {}),
+        'device_id': entry.get('device_id'),
+        'branch': entry.get('branch_id'),
+        'channel': entry.get('channel'),
+    }
+    template = VisitorLog.DETAIL_TEMPLATES.get(entry['action'])
+    if template and all(
+        values.get(name) is not None for _, name, _, _ in Formatter().parse(template) if name
+    ):
+        return template.format(**{
+            key: ', '.join(map(str, value)) if isinstance(value, list) else value
+            for key, value in values.items()
+        })
+    extra = ', '.join(f"{key}={value}" for key, value in values.items() if value not in (None, ''))
+    by = f" by {user_email}" if user_email else ""
+    return f"{entry['action']}{by}" + (f" ({extra})" if extra else "")
+
+
+class KioskSyncEvent(models.Model):
+    """
+    An offline kiosk event already processed, keyed by the kiosk's
+    idempotency key. Replaying the event returns the stored result.
+    """
+    class EventType(models.TextChoices):
+        CHECK_IN = 'check_in', _('Check-in')
+        CHECK_OUT = 'check_out', _('Check-out')
+        WALK_IN = 'walk_in', _('Walk-in')
+
+    class Outcome(models.TextChoices):
+        APPLIED = 'applied', _('Applied')
+        REJECTED = 'rejected', _('Rejected')
+
+    device_id = models.CharField(
+        max_length=64,
+        verbose_name=_("Device ID")
+    )
+    idempotency_key = models.CharField(
+        max_length=64,
+        verbose_name=_("Idempotency Key")
+    )
+    event_type = models.CharField(
+        max_length=20,
+        choices=EventType.choices,
+        verbose_name=_("Event Type")
+    )
+    occurred_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Occurred At (device time)")
+    )
+    visitor = models.ForeignKey(
+        Visitor,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='kiosk_sync_events',
+        verbose_name=_("Visitor")
+    )
+    outcome = models.CharField(
+        max_length=20,
+        choices=Outcome.choices,
+        verbose_name=_("Outcome")
+    )
+    result = models.JSONField(
+        default=dict,
+        verbose_name=_("Result")
+    )
+    received_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Received At")
+    )
+
+    class Meta:
+        verbose_name = _("Kiosk Sync Event")
+        verbose_name_plural = _("Kiosk Sync Events")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['device_id', 'idempotency_key'],
+                name='unique_kiosk_sync_event_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.device_id}/{self.idempotency_key} {self.event_type} ({self.outcome})"
+
+
+def export_storage():
+    # Private: not under MEDIA_ROOT, which is served without authentication
+    return FileSystemStorage(location=settings.EXPORT_ROOT)
+
+
+class ExportJob(models.Model):
+    """
+    A visitor export written in the background. Identical requests by the
+    same user share a ``fingerprint`` (user, format and filters); a
+    finished job is reused while the filtered rows still have the same
+    ``data_version``.
+    """
+    class Format(models.TextChoices):
+        CSV = 'csv', _('CSV')
+        XLSX = 'xlsx', _('Excel (XLSX)')
+        PARQUET = 'parquet', _('Parquet')
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', _('Queued')
+        RUNNING = 'running', _('Running')
+        COMPLETED = 'completed', _('Completed')
+        FAILED = 'failed', _('Failed')
+
+    format = models.CharField(
+        max_length=10,
+        choices=Format.choices,
+        verbose_name=_("Format")
+    )
+    filters = models.JSONField(
+        default=dict,
+        verbose_name=_("Filters")
+    )
+    fingerprint = models.CharField(
+        max_length=40,
+        verbose_name=_("Fingerprint")
+    )
+    data_version = models.CharField(
+        max_length=40,
+        verbose_name=_("Data Version")
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.QUEUED,
+        verbose_name=_("Status")
+    )
+    rows_total = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Rows Total")
+    )
+    rows_written = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Rows Written")
+    )
+    file = models.FileField(
+        upload_to='%Y/%m/',
+        storage=export_storage,
+        null=True,
+        blank=True,
+        verbose_name=_("File")
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name=_("Error")
+    )
+    created_by = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='export_jobs',
+        verbose_name=_("Created By")
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Created At")
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Started At")
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Finished At")
+    )
+
+    class Meta:
+        verbose_name = _("Export Job")
+        verbose_name_plural = _("Export Jobs")
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['fingerprint', 'status']),
+            models.Index(fields=['status', 'created_at']),
+        ]
+        constraints = [
+            # At most one queued or running job per identical request
+            models.UniqueConstraint(
+                fields=['fingerprint'],
+                condition=models.Q(status__in=['queued', 'running']),
+                name='unique_active_export_job'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.format} export #{self.pk} ({self.status})"
+
+    @property
+    def progress(self):
+        if self.status == self.Status.COMPLETED:
+            return 1.0
+        return round(self.rows_written / self.rows_total, 4) if self.rows_total else 0.0
+
+
+class RollCall(models.Model):
+    """
+    An evacuation roll call over everyone on site when it started. Wardens
+    mark entries accounted at an assembly point; ``total``, ``accounted``
+    and the per-point counts are kept up to date on every mark, and
+    ``version`` increases with each one so clients can fetch what changed.
+    """
+    class Status(models.TextChoices):
+        OPEN = 'open', _('Open')
+        CLOSED = 'closed', _('Closed')
+
+    branch = models.ForeignKey(
+        Branch,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='roll_calls',
+        verbose_name=_("Branch")
+    )
+    reason = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name=_("Reason")
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.OPEN,
+        verbose_name=_("Status")
+    )
+    total = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Total")
+    )
+    accounted = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Accounted")
+    )
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name=_("Version")
+    )
+    started_by = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_("Started By")
+    )
+    started_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Started At")
+    )
+    closed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Closed At")
+    )
+
+    class Meta:
+        verbose_name = _("Roll Call")
+        verbose_name_plural = _("Roll Calls")
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['status', 'branch']),
+        ]
+        constraints = [
+            # At most one open roll call per branch; the site-wide one
+            # (branch NULL) counts as 0, since nulls_distinct=False is a
+            # no-op on SQLite
+            models.UniqueConstraint(
+                Coalesce('branch', Value(0), output_field=models.BigIntegerField()),
+                condition=models.Q(status='open'),
+                name='unique_open_roll_call'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Roll call #{self.pk} ({self.accounted}/{self.total}, {self.status})"
+
+
+class RollCallEntry(models.Model):
+    """
+    One person on a roll call. Display fields are copied from the visitor
+    when the roll call starts, so the list never joins back to visitors.
+    """
+    class Status(models.TextChoices):
+        UNACCOUNTED = 'unaccounted', _('Unaccounted')
+        ACCOUNTED = 'accounted', _('Accounted')
+
+    roll_call = models.ForeignKey(
+        RollCall,
+        on_delete=models.CASCADE,
+        related_name='entries',
+        verbose_name=_("Roll Call")
+    )
+    visitor = models.ForeignKey(
+        Visitor,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_("Visitor")
+    )
+    full_name = models.CharField(
+        max_length=201,
+        verbose_name=_("Full Name")
+    )
+    company = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name=_("Company")
+    )
+    host_name = models.CharField(
+        max_length=301,
+        blank=True,
+        verbose_name=_("Host Name")
+    )
+    badge_number = models.CharField(
+        max_length=20,
+        blank=True,
+        verbose_name=_("Badge Number")
+    )
+    thumbnail = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name=_("Thumbnail")
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.UNACCOUNTED,
+        verbose_name=_("Status")
+    )
+    assembly_point = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name=_("Assembly Point")
+    )
+    accounted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Accounted At")
+    )
+    accounted_by = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_("Accounted By")
+    )
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name=_("Version")
+    )
+
+    class Meta:
+        verbose_name = _("Roll Call Entry")
+        verbose_name_plural = _("Roll Call Entries")
+        ordering = ['full_name', 'id']
+        indexes = [
+            models.Index(fields=['roll_call', 'version']),
+            models.Index(fields=['roll_call', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.full_name} ({self.status})"
+
+
+class AssemblyPointCount(models.Model):
+    """People accounted at one assembly point of a roll call."""
+    roll_call = models.ForeignKey(
+        RollCall,
+        on_delete=models.CASCADE,
+        related_name='assembly_counts',
+        verbose_name=_("Roll Call")
+    )
+    assembly_point = models.CharField(
+        max_length=100,
+        verbose_name=_("Assembly Point")
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Count")
+    )
+
+    class Meta:
+        verbose_name = _("Assembly Point Count")
+        verbose_name_plural = _("Assembly Point Counts")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['roll_call', 'assembly_point'],
+                name='unique_roll_call_assembly_point'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.assembly_point}: {self.count}"
+
+
+class VisitDurationSketch(models.Model):
+    """Daily mergeable quantile sketch of visit durations per branch, host and visitor type"""
+    day = models.DateField(
+        verbose_name=_("Day")
+    )
+    branch = models.ForeignKey(
+        Branch,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='duration_sketches',
+        verbose_name=_("Branch")
+    )
+    host = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='duration_sketches',
+        verbose_name=_("Host")
+    )
+    visitor_type = models.CharField(
+        max_length=20,
+        choices=Visitor.VisitorType.choices,
+        verbose_name=_("Visitor Type")
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Completed Visits")
+    )
+    sketch = models.JSONField(
+        default=dict,
+        verbose_name=_("Sketch Data")
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_("Updated At")
+    )
+
+    class Meta:
+        verbose_name = _("Visit Duration Sketch")
+        verbose_name_plural = _("Visit Duration Sketches")
+        ordering = ['-day']
+        indexes = [
+            models.Index(fields=['day', 'branch', 'host', 'visitor_type']),
+            models.Index(fields=['host', 'day']),
+            models.Index(fields=['branch', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.day} - {self.visitor_type} ({self.count})"
+
+    def to_sketch(self):
+        if self.sketch:
+            return DurationSketch.from_dict(self.sketch)
+        return DurationSketch()
+
+    @classmethod
+    def record_visit(cls, visitor):
+        """
+        Adds a completed visit to its (day, branch, host, visitor type) sketch.
+        Rows are not unique on purpose: duplicates created by concurrent
+        check-outs are simply merged on read.
+        """
+        rows = cls.record_visits([visitor])
+        return rows[0] if rows else None
+
+    @classmethod
+    def record_visits(cls, visitors):
+        """Adds many completed visits, touching each sketch row once."""
+        durations = {}
+        for visitor in visitors:
+            if not (visitor.check_in_time and visitor.check_out_time):
+                continue
+            key = (
+                timezone.localdate(visitor.check_in_time),
+                visitor.branch_id,
+                visitor.host_id,
+                visitor.visitor_type,
+            )
+            durations.setdefault(key, []).append(
+                (visitor.check_out_time - visitor.check_in_time).total_seconds()
+            )
+
+        rows = []
+        with transaction.atomic():
+            for (day, branch_id, host_id, visitor_type), seconds in durations.items():
+                key = {'day': day, 'branch_id': branch_id, 'host_id': host_id, 'visitor_type': visitor_type}
+                row = cls.objects.select_for_update().filter(**key).first() or cls(**key)
+                sketch = row.to_sketch()
+                for value in seconds:
+                    sketch.add(value)
+                row.sketch = sketch.to_dict()
+                row.count = sketch.count
+                row.save()
+                rows.append(row)
+        return rows
+
+    @staticmethod
+    def merge_rows(rows):
+        """Merges an iterable of sketch rows (or their JSON) into one sketch."""
+        merged = DurationSketch()
+        for row in rows:
+            data = row.sketch if isinstance(row, VisitDurationSketch) else row
+            if data:
+                merged.merge(DurationSketch.from_dict(data))
+        return merged
+
+
+class HostVisitStats(models.Model):
+    """Running visit counter per host, maintained on check-in"""
+    host = models.OneToOneField(
+        CustomUser,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='visit_stats',
+        verbose_name=_("Host")
+    )
+    visit_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Visits")
+    )
+    last_visit_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name=_("Last Visit")
+    )
+
+    class Meta:
+        verbose_name = _("Host Visit Stats")
+        verbose_name_plural = _("Host Visit Stats")
+        indexes = [
+            models.Index(fields=['-visit_count', 'host']),
+        ]
+
+    def __str__(self):
+        return f"{self.host} ({self.visit_count})"
+
 
 class FormField(models.Model):
     """Model representing a form field for visitor registration"""
@@ -589,14 +1540,25 @@ class VisitorSetting(models.Model):
         self.pk = 1  # ensure singleton
         super().save(*args, **kwargs)
 
+    @classmethod
+    def current(cls):
+        """
+        The settings singleton (None until saved), cached per process and
+        invalidated by the VisitorSetting signals. Treat it as read-only.
+        """
+        return visitor_setting_cache.get()
+
     @staticmethod
     def get_active_template():
-        setting = VisitorSetting.objects.first()
+        setting = VisitorSetting.current()
         if setting and setting.badge_template:
             return setting.badge_template.path
         return None
 
 
+visitor_setting_cache = GenerationCache('visitor-setting', lambda: VisitorSetting.objects.first())
+
+
 class UserProfile(models.Model):
     """Model for user profile information"""
     user = models.OneToOneField(
@@ -0,0 +1,250 @@
+"""
+Batched replay of events recorded by kiosks while offline.
+
+A kiosk queues check-ins, check-outs and walk-in registrations with its
+own idempotency key and device timestamp, and uploads them in order once
+it is back online. A batch is applied in one transaction:
+
+* every lookup (known keys, visitors, hosts) is one query for the batch;
+* each visitor is written once with its final state (``bulk_update``),
+  and visit counters, duration sketches, logs and idempotency records are
+  written in bulk;
+* a key seen before, in this batch or an earlier one, is not applied
+  again: its stored result is returned with ``replayed: true``.
+
+Device timestamps in the future are clamped to the server clock, and a
+check-out never precedes its check-in.
+"""
+from functools import partial
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import (
+    CustomUser,
+    KioskSyncEvent,
+    VisitDurationSketch,
+    Visitor,
+    VisitorLog,
+)
+from .emergency_snapshot import emergency_snapshots
+from .serializers import OfflineEventSerializer
+
+CHECKED_IN_STATUSES = (Visitor.Status.CHECKED_IN, Visitor.Status.IN_MEETING)
+
+
+def apply_offline_events(device_id, events):
+    """Applies ``events`` (raw dicts, in device order) and returns one result per event."""
+    try:
+        with transaction.atomic():
+            return _OfflineBatch(device_id, events).apply()
+    except IntegrityError:
+        # A concurrent upload of the same events stored their keys first;
+        # on the retry they are all replays
+        with transaction.atomic():
+            return _OfflineBatch(device_id, events).apply()
+
+
+class _OfflineBatch:
+
+    def __init__(self, device_id, events):
+        self.device_id = device_id
+        self.raw_events = events
+        self.now = timezone.now()
+        self.visitors = {}          # id -> Visitor, one instance per visitor
+        self.visitors_by_qr = {}
+        self.walk_ins = {}          # idempotency key -> Visitor
+        self.dirty = {}             # id -> fields changed by this batch
+        self.checked_in = []
+        self.checked_out = []
+        self.logs = []
+        self.records = []
+
+    def apply(self):
+        results = [None] * len(self.raw_events)
+        events = []
+        for index, raw in enumerate(self.raw_events):
+            serializer = OfflineEventSerializer(data=raw)
+            if serializer.is_valid():
+                events.append((index, serializer.validated_data))
+            else:
+                results[index] = {
+                    'key': raw.get('key') if isinstance(raw, dict) else None,
+                    'status': 'invalid',
+                    'errors': serializer.errors,
+                }
+
+        stored = self._load(events)
+        first_index = {}
+        for index, event in events:
+            key = event['key']
+            if key in stored:
+                results[index] = {**stored[key].result, 'replayed': True}
+            elif key in first_index:
+                results[index] = {**results[first_index[key]], 'replayed': True}
+            else:
+                first_index[key] = index
+                results[index] = self._apply_event(event)
+
+        self._flush()
+        return results
+
+    def _load(self, events):
+        """Fetches known keys, referenced visitors and hosts in one query each."""
+        keys = {event['key'] for _, event in events}
+        walk_in_keys = {event['walk_in_key'] for _, event in events if event.get('walk_in_key')}
+        stored = {
+            record.idempotency_key: record
+            for record in KioskSyncEvent.objects.filter(
+                device_id=self.device_id, idempotency_key__in=keys | walk_in_keys
+            )
+        }
+        walk_in_ids = {
+            key: stored[key].visitor_id for key in walk_in_keys
+            if key in stored and stored[key].event_type == KioskSyncEvent.EventType.WALK_IN
+        }
+
+        qr_codes = {event['qr_code'] for _, event in events if event.get('qr_code')}
+        visitor_ids = {event['visitor_id'] for _, event in events if event.get('visitor_id')}
+        visitor_ids.update(pk for pk in walk_in_ids.values() if pk)
+        if qr_codes or visitor_ids:
+            for visitor in Visitor.objects.filter(Q(qr_code__in=qr_codes) | Q(id__in=visitor_ids)):
+                self._remember(visitor)
+        self.walk_ins.update({key: self.visitors[pk] for key, pk in walk_in_ids.items() if pk in self.visitors})
+
+        host_ids = {event['visitor']['host_id'] for _, event in events if event.get('visitor')}
+        self.hosts = CustomUser.objects.select_related('branch').in_bulk(host_ids) if host_ids else {}
+        return {key: record for key, record in stored.items() if key in keys}
+
+    def _remember(self, visitor):
+        self.visitors[visitor.id] = visitor
+        if visitor.qr_code:
+            self.visitors_by_qr[visitor.qr_code] = visitor
+
+    def _apply_event(self, event):
+        occurred_at = min(event['occurred_at'], self.now)
+        handler = {
+            KioskSyncEvent.EventType.CHECK_IN: self._check_in,
+            KioskSyncEvent.EventType.CHECK_OUT: self._check_out,
+            KioskSyncEvent.EventType.WALK_IN: self._walk_in,
+        }[event['type']]
+        visitor, error = handler(event, occurred_at)
+
+        result = {
+            'key': event['key'],
+            'status': KioskSyncEvent.Outcome.REJECTED if error else KioskSyncEvent.Outcome.APPLIED,
+            'visitor_id': visitor.id if visitor else None,
+        }
+        if error:
+            result['error'] = error
+        self.records.append(KioskSyncEvent(
+            device_id=self.device_id,
+            idempotency_key=event['key'],
+            event_type=event['type'],
+            occurred_at=event['occurred_at'],
+            visitor=visitor,
+            outcome=result['status'],
+            result=result,
+        ))
+        if not error:
+            self.logs.append(VisitorLog(
+                visitor=visitor,
+                action=(VisitorLog.Action.CHECK_OUT if event['type'] == KioskSyncEvent.EventType.CHECK_OUT
+                        else VisitorLog.Action.CHECK_IN),
+                payload={'event_type': event['type'].replace('_', '-'), 'occurred_at': occurred_at.isoformat()},
+                device_id=self.device_id,
+                branch_id=visitor.branch_id,
+                channel='offline_sync',
+                user=None,
+            ))
+        return result
+
+    def _visitor(self, event):
+        if event.get('walk_in_key'):
+            return self.walk_ins.get(event['walk_in_key'])
+        if event.get('visitor_id'):
+            return self.visitors.get(event['visitor_id'])
+        return self.visitors_by_qr.get(event['qr_code'])
+
+    def _change(self, visitor, **values):
+        for name, value in values.items():
+            setattr(visitor, name, value)
+        self.dirty.setdefault(visitor.id, set()).update(values)
+
+    def _check_in(self, event, occurred_at):
+        visitor = self._visitor(event)
+        if visitor is None:
+            return None, "Unknown visitor"
+        if visitor.status != Visitor.Status.PRE_REGISTERED:
+            return visitor, f"Visitor is {visitor.status}, not pre-registered"
+        self._change(
+            visitor,
+            status=Visitor.Status.CHECKED_IN,
+            check_in_time=occurred_at,
+            offline_checkin=True,
+        )
+        self.checked_in.append(visitor)
+        return visitor, None
+
+    def _check_out(self, event, occurred_at):
+        visitor = self._visitor(event)
+        if visitor is None:
+            return None, "Unknown visitor"
+        if visitor.status not in CHECKED_IN_STATUSES:
+            return visitor, f"Visitor is {visitor.status}, not checked in"
+        self._change(
+            visitor,
+            status=Visitor.Status.CHECKED_OUT,
+            check_out_time=max(occurred_at, visitor.check_in_time),
+        )
+        self.checked_out.append(visitor)
+        return visitor, None
+
+    def _walk_in(self, event, occurred_at):
+        details = event['visitor']
+        host = self.hosts.get(details['host_id'])
+        if host is None:
+            return None, "Unknown host"
+        visitor = Visitor(
+            first_name=details['first_name'],
+            last_name=details['last_name'],
+            phone=details['phone'],
+            email=details['email'],
+            company=details['company'],
+            purpose=details['purpose'],
+            visitor_type=details['visitor_type'],
+            host=host,
+            branch=host.branch,
+            status=Visitor.Status.CHECKED_IN,
+            expected_arrival=occurred_at,
+            offline_checkin=True,
+        )
+        # Inserted one by one: save() issues the QR code and counts the check-in
+        visitor.save()
+        # check_in_time is auto_now_add; backdate it to the device time
+        Visitor.objects.filter(pk=visitor.pk).update(check_in_time=occurred_at)
+        visitor.check_in_time = occurred_at
+        self._remember(visitor)
+        self.walk_ins[event['key']] = visitor
+        return visitor, None
+
+    def _flush(self):
+        if self.dirty:
+            changed = Visitor.stamp_change_seqs(self.visitors[pk] for pk in self.dirty)
+            for visitor in changed:
+                visitor.updated_at = self.now
+            fields = set().union(*self.dirty.values()) | {'change_seq', 'updated_at'}
+            Visitor.objects.bulk_update(changed, sorted(fields))
+            # bulk_update sends no signals; check-ins and check-outs move the roll call
+            moved = {visitor.branch_id for visitor in changed if 'status' in self.dirty[visitor.id]}
+            if moved:
+                transaction.on_commit(partial(emergency_snapshots.mark_dirty, *moved))
+            Visitor.record_check_ins(self.checked_in)
+            VisitDurationSketch.record_visits(
+                visitor for visitor in self.checked_out if visitor.status == Visitor.Status.CHECKED_OUT
+            )
+
+        if self.logs:
+            VisitorLog.objects.bulk_create(VisitorLog.stamp_change_seqs(self.logs))
+        KioskSyncEvent.objects.bulk_create(self.records)
@@ -0,0 +1,141 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over a unique composite ordering.
+
+    The cursor carries the ordering values of the last row served, and the
+    next page is fetched with a row-value comparison such as
+    ``(check_in_time, id) < (t, 42)``, which the matching composite index
+    answers directly. Unlike offset pagination, page cost does not grow with
+    depth and rows inserted meanwhile never shift or repeat a page. The last
+    ordering field must be unique.
+    """
+    ordering = ('-check_in_time', '-id')
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = [name.startswith('-') for name in self.ordering]
+        model = queryset.model
+        self.model_fields = [model._meta.get_field(name) for name in self.fields]
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor['reverse'])
+        ordering = self._ordering(reverse)
+        if cursor:
+            queryset = queryset.filter(self._seek(cursor['position'], reverse))
+
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # Following a "previous" link means a next page exists, and vice versa
+        self.has_next = has_more if not reverse else cursor is not None
+        self.has_previous = (has_more if reverse else cursor is not None) and bool(rows)
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    # ----- cursor encoding -----
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            position = [
+                field.to_python(value) for field, value in zip(self.model_fields, payload['p'], strict=True)
+            ]
+            return {'position': position, 'reverse': bool(payload.get('r'))}
+        except (TypeError, ValueError, KeyError, binascii.Error, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _link(self, row, reverse):
+        position = [self._cursor_value(row, field) for field in self.model_fields]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position, reverse))
+
+    def _cursor_value(self, row, field):
+        # Rows are model instances, or dicts when paginating ``.values()``
+        value = row[field.attname] if isinstance(row, dict) else getattr(row, field.attname)
+        return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+    # ----- query building -----
+
+    def _ordering(self, reverse):
+        return [
+            f"{'-' if descending != reverse else ''}{name}"
+            for name, descending in zip(self.fields, self.descending)
+        ]
+
+    def _seek(self, position, reverse):
+        """
+        Expands the row-value comparison into
+        ``a < x OR (a = x AND b < y) OR ...`` so every backend can use the index.
+        """
+        condition = Q()
+        equal = {}
+        for name, descending, value in zip(self.fields, self.descending, position):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
@@ -0,0 +1,188 @@
+"""
+Live evacuation roll calls.
+
+``start_roll_call`` copies everyone on site (in one branch, or all) into
+``RollCallEntry`` rows with thumbnail paths instead of photos. Marking an
+entry locks and updates that one row and adjusts the roll call's counters
+and the assembly point count with ``F()`` expressions, so counts are never
+recomputed. Each mark bumps the roll call's ``version``. Once the
+transaction commits, the changed entry and the new counts are sent to the
+roll call's WebSocket group (``ws/rollcall/<id>/``). A device that missed
+deltas asks for entries with a ``version`` above the last one it saw.
+"""
+import logging
+from functools import partial
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .audit import audit_log
+from .emergency_snapshot import ON_SITE_STATUSES
+from .models import AssemblyPointCount, RollCall, RollCallEntry, Visitor
+from .serializers import RollCallEntrySerializer
+from .utils.images import ensure_thumbnail
+
+logger = logging.getLogger(__name__)
+
+ENTRY_FIELDS = (
+    'id', 'first_name', 'last_name', 'company', 'host__first_name', 'host__last_name',
+    'badge_number', 'photo',
+)
+
+
+def group_name(roll_call_id):
+    return f"rollcall_{roll_call_id}"
+
+
+def start_roll_call(branch_id=None, reason='', user=None):
+    """
+    Returns ``(roll_call, created)``; an open roll call for the same branch
+    is returned instead of starting a second one.
+    """
+    existing = _open_roll_call(branch_id)
+    if existing:
+        return existing, False
+
+    visitors = Visitor.objects.filter(status__in=ON_SITE_STATUSES)
+    if branch_id is not None:
+        visitors = visitors.filter(branch_id=branch_id)
+    rows = visitors.order_by('last_name', 'first_name', 'id').values_list(*ENTRY_FIELDS)
+
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                roll_call = RollCall.objects.create(branch_id=branch_id, reason=reason, started_by=user)
+        except IntegrityError:
+            # unique_open_roll_call: another warden started one for this branch first
+            return _open_roll_call(branch_id), False
+        entries = [
+            RollCallEntry(
+                roll_call=roll_call,
+                visitor_id=pk,
+                full_name=f"{first_name} {last_name}",
+                company=company or '',
+                host_name=f"{host_first or ''} {host_last or ''}".strip(),
+                badge_number=badge_number or '',
+                # Normally already made by the emergency snapshot rebuilds
+                thumbnail=ensure_thumbnail(photo) or '',
+            )
+            for pk, first_name, last_name, company, host_first, host_last, badge_number, photo in rows
+        ]
+        RollCallEntry.objects.bulk_create(entries, batch_size=500)
+        roll_call.total = len(entries)
+        roll_call.save(update_fields=['total'])
+        audit_log.log(
+            action='ROLL_CALL_STARTED',
+            branch_id=branch_id,
+            payload={'roll_call': roll_call.pk, 'total': roll_call.total, 'reason': reason},
+            user=user,
+        )
+    return roll_call, True
+
+
+def _open_roll_call(branch_id):
+    return RollCall.objects.filter(status=RollCall.Status.OPEN, branch_id=branch_id).first()
+
+
+def mark_entry(roll_call_id, entry_id, accounted, assembly_point='', user=None):
+    """
+    Marks one entry accounted (at ``assembly_point``) or unaccounted and
+    returns it, or None when nothing changed. Raises
+    ``RollCallEntry.DoesNotExist``, or ValueError for a closed roll call.
+    """
+    status = RollCallEntry.Status.ACCOUNTED if accounted else RollCallEntry.Status.UNACCOUNTED
+    assembly_point = assembly_point.strip() if accounted else ''
+
+    with transaction.atomic():
+        entry = RollCallEntry.objects.select_for_update().get(pk=entry_id, roll_call_id=roll_call_id)
+        was_accounted = entry.status == RollCallEntry.Status.ACCOUNTED
+        if entry.status == status and entry.assembly_point == assembly_point:
+            return None
+
+        if not RollCall.objects.filter(pk=roll_call_id, status=RollCall.Status.OPEN).update(
+            version=F('version') + 1,
+            accounted=F('accounted') + (int(accounted) - int(was_accounted)),
+        ):
+            raise ValueError("Roll call is closed")
+        version = RollCall.objects.values_list('version', flat=True).get(pk=roll_call_id)
+
+        if was_accounted:
+            _count_at(roll_call_id, entry.assembly_point, -1)
+        if accounted:
+            _count_at(roll_call_id, assembly_point, 1)
+
+        entry.status = status
+        entry.assembly_point = assembly_point
+        entry.accounted_at = timezone.now() if accounted else None
+        entry.accounted_by = user if accounted else None
+        entry.version = version
+        entry.save(update_fields=['status', 'assembly_point', 'accounted_at', 'accounted_by', 'version'])
+
+        audit_log.log(
+            action='ROLL_CALL_ACCOUNTED' if accounted else 'ROLL_CALL_UNACCOUNTED',
+            payload={
+                'roll_call': roll_call_id, 'entry': entry.pk, 'visitor_id': entry.visitor_id,
+                'assembly_point': assembly_point,
+            },
+            user=user,
+        )
+        transaction.on_commit(partial(broadcast, roll_call_id, 'entry_updated', entry=entry))
+    return entry
+
+
+def _count_at(roll_call_id, assembly_point, delta):
+    counts = AssemblyPointCount.objects.filter(roll_call_id=roll_call_id, assembly_point=assembly_point)
+    if counts.update(count=F('count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            AssemblyPointCount.objects.create(roll_call_id=roll_call_id, assembly_point=assembly_point, count=delta)
+    except IntegrityError:
+        # Created by a concurrent first mark at this point
+        counts.update(count=F('count') + delta)
+
+
+def close_roll_call(roll_call, user=None):
+    if not RollCall.objects.filter(pk=roll_call.pk, status=RollCall.Status.OPEN).update(
+        status=RollCall.Status.CLOSED, closed_at=timezone.now(), version=F('version') + 1
+    ):
+        return False
+    roll_call.refresh_from_db()
+    audit_log.log(
+        action='ROLL_CALL_CLOSED',
+        branch_id=roll_call.branch_id,
+        payload={'roll_call': roll_call.pk, 'accounted': roll_call.accounted, 'total': roll_call.total},
+        user=user,
+    )
+    transaction.on_commit(partial(broadcast, roll_call.pk, 'roll_call_closed'))
+    return True
+
+
+def roll_call_counts(roll_call_id):
+    roll_call = RollCall.objects.values('status', 'total', 'accounted', 'version').get(pk=roll_call_id)
+    roll_call['unaccounted'] = roll_call['total'] - roll_call['accounted']
+    roll_call['assembly_points'] = dict(
+        AssemblyPointCount.objects.filter(roll_call_id=roll_call_id, count__gt=0)
+        .order_by('assembly_point').values_list('assembly_point', 'count')
+    )
+    return roll_call
+
+
+def broadcast(roll_call_id, event, entry=None):
+    """Sends a delta (the changed entry, if any, and the new counts) to the roll call's devices."""
+    from asgiref.sync import async_to_sync
+    from channels.layers import get_channel_layer
+
+    message = {
+        'type': 'roll_call_delta',
+        'event': event,
+        'roll_call': roll_call_id,
+        'counts': roll_call_counts(roll_call_id),
+        'entry': dict(RollCallEntrySerializer(entry).data) if entry is not None else None,
+    }
+    try:
+        async_to_sync(get_channel_layer().group_send)(group_name(roll_call_id), message)
+    except Exception:
+        # Devices catch up with ?since=<version>; a layer outage must not fail the mark
+        logger.warning("Could not broadcast %s for roll call %s", event, roll_call_id, exc_info=True)
@@ -0,0 +1,280 @@
+"""
+Visitor full-text search.
+
+The index covers first/last name, company, email, phone, badge number and
+the host's name. It is kept current by database triggers, so every write
+path (ORM saves, ``update()``, bulk operations, raw SQL) updates it. The
+backend is chosen from the database vendor:
+
+* SQLite: an FTS5 virtual table with prefix indexes, ranked with bm25().
+* PostgreSQL: a ``search_vector`` tsvector column with a GIN index,
+  ranked with ts_rank().
+* anything else: ``icontains`` across the same columns.
+"""
+import re
+
+from django.db import OperationalError, connection as default_connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_COLUMNS = ('first_name', 'last_name', 'company', 'email', 'phone', 'badge_number')
+# Relative weight of each indexed column when ranking, host name last
+COLUMN_WEIGHTS = (10.0, 10.0, 5.0, 5.0, 5.0, 5.0, 2.0)
+MAX_TERMS = 8
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(query):
+    """Splits user input into at most MAX_TERMS word terms; punctuation is ignored."""
+    return _TERM.findall(query or '')[:MAX_TERMS]
+
+
+class FallbackSearchBackend:
+    """Unindexed ``icontains`` search for databases without full-text support."""
+    vendor = None
+
+    def filter(self, queryset, query):
+        terms = search_terms(query)
+        if not terms:
+            return queryset
+        for term in terms:
+            condition = Q(host__first_name__icontains=term) | Q(host__last_name__icontains=term)
+            for column in SEARCH_COLUMNS:
+                condition |= Q(**{f'{column}__icontains': term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+    def ranked_ids(self, query, limit):
+        from .models import Visitor
+
+        return list(
+            self.filter(Visitor.objects.order_by('-check_in_time', '-id'), query)
+            .values_list('id', flat=True)[:limit]
+        )
+
+    def install(self, connection):
+        pass
+
+    def uninstall(self, connection):
+        pass
+
+    def rebuild(self, connection):
+        pass
+
+
+class SQLiteSearchBackend(FallbackSearchBackend):
+    vendor = 'sqlite'
+    table = 'visitors_visitor_fts'
+
+    def __init__(self):
+        self._installed = set()
+
+    def match_expression(self, query):
+        # Every term is quoted (so FTS syntax in user input is inert) and
+        # matched as a prefix; terms are ANDed.
+        return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in search_terms(query))
+
+    def filter(self, queryset, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return queryset
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [expression])
+        )
+
+    def ranked_ids(self, query, limit):
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+        with default_connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s "
+                f"ORDER BY bm25({self.table}, {weights}) LIMIT %s",
+                [expression, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def _row_values(self, alias):
+        columns = ', '.join(f"{alias}.{column}" for column in SEARCH_COLUMNS)
+        host = (
+            "(SELECT trim(coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, '')) "
+            f"FROM visitors_customuser u WHERE u.id = {alias}.host_id)"
+        )
+        return f"{alias}.id, {columns}, {host}"
+
+    def install(self, connection):
+        columns = ', '.join((*SEARCH_COLUMNS, 'host_name'))
+        watched = ', '.join((*SEARCH_COLUMNS, 'host_id'))
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+            f"{columns}, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')",
+            f"CREATE TRIGGER IF NOT EXISTS {self.table}_ai AFTER INSERT ON visitors_visitor BEGIN "
+            f"INSERT INTO {self.table} (rowid, {columns}) SELECT {self._row_values('new')}; END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.table}_ad AFTER DELETE ON visitors_visitor BEGIN "
+            f"DELETE FROM {self.table} WHERE rowid = old.id; END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.table}_au AFTER UPDATE OF {watched} ON visitors_visitor BEGIN "
+            f"DELETE FROM {self.table} WHERE rowid = old.id; "
+            f"INSERT INTO {self.table} (rowid, {columns}) SELECT {self._row_values('new')}; END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.table}_host_au "
+            f"AFTER UPDATE OF first_name, last_name ON visitors_customuser BEGIN "
+            f"UPDATE {self.table} SET host_name = trim(coalesce(new.first_name, '') || ' ' || "
+            f"coalesce(new.last_name, '')) "
+            f"WHERE rowid IN (SELECT id FROM visitors_visitor WHERE host_id = new.id); END",
+        ]
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+        self.rebuild(connection)
+
+    def is_installed(self, connection):
+        if connection.alias in self._installed:
+            return True
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [self.table])
+            installed = cursor.fetchone() is not None
+        if installed:
+            self._installed.add(connection.alias)
+        return installed
+
+    def uninstall(self, connection):
+        self._installed.discard(connection.alias)
+        with connection.cursor() as cursor:
+            for suffix in ('ai', 'ad', 'au', 'host_au'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {self.table}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def rebuild(self, connection):
+        columns = ', '.join((*SEARCH_COLUMNS, 'host_name'))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, {columns}) "
+                f"SELECT {self._row_values('v')} FROM visitors_visitor v"
+            )
+            cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+
+
+class PostgresSearchBackend(FallbackSearchBackend):
+    vendor = 'postgresql'
+    # 'simple' keeps names and codes as-is instead of stemming them as English
+    config = 'simple'
+
+    def tsquery(self, query):
+        return ' & '.join(f"{term}:*" for term in search_terms(query))
+
+    def filter(self, queryset, query):
+        tsquery = self.tsquery(query)
+        if not tsquery:
+            return queryset
+        return queryset.filter(id__in=RawSQL(
+            "SELECT id FROM visitors_visitor WHERE search_vector @@ to_tsquery(%s, %s)",
+            [self.config, tsquery]
+        ))
+
+    def ranked_ids(self, query, limit):
+        tsquery = self.tsquery(query)
+        if not tsquery:
+            return []
+        with default_connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT id FROM visitors_visitor, to_tsquery(%s, %s) query "
+                "WHERE search_vector @@ query "
+                "ORDER BY ts_rank(search_vector, query) DESC, check_in_time DESC LIMIT %s",
+                [self.config, tsquery, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def _vector(self, alias):
+        weighted = [
+            (f"{alias}.first_name", 'A'), (f"{alias}.last_name", 'A'),
+            (f"{alias}.company", 'B'), (f"{alias}.email", 'B'),
+            (f"{alias}.phone", 'B'), (f"{alias}.badge_number", 'B'),
+            ("host_name", 'C'),
+        ]
+        return ' || '.join(
+            f"setweight(to_tsvector('{self.config}', coalesce({column}, '')), '{weight}')"
+            for column, weight in weighted
+        )
+
+    def install(self, connection):
+        watched = ', '.join((*SEARCH_COLUMNS, 'host_id'))
+        statements = [
+            "ALTER TABLE visitors_visitor ADD COLUMN IF NOT EXISTS search_vector tsvector",
+            "CREATE INDEX IF NOT EXISTS visitors_visitor_search_idx "
+            "ON visitors_visitor USING GIN (search_vector)",
+            f"""
+            CREATE OR REPLACE FUNCTION visitors_visitor_search_update() RETURNS trigger AS $$
+            DECLARE host_name text;
+            BEGIN
+                SELECT trim(coalesce(first_name, '') || ' ' || coalesce(last_name, ''))
+                  INTO host_name FROM visitors_customuser WHERE id = NEW.host_id;
+                NEW.search_vector := {self._vector('NEW')};
+                RETURN NEW;
+            END $$ LANGUAGE plpgsql
+            """,
+            "DROP TRIGGER IF EXISTS visitors_visitor_search_trigger ON visitors_visitor",
+            f"CREATE TRIGGER visitors_visitor_search_trigger BEFORE INSERT OR UPDATE OF {watched} "
+            "ON visitors_visitor FOR EACH ROW EXECUTE FUNCTION visitors_visitor_search_update()",
+            """
+            CREATE OR REPLACE FUNCTION visitors_host_search_update() RETURNS trigger AS $$
+            BEGIN
+                -- Re-fires the visitor trigger for the host's visitors
+                UPDATE visitors_visitor SET host_id = host_id WHERE host_id = NEW.id;
+                RETURN NULL;
+            END $$ LANGUAGE plpgsql
+            """,
+            "DROP TRIGGER IF EXISTS visitors_host_search_trigger ON visitors_customuser",
+            "CREATE TRIGGER visitors_host_search_trigger AFTER UPDATE OF first_name, last_name "
+            "ON visitors_customuser FOR EACH ROW EXECUTE FUNCTION visitors_host_search_update()",
+        ]
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+        self.rebuild(connection)
+
+    def uninstall(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER IF EXISTS visitors_host_search_trigger ON visitors_customuser")
+            cursor.execute("DROP TRIGGER IF EXISTS visitors_visitor_search_trigger ON visitors_visitor")
+            cursor.execute("DROP FUNCTION IF EXISTS visitors_host_search_update()")
+            cursor.execute("DROP FUNCTION IF EXISTS visitors_visitor_search_update()")
+            cursor.execute("ALTER TABLE visitors_visitor DROP COLUMN IF EXISTS search_vector")
+
+    def rebuild(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE visitors_visitor SET host_id = host_id")
+
+
+def suspend_for_table_rebuild(apps, schema_editor):
+    """
+    Migration helper. SQLite applies many schema changes by copying the
+    table, which the index triggers would break; pair this with
+    ``resume_after_table_rebuild`` around such operations on Visitor.
+    """
+    if schema_editor.connection.vendor == 'sqlite':
+        BACKENDS['sqlite'].uninstall(schema_editor.connection)
+
+
+def resume_after_table_rebuild(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        try:
+            BACKENDS['sqlite'].install(schema_editor.connection)
+        except OperationalError:
+            # SQLite built without FTS5: search stays unindexed
+            pass
+
+
+FALLBACK = FallbackSearchBackend()
+BACKENDS = {backend.vendor: backend for backend in (SQLiteSearchBackend(), PostgresSearchBackend())}
+
+
+def get_search_backend(connection=None):
+    """Returns the search backend for ``connection`` (the default database by default)."""
+    connection = connection or default_connection
+    backend = BACKENDS.get(connection.vendor)
+    if backend is None or (backend.vendor == 'sqlite' and not backend.is_installed(connection)):
+        # SQLite builds without FTS5 skip the index and search unindexed
+        return FALLBACK
+    return backend
@@ -3,15 +3,16 @@ from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core import exceptions
-from .models import CustomUser, Visitor, FormField, UserProfile, VisitorLog
+from .models import Branch, CustomUser, ExportJob, KioskSyncEvent, RollCall, RollCallEntry, Visitor, FormField, UserProfile, VisitorLog
 from rest_framework import serializers
 from .models import UserProfile 
 from visitors.models import Notification
 from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 import base64
-import io
-import os
-from PIL import Image
+
+from .exports import download_path
+from .utils.images import image_data_uri
 
 User = get_user_model()
 
@@ -55,33 +56,11 @@ class Base64ImageField(serializers.ImageField):
     
     def to_representation(self, value):
         """Return image as base64 string if exists, otherwise return default."""
-        if value and hasattr(value, 'path') and os.path.exists(value.path):
-            try:
-                with Image.open(value.path) as img:
-                    # Convert to RGB if necessary
-                    if img.mode in ('RGBA', 'LA'):
-                        rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                        rgb_img.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                        img = rgb_img
-                    
-                    # Determine format
-                    img_format = img.format or 'JPEG'
-                    if img_format.upper() == 'PNG':
-                        mime_type = 'image/png'
-                    elif img_format.upper() in ('JPG', 'JPEG'):
-                        mime_type = 'image/jpeg'
-                    else:
-                        mime_type = f'image/{img_format.lower()}'
-                    
-                    # Convert to base64
-                    buffer = io.BytesIO()
-                    img.save(buffer, format=img_format)
-                    image_data = buffer.getvalue()
-                    encoded_string = base64.b64encode(image_data).decode('utf-8')
-                    return f"data:{mime_type};base64,{encoded_string}"
-            except (IOError, OSError, ValueError):
-                pass
-        
+        if value and hasattr(value, 'path'):
+            encoded = image_data_uri(value.path)
+            if encoded:
+                return encoded
+
         # Return default image if no image exists
         return self.default_image
 
@@ -195,7 +174,39 @@ class ChangePasswordSerializer(serializers.Serializer):
 
 # ========== VISITOR MANAGEMENT SERIALIZERS ==========
 
-class VisitorSerializer(serializers.ModelSerializer):
+class SparseFieldsetSerializerMixin:
+    """
+    Accepts ``fields`` (names to keep) and ``expand`` (relations to nest
+    using ``expandable_fields``) keyword arguments from the view.
+    """
+    expandable_fields = {}
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in expand or ():
+            self.fields[name] = self.expandable_fields[name](read_only=True)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class HostSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CustomUser
+        fields = ['id', 'first_name', 'last_name', 'email']
+
+
+class BranchSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Branch
+        fields = ['id', 'name']
+
+
+class VisitorSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        'host': HostSummarySerializer,
+        'branch': BranchSummarySerializer,
+    }
     photo = Base64ImageField(required=False, allow_null=True, default_image=DEFAULT_PHOTO_BASE64)
     signature = Base64ImageField(required=False, allow_null=True, default_image=DEFAULT_SIGNATURE_BASE64)
     duration = serializers.SerializerMethodField(
@@ -257,10 +268,64 @@ class VisitorCheckOutSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Visitor is already checked out.")
         return data
 
+class KioskLookupSerializer(serializers.Serializer):
+    # The last name must match too, so a known phone or email alone reveals nothing
+    last_name = serializers.CharField(max_length=50)
+    phone = serializers.CharField(max_length=20, required=False, allow_blank=True)
+    email = serializers.CharField(max_length=254, required=False, allow_blank=True)
+    id_number = serializers.CharField(max_length=50, required=False, allow_blank=True)
+
+    def validate(self, data):
+        if not any(data.get(name) for name in ('phone', 'email', 'id_number')):
+            raise serializers.ValidationError("Provide a phone, email or id_number.")
+        return data
+
+
+class OfflineWalkInSerializer(serializers.Serializer):
+    first_name = serializers.CharField(max_length=50)
+    last_name = serializers.CharField(max_length=50, required=False, allow_blank=True, default='')
+    phone = serializers.CharField(max_length=20)
+    email = serializers.EmailField(required=False, allow_blank=True, allow_null=True, default=None)
+    company = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True, default=None)
+    purpose = serializers.CharField(required=False, allow_blank=True, allow_null=True, default=None)
+    host_id = serializers.IntegerField()
+    visitor_type = serializers.ChoiceField(choices=Visitor.VisitorType.choices, default=Visitor.VisitorType.GUEST)
+
+
+class OfflineEventSerializer(serializers.Serializer):
+    """One event recorded by a kiosk while offline."""
+    key = serializers.CharField(max_length=64)
+    type = serializers.ChoiceField(choices=KioskSyncEvent.EventType.choices)
+    occurred_at = serializers.DateTimeField()
+    qr_code = serializers.CharField(max_length=100, required=False)
+    visitor_id = serializers.IntegerField(required=False)
+    # Refers to a walk-in registered offline, which has no server id yet
+    walk_in_key = serializers.CharField(max_length=64, required=False)
+    visitor = OfflineWalkInSerializer(required=False)
+
+    def validate(self, data):
+        if data['type'] == KioskSyncEvent.EventType.WALK_IN:
+            if 'visitor' not in data:
+                raise serializers.ValidationError("Walk-in events need the visitor's details.")
+        elif not any(data.get(name) for name in ('qr_code', 'visitor_id', 'walk_in_key')):
+            raise serializers.ValidationError(
+                "Check-in and check-out events need a qr_code, visitor_id or walk_in_key."
+            )
+        return data
+
+
+class OfflineSyncBatchSerializer(serializers.Serializer):
+    device_id = serializers.CharField(max_length=64)
+    # Events are validated one by one so a bad event cannot sink the batch
+    events = serializers.ListField(child=serializers.DictField(), allow_empty=False, max_length=500)
+
+
 class VisitorBadgeSerializer(serializers.ModelSerializer):
     photo = Base64ImageField(read_only=True)
     signature = Base64ImageField(read_only=True)
     qr_image = Base64ImageField(read_only=True)
+    name = serializers.ReadOnlyField(source='full_name')
+    host_name = serializers.ReadOnlyField(source='host.get_full_name', default=None)
 
     class Meta:
         model = Visitor
@@ -293,14 +358,62 @@ class FormFieldSerializer(serializers.ModelSerializer):
 class VisitorLogSerializer(serializers.ModelSerializer):
     visitor_name = serializers.CharField(source='visitor.name', read_only=True)
     user_email = serializers.CharField(source='user.email', read_only=True)
+    details = serializers.CharField(source='display_details', read_only=True)
 
     class Meta:
         model = VisitorLog
         fields = [
             'id', 'visitor', 'visitor_name', 'action',
-            'details', 'user', 'user_email', 'timestamp'
+            'details', 'payload', 'device_id', 'branch', 'channel',
+            'user', 'user_email', 'timestamp'
+        ]
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    progress = serializers.FloatField(read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id', 'format', 'filters', 'status', 'progress', 'rows_written', 'rows_total',
+            'error', 'download_url', 'created_at', 'started_at', 'finished_at'
+        ]
+
+    def get_download_url(self, obj):
+        # Only the job detail view (the owner or staff) is given a signed link
+        if not self.context.get('download') or obj.status != ExportJob.Status.COMPLETED or not obj.file:
+            return None
+        path = download_path(obj)
+        request = self.context.get('request')
+        return request.build_absolute_uri(path) if request else path
+
+class RollCallEntrySerializer(serializers.ModelSerializer):
+    # A media URL for a small JPEG instead of an inline photo
+    thumbnail_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RollCallEntry
+        fields = [
+            'id', 'visitor', 'full_name', 'company', 'host_name', 'badge_number', 'thumbnail_url',
+            'status', 'assembly_point', 'accounted_at', 'accounted_by', 'version'
         ]
 
+    def get_thumbnail_url(self, obj):
+        return default_storage.url(obj.thumbnail) if obj.thumbnail else None
+
+class RollCallSerializer(serializers.ModelSerializer):
+    unaccounted = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RollCall
+        fields = [
+            'id', 'branch', 'reason', 'status', 'total', 'accounted', 'unaccounted', 'version',
+            'started_by', 'started_at', 'closed_at'
+        ]
+
+    def get_unaccounted(self, obj):
+        return obj.total - obj.accounted
+
 class VisitorReportSerializer(serializers.Serializer):
     daily = serializers.ListField()
     hourly = serializers.ListField()
@@ -0,0 +1,68 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .emergency_snapshot import ON_SITE_STATUSES, emergency_snapshots
+from .models import Branch, CustomUser, FormField, Visitor, VisitorSetting, visitor_setting_cache
+from .sync import get_feeds, record_deletion
+from .utils.form_schema import form_schema
+from .utils.host_directory import host_directory
+from .utils.kiosk_bootstrap import kiosk_bundle
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+@receiver(post_save, sender=Branch)
+@receiver(post_delete, sender=Branch)
+def invalidate_host_directory(sender, **kwargs):
+    if kwargs.get('update_fields') == frozenset({'last_login'}):
+        # Logins save the user but never change the directory
+        return
+    host_directory.invalidate()
+
+
+@receiver(post_save, sender=VisitorSetting)
+@receiver(post_delete, sender=VisitorSetting)
+def invalidate_visitor_setting(sender, **kwargs):
+    visitor_setting_cache.invalidate()
+    kiosk_bundle.invalidate()
+
+
+@receiver(post_save, sender=FormField)
+@receiver(post_delete, sender=FormField)
+def invalidate_form_schema(sender, **kwargs):
+    form_schema.invalidate()
+
+
+@receiver(post_save, sender=Branch)
+@receiver(post_delete, sender=Branch)
+def invalidate_kiosk_bundle(sender, **kwargs):
+    kiosk_bundle.invalidate()
+
+
+@receiver(post_save, sender=Visitor)
+@receiver(post_delete, sender=Visitor)
+def refresh_emergency_snapshot(sender, instance, **kwargs):
+    # Any change to someone who is or was on site changes the roll call
+    loaded = getattr(instance, '_loaded_values', {})
+    if loaded.get('status') not in ON_SITE_STATUSES and instance.status not in ON_SITE_STATUSES:
+        return
+    branches = {instance.branch_id, loaded.get('branch_id', instance.branch_id)}
+    transaction.on_commit(partial(emergency_snapshots.mark_dirty, *branches))
+
+
+@receiver(post_save, sender=Branch)
+def refresh_branch_emergency_snapshot(sender, instance, created, **kwargs):
+    if not created:
+        transaction.on_commit(partial(emergency_snapshots.mark_dirty, instance.pk))
+
+
+def record_sync_tombstone(sender, instance, **kwargs):
+    record_deletion(_FEEDS_BY_MODEL[sender], instance)
+
+
+_FEEDS_BY_MODEL = {feed.model: feed for feed in get_feeds().values()}
+for _model in _FEEDS_BY_MODEL:
+    post_delete.connect(record_sync_tombstone, sender=_model, dispatch_uid=f'sync-tombstone-{_model._meta.label}')
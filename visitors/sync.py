@@ -0,0 +1,168 @@
+"""
+Delta sync for frontends and kiosks.
+
+Every save of a change-tracked model (visitors, visitor logs and
+notifications) stamps the row with the next value of a global change
+counter, and every delete leaves a ``ChangeTombstone`` numbered from the
+same counter. A client keeps a local replica by asking for everything
+after the last cursor it applied:
+
+    GET /api/sync/?since=0          -> full snapshot, page by page
+    GET /api/sync/?since=<cursor>   -> only rows written or deleted since
+
+A row updated several times between two polls is sent once, in its latest
+state. Tombstones older than the retention window are pruned; cursors
+from before that point get a 410 and must resync from zero.
+"""
+from django.db.models import Q
+
+from .fast_serializers import _datetime, visitor_sync_projection
+from .models import ChangeCounter, ChangeTombstone, ChangeTracked, render_log_details
+
+
+class Feed:
+    """One synced model: how to select a user's rows and represent them."""
+
+    def __init__(self, kind, model, columns=(), datetimes=(), computed=None, projection=None, owner_field=None):
+        self.kind = kind
+        self.model = model
+        self.columns = tuple(columns)
+        self.datetimes = frozenset(datetimes)
+        # Output column -> (source columns, function of their values)
+        self.computed = computed or {}
+        self.projection = projection
+        self.owner_field = owner_field
+
+    def queryset(self, user):
+        queryset = self.model.objects.all()
+        if self.owner_field:
+            queryset = queryset.filter(**{self.owner_field: user})
+        return queryset
+
+    def changes(self, user, since, limit, request=None):
+        """Returns up to ``limit`` (change_seq, representation) pairs after ``since``."""
+        if self.projection:
+            columns = self.projection.columns()
+        else:
+            columns = {*self.columns, *(source for sources, _ in self.computed.values() for source in sources)}
+        rows = list(
+            self.queryset(user).filter(change_seq__gt=since)
+            .order_by('change_seq').values('change_seq', *columns)[:limit]
+        )
+        if self.projection:
+            return list(zip([row['change_seq'] for row in rows], self.projection.serialize(rows, request)))
+        return [(row['change_seq'], {name: self._value(name, row) for name in self.columns}) for row in rows]
+
+    def _value(self, name, row):
+        if name in self.computed:
+            sources, function = self.computed[name]
+            return function(*(row[source] for source in sources))
+        return _datetime(row[name]) if name in self.datetimes else row[name]
+
+    def owner_id(self, instance):
+        """Owner recorded on the tombstone; None when every user syncs the row."""
+        return getattr(instance, f'{self.owner_field}_id') if self.owner_field else None
+
+
+LOG_DETAIL_SOURCES = ('action', 'details', 'payload', 'device_id', 'branch_id', 'channel', 'user__email')
+
+
+def _log_details(action, details, payload, device_id, branch_id, channel, user_email):
+    return render_log_details({
+        'action': action, 'details': details, 'payload': payload,
+        'device_id': device_id, 'branch_id': branch_id, 'channel': channel,
+    }, user_email=user_email)
+
+
+def _feeds():
+    from notifications.models import Notification
+    from .models import Visitor, VisitorLog
+
+    return [
+        Feed('visitors', Visitor, projection=visitor_sync_projection),
+        Feed(
+            'logs', VisitorLog,
+            columns=(
+                'id', 'visitor_id', 'action', 'details', 'payload', 'device_id', 'branch_id',
+                'channel', 'user_id', 'timestamp'
+            ),
+            datetimes=('timestamp',),
+            # Entries since payloads were added store no details text
+            computed={'details': (LOG_DETAIL_SOURCES, _log_details)}
+        ),
+        Feed(
+            'notifications', Notification,
+            columns=('id', 'visitor_id', 'message', 'status', 'channel', 'created_at', 'sent_at', 'read_at'),
+            datetimes=('created_at', 'sent_at', 'read_at'),
+            owner_field='staff'
+        ),
+    ]
+
+
+_FEEDS = None
+
+
+def get_feeds():
+    """Returns the feeds by kind (built on first use, once models are loaded)."""
+    global _FEEDS
+    if _FEEDS is None:
+        _FEEDS = {feed.kind: feed for feed in _feeds()}
+    return _FEEDS
+
+
+def record_bulk_deletion(feed, object_ids):
+    """Tombstones for rows of an ownerless feed deleted without per-row signals."""
+    tombstones = [ChangeTombstone(kind=feed.kind, object_id=pk) for pk in object_ids]
+    ChangeTombstone.objects.bulk_create(ChangeTracked.stamp_change_seqs(tombstones))
+
+
+def record_deletion(feed, instance):
+    ChangeTombstone.objects.create(
+        kind=feed.kind,
+        object_id=instance.pk,
+        owner_id=feed.owner_id(instance),
+        change_seq=ChangeCounter.allocate(),
+    )
+
+
+class CursorExpired(Exception):
+    """The cursor predates pruned tombstones, so deletions may have been missed."""
+
+
+def changes_since(user, since, limit, kinds=None, request=None):
+    """
+    Returns the next page of changes after ``since`` for ``user``:
+    ``{'cursor', 'has_more', 'changes': {kind: [...]}, 'deleted': {kind: [ids]}}``.
+    """
+    feeds = get_feeds()
+    kinds = list(kinds or feeds)
+    if since and since < ChangeCounter.current(ChangeCounter.TOMBSTONE_HORIZON):
+        raise CursorExpired()
+
+    # Each source is read up to limit + 1 rows in sequence order; merging
+    # them and keeping the first ``limit`` gives one globally ordered page.
+    entries = []
+    for kind in kinds:
+        entries.extend((seq, kind, row) for seq, row in feeds[kind].changes(user, since, limit + 1, request))
+    if since:
+        # A full resync (since=0) needs no tombstones: deleted rows are simply absent
+        tombstones = ChangeTombstone.objects.filter(
+            Q(owner__isnull=True) | Q(owner=user), change_seq__gt=since, kind__in=kinds
+        ).order_by('change_seq').values_list('change_seq', 'kind', 'object_id')[:limit + 1]
+        entries.extend((seq, kind, None, object_id) for seq, kind, object_id in tombstones)
+    entries.sort(key=lambda entry: entry[0])
+
+    page = entries[:limit]
+    changes = {kind: [] for kind in kinds}
+    deleted = {kind: [] for kind in kinds}
+    for entry in page:
+        if entry[2] is None:
+            deleted[entry[1]].append(entry[3])
+        else:
+            changes[entry[1]].append(entry[2])
+    return {
+        'cursor': page[-1][0] if page else since,
+        'has_more': len(entries) > limit,
+        'changes': changes,
+        'deleted': deleted,
+    }
@@ -0,0 +1,20 @@
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class KioskLookupThrottle(SimpleRateThrottle):
+    """
+    Limits returning-visitor lookups per client IP, authenticated or not,
+    so the endpoint cannot be used to enumerate visitors.
+    """
+    scope = 'kiosk_lookup'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+
+class KioskSyncThrottle(KioskLookupThrottle):
+    """Limits offline batch uploads per client IP; each batch may carry hundreds of events."""
+    scope = 'kiosk_sync'
@@ -23,8 +23,14 @@ from .views.visitors import(
 from visitors.views.visitors import VisitorViewSet
 from .views.forms import (
     FormFieldViewSet)
-from .views.logs import (VisitorLogListView)
+from .views.logs import (VisitorLogListView, VisitorLogArchiveView)
+from .views.exports import ExportJobListView, ExportJobDetailView, ExportJobDownloadView
+from .views.roll_call import RollCallListView, RollCallDetailView, RollCallEntryView, RollCallCloseView
 from .views.landing import (LandingStatsView)
+from .views.directory import HostDirectoryView
+from .views.kiosk import KioskBootstrapView
+from .views.sync import SyncView
+from .views.analytics import VisitDurationPercentilesView, AnalyticsQueryView, VisitLeaderboardView
 
 
 from authentication.views import (
@@ -46,7 +52,7 @@ from notifications.notifier import (
     NotificationListView
 )
 
-from visitors.views.visitors import kiosk_checkin_view, offline_checkin_view
+from visitors.views.visitors import kiosk_checkin_view, kiosk_lookup_view, offline_checkin_view, offline_sync_view
 
 
 
@@ -83,16 +89,31 @@ api_urlpatterns = [
     # 🛂 Visitor Management
     path('visitors/', include([
         path('logs/', VisitorLogListView.as_view(), name='visitor-logs'),
+        path('logs/archive/', VisitorLogArchiveView.as_view(), name='visitor-logs-archive'),
+        path('exports/', ExportJobListView.as_view(), name='export-jobs'),
+        path('exports/<int:pk>/', ExportJobDetailView.as_view(), name='export-job-detail'),
+        path('exports/<int:pk>/download/', ExportJobDownloadView.as_view(), name='export-job-download'),
         path('checkin/', kiosk_checkin_view, name='visitor-checkin'),  # Use kiosk_checkin_view here
         path('qr-checkin/', QRCheckInAPIView.as_view(), name='qr-checkin'),
         path('kiosk-checkin/', kiosk_checkin_view, name='kiosk-checkin'),
+        path('kiosk-lookup/', kiosk_lookup_view, name='kiosk-lookup'),
         path('offline-checkin/', offline_checkin_view, name='offline-checkin'),
+        path('offline-sync/', offline_sync_view, name='offline-sync'),
         path('<int:id>/detail/', VisitorDetailView.as_view(), name='visitor-detail'),
         path('<int:id>/badge/', VisitorBadgePDFView.as_view(), name='visitor-badge'),
         path('emergency/report/pdf/', EmergencyReportPDFView.as_view(), name='emergency-report-pdf'),
         path('analytics/', VisitorReportsAPIView.as_view(), name='visitor-reports-analytics'),
     ])),
 
+    # 🧑‍💼 Host directory for kiosks
+    path('hosts/directory/', HostDirectoryView.as_view(), name='host-directory'),
+
+    # 🖥️ Kiosk session bootstrap
+    path('kiosk/bootstrap/', KioskBootstrapView.as_view(), name='kiosk-bootstrap'),
+
+    # 🔄 Delta sync for frontends and kiosks
+    path('sync/', SyncView.as_view(), name='sync'),
+
     # 📊 Dashboard Endpoints
     path('dashboard/', include([
         path('stats/', DashboardStatsView.as_view(), name='dashboard-stats'),  # Fixed duplicate 'dashboard' prefix
@@ -106,6 +127,9 @@ api_urlpatterns = [
     path('analytics/', include([
         path('', VisitorStatsView.as_view(), name='visitor-stats'),
         path('landing/', LandingStatsView.as_view(), name='landing-stats'),
+        path('durations/', VisitDurationPercentilesView.as_view(), name='visit-duration-percentiles'),
+        path('query/', AnalyticsQueryView.as_view(), name='analytics-query'),
+        path('leaderboard/', VisitLeaderboardView.as_view(), name='visit-leaderboard'),
         path('export/csv/', ExportVisitorsCSVView.as_view(), name='visitor-export'),
        
     ])),
@@ -114,6 +138,10 @@ api_urlpatterns = [
     path('emergency/', include([
         path('report/', EmergencyReportAPIView.as_view(), name='emergency-report'),
         path('report/pdf/', EmergencyReportPDFView.as_view(), name='emergency-report-pdf'),
+        path('rollcalls/', RollCallListView.as_view(), name='roll-calls'),
+        path('rollcalls/<int:pk>/', RollCallDetailView.as_view(), name='roll-call-detail'),
+        path('rollcalls/<int:pk>/entries/<int:entry_id>/', RollCallEntryView.as_view(), name='roll-call-entry'),
+        path('rollcalls/<int:pk>/close/', RollCallCloseView.as_view(), name='roll-call-close'),
     ])),
 
     # 🔔 Notification System
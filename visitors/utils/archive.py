@@ -0,0 +1,218 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, time
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+MANIFEST_NAME = 'manifest.json'
+FORMAT_VERSION = 1
+
+
+def month_bounds(month):
+    """Returns aware local datetimes [start, end) for the month containing ``month``."""
+    start = date(month.year, month.month, 1)
+    end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return (
+        timezone.make_aware(datetime.combine(start, time.min)),
+        timezone.make_aware(datetime.combine(end, time.min)),
+    )
+
+
+def month_key(month):
+    return f"{month.year:04d}-{month.month:02d}"
+
+
+class StringColumn:
+    """
+    Variable-length strings stored Arrow-style: one UTF-8 byte buffer, an
+    offsets array and a validity mask, all of which can be memory-mapped.
+    """
+
+    def __init__(self, offsets, data, valid):
+        self.offsets = offsets
+        self.data = data
+        self.valid = valid
+
+    def __len__(self):
+        return len(self.valid)
+
+    def __getitem__(self, index):
+        if not self.valid[index]:
+            return None
+        return bytes(self.data[self.offsets[index]:self.offsets[index + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    @staticmethod
+    def encode(values):
+        """Returns (offsets, data, valid) arrays for a list of str/None values."""
+        encoded = [value.encode('utf-8') if value is not None else b'' for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        valid = np.array([value is not None for value in values], dtype=bool)
+        return offsets, data, valid
+
+
+class ArchiveSegment:
+    """One immutable month of archived rows, read through memory maps."""
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+
+    def __len__(self):
+        return self.manifest['rows']
+
+    @property
+    def month(self):
+        return self.manifest['month']
+
+    @property
+    def dictionaries(self):
+        return self.manifest.get('dictionaries', {})
+
+    def column(self, name):
+        """Returns a read-only memory-mapped column (or StringColumn) by name."""
+        if name in self.manifest.get('string_columns', []):
+            return StringColumn(
+                self._load(f'{name}.offsets'),
+                self._load(f'{name}.data'),
+                self._load(f'{name}.valid'),
+            )
+        return self._load(name)
+
+    def decoded(self, name):
+        """Returns a dictionary-coded column translated back to its values."""
+        values = self.dictionaries[name]
+        return [values[code] for code in self.column(name)]
+
+    def _load(self, name):
+        return np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r')
+
+
+class ColumnarArchive:
+    """
+    Directory of immutable, memory-mapped monthly segments:
+
+        <root>/<kind>/<YYYY-MM>/<column>.npy
+        <root>/<kind>/<YYYY-MM>/manifest.json
+        <root>/manifest.json
+
+    Segments are written to a temporary directory and renamed into place, so
+    readers never see a partial segment.
+    """
+
+    def __init__(self, root=None):
+        self.root = str(root or getattr(settings, 'VISIT_ARCHIVE_ROOT'))
+
+    # ----- reading -----
+
+    def manifest(self):
+        path = os.path.join(self.root, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {'format': FORMAT_VERSION, 'segments': {}}
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def segment(self, kind, month):
+        path = os.path.join(self.root, kind, month)
+        manifest_path = os.path.join(path, MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, encoding='utf-8') as f:
+            return ArchiveSegment(path, json.load(f))
+
+    def segments(self, kind, start=None, end=None, pruned_only=False):
+        """Returns segments of ``kind`` overlapping the [start, end] dates, oldest first."""
+        entries = self.manifest()['segments'].get(kind, {})
+        result = []
+        for month in sorted(entries):
+            entry = entries[month]
+            if pruned_only and not entry.get('pruned'):
+                continue
+            if start and month < month_key(start):
+                continue
+            if end and month > month_key(end):
+                continue
+            segment = self.segment(kind, month)
+            if segment is not None:
+                result.append(segment)
+        return result
+
+    def has_segment(self, kind, month):
+        return month in self.manifest()['segments'].get(kind, {})
+
+    # ----- writing -----
+
+    def write_segment(self, kind, month, columns, strings=None, dictionaries=None, extra=None):
+        """
+        Writes one immutable segment. ``columns`` maps names to NumPy arrays,
+        ``strings`` maps names to lists of str/None, ``dictionaries`` holds the
+        value lists for dictionary-coded columns.
+        """
+        strings = strings or {}
+        rows = len(next(iter(columns.values())))
+        kind_dir = os.path.join(self.root, kind)
+        os.makedirs(kind_dir, exist_ok=True)
+        target = os.path.join(kind_dir, month)
+        if os.path.exists(target):
+            raise FileExistsError(f"Archive segment {kind}/{month} already exists")
+
+        staging = tempfile.mkdtemp(prefix=f'.{month}-', dir=kind_dir)
+        try:
+            for name, array in columns.items():
+                np.save(os.path.join(staging, f'{name}.npy'), np.ascontiguousarray(array))
+            for name, values in strings.items():
+                offsets, data, valid = StringColumn.encode(values)
+                np.save(os.path.join(staging, f'{name}.offsets.npy'), offsets)
+                np.save(os.path.join(staging, f'{name}.data.npy'), data)
+                np.save(os.path.join(staging, f'{name}.valid.npy'), valid)
+            manifest = {
+                'format': FORMAT_VERSION,
+                'kind': kind,
+                'month': month,
+                'rows': rows,
+                'columns': sorted(columns),
+                'string_columns': sorted(strings),
+                'dictionaries': dictionaries or {},
+                'created_at': timezone.now().isoformat(),
+                **(extra or {}),
+            }
+            self._write_json(os.path.join(staging, MANIFEST_NAME), manifest)
+            os.rename(staging, target)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        self._update_manifest(kind, month, {
+            'rows': rows,
+            'pruned': False,
+            'created_at': manifest['created_at'],
+            **(extra or {}),
+        })
+        return ArchiveSegment(target, manifest)
+
+    def mark_pruned(self, kind, month):
+        self._update_manifest(kind, month, {'pruned': True, 'pruned_at': timezone.now().isoformat()})
+
+    def _update_manifest(self, kind, month, values):
+        manifest = self.manifest()
+        entry = manifest['segments'].setdefault(kind, {}).setdefault(month, {})
+        entry.update(values)
+        os.makedirs(self.root, exist_ok=True)
+        self._write_json(os.path.join(self.root, MANIFEST_NAME), manifest)
+
+    def _write_json(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
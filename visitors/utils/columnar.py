@@ -0,0 +1,217 @@
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.utils import timezone
+
+SECONDS_PER_DAY = 86400
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+CODED_DIMENSIONS = ('status', 'visitor_type', 'branch', 'host', 'company')
+TIME_DIMENSIONS = ('weekday', 'hour', 'day', 'month')
+DIMENSIONS = CODED_DIMENSIONS + TIME_DIMENSIONS
+METRICS = ('count', 'completed', 'total_duration', 'avg_duration')
+
+
+class _Encoder:
+    """Assigns dense integer codes to values; code 0 is reserved for None."""
+
+    def __init__(self):
+        self.codes = {None: 0}
+        self.values = [None]
+
+    def __call__(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class VisitorFrame:
+    """
+    Immutable columnar snapshot of the Visitor table.
+
+    Categorical columns are integer-coded, timestamps are epoch seconds and
+    rows are sorted by check-in time, so a date range is two ``searchsorted``
+    calls and any group-by is a ``bincount`` over a combined group key.
+    """
+
+    def __init__(self, columns, labels, built_at):
+        self.columns = columns
+        self.labels = labels
+        self.built_at = built_at
+
+    def __len__(self):
+        return len(self.columns['check_in'])
+
+    @property
+    def version(self):
+        return f"{len(self)}-{int(self.built_at.timestamp())}"
+
+    @classmethod
+    def build(cls, queryset=None, chunk_size=5000, archive=None):
+        """
+        Builds a frame from ``queryset`` (all visitors by default). Full builds
+        also fold in archived months that have been pruned from the database.
+        """
+        from visitors.models import Branch, CustomUser, Visitor
+        from .archive import ColumnarArchive
+
+        full_build = queryset is None
+        queryset = Visitor.objects.all() if full_build else queryset
+        rows = queryset.order_by('check_in_time', 'id').values_list(
+            'id', 'check_in_time', 'check_out_time', 'status', 'visitor_type',
+            'branch_id', 'host_id', 'company'
+        ).iterator(chunk_size=chunk_size)
+
+        encoders = {name: _Encoder() for name in CODED_DIMENSIONS}
+        ids, check_in, local_check_in, duration = [], [], [], []
+        codes = {name: [] for name in CODED_DIMENSIONS}
+        for pk, check_in_time, check_out_time, *values in rows:
+            ids.append(pk)
+            epoch = int(check_in_time.timestamp())
+            check_in.append(epoch)
+            local_check_in.append(epoch + int(timezone.localtime(check_in_time).utcoffset().total_seconds()))
+            duration.append(
+                (check_out_time - check_in_time).total_seconds() if check_out_time else np.nan
+            )
+            values[-1] = (values[-1] or '').strip() or None
+            for name, value in zip(CODED_DIMENSIONS, values):
+                codes[name].append(encoders[name](value))
+
+        parts = [{
+            'check_in': np.array(check_in, dtype=np.int64),
+            'local_check_in': np.array(local_check_in, dtype=np.int64),
+            'duration': np.array(duration, dtype=np.float64),
+            **{name: np.array(values, dtype=np.int32) for name, values in codes.items()},
+        }]
+        if full_build:
+            archive = archive or ColumnarArchive()
+            live_ids = np.array(ids, dtype=np.int64)
+            for segment in archive.segments('visits', pruned_only=True):
+                parts.append(cls._segment_columns(segment, encoders, live_ids))
+
+        columns = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+        if len(parts) > 1:
+            order = np.argsort(columns['check_in'], kind='stable')
+            columns = {name: column[order] for name, column in columns.items()}
+
+        labels = {name: list(encoder.values) for name, encoder in encoders.items()}
+        labels['branch_id'] = labels['branch']
+        labels['host_id'] = labels['host']
+        branch_names = dict(Branch.objects.filter(id__in=labels['branch'][1:]).values_list('id', 'name'))
+        host_names = {
+            pk: f"{first} {last}".strip()
+            for pk, first, last in CustomUser.objects.filter(
+                id__in=labels['host'][1:]
+            ).values_list('id', 'first_name', 'last_name')
+        }
+        labels['branch'] = [branch_names.get(pk) for pk in labels['branch_id']]
+        labels['host'] = [host_names.get(pk) for pk in labels['host_id']]
+
+        return cls(columns, labels, timezone.now())
+
+    @staticmethod
+    def _segment_columns(segment, encoders, live_ids):
+        """
+        Reads an archived month, re-coding its dictionaries with the frame's
+        encoders. Rows still in the database (visitors kept back by the prune,
+        e.g. blacklisted ones) are skipped; the live table already has them.
+        """
+        keep = ~np.isin(np.asarray(segment.column('id')), live_ids)
+        check_in = np.asarray(segment.column('check_in'))[keep]
+        check_out = np.asarray(segment.column('check_out'))[keep]
+        columns = {
+            'check_in': check_in,
+            'local_check_in': np.asarray(segment.column('local_check_in'))[keep],
+            'duration': np.where(check_out >= 0, check_out - check_in, np.nan).astype(np.float64),
+        }
+        for name in CODED_DIMENSIONS:
+            remap = np.array([encoders[name](value) for value in segment.dictionaries[name]], dtype=np.int32)
+            columns[name] = (
+                remap[np.asarray(segment.column(name))[keep]] if len(remap) else np.zeros(0, dtype=np.int32)
+            )
+        return columns
+
+    def _row_range(self, start=None, end=None):
+        """Returns the slice of rows whose check-in date lies in [start, end]."""
+        check_in = self.columns['check_in']
+        lo, hi = 0, len(check_in)
+        if start:
+            lo = np.searchsorted(check_in, self._local_midnight(start), side='left')
+        if end:
+            hi = np.searchsorted(check_in, self._local_midnight(end + timedelta(days=1)), side='left')
+        return slice(lo, hi)
+
+    def _local_midnight(self, day):
+        return int(timezone.make_aware(datetime.combine(day, time.min)).timestamp())
+
+    def _dimension(self, name, rows, mask):
+        """Returns (codes, labels) for a dimension over the selected rows."""
+        if name in CODED_DIMENSIONS:
+            return self.columns[name][rows][mask], self.labels[name]
+
+        local = self.columns['local_check_in'][rows][mask]
+        if name == 'hour':
+            return (local % SECONDS_PER_DAY) // 3600, list(range(24))
+        days = local // SECONDS_PER_DAY
+        if name == 'weekday':
+            # 1970-01-01 was a Thursday
+            return (days + 3) % 7, WEEKDAYS
+        if name == 'day':
+            values, codes = np.unique(days, return_inverse=True)
+            return codes, [str(np.datetime64(int(v), 'D')) for v in values]
+        months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        values, codes = np.unique(months, return_inverse=True)
+        return codes, [str(np.datetime64(int(v), 'M')) for v in values]
+
+    def query(self, group_by=(), metrics=('count',), start=None, end=None, filters=None):
+        """
+        Aggregates ``metrics`` over the rows checked in between ``start`` and
+        ``end`` (dates, inclusive), grouped by ``group_by`` dimensions.
+        ``filters`` maps coded dimensions to raw values (e.g. ``{'status': 'checked_in'}``).
+        """
+        rows = self._row_range(start, end)
+        mask = np.ones(rows.stop - rows.start, dtype=bool)
+        for name, value in (filters or {}).items():
+            source = 'branch_id' if name == 'branch' else 'host_id' if name == 'host' else name
+            values = self.labels[source]
+            code = values.index(value) if value in values else -1
+            mask &= self.columns[name][rows] == code
+
+        key = np.zeros(int(mask.sum()), dtype=np.int64)
+        dimensions = []
+        for name in group_by:
+            codes, labels = self._dimension(name, rows, mask)
+            key = key * len(labels) + codes
+            dimensions.append((name, labels))
+
+        groups, inverse = np.unique(key, return_inverse=True)
+        if not dimensions:
+            # An ungrouped query always yields one (possibly empty) total row
+            groups = np.zeros(1, dtype=np.int64)
+        duration = self.columns['duration'][rows][mask]
+        completed_mask = ~np.isnan(duration)
+        count = np.bincount(inverse, minlength=len(groups))
+        completed = np.bincount(inverse, weights=completed_mask, minlength=len(groups))
+        total = np.bincount(inverse, weights=np.where(completed_mask, duration, 0), minlength=len(groups))
+
+        results = []
+        for index, group in enumerate(groups.tolist()):
+            codes = {}
+            for name, labels in reversed(dimensions):
+                group, codes[name] = divmod(group, len(labels))
+            row = {}
+            for name, labels in dimensions:
+                row[name] = labels[codes[name]]
+                if name in ('branch', 'host'):
+                    row[f'{name}_id'] = self.labels[f'{name}_id'][codes[name]]
+            values = {
+                'count': int(count[index]),
+                'completed': int(completed[index]),
+                'total_duration': float(total[index]),
+                'avg_duration': float(total[index] / completed[index]) if completed[index] else None,
+            }
+            row.update({metric: values[metric] for metric in metrics})
+            results.append(row)
+        return results
@@ -0,0 +1,35 @@
+import re
+import unicodedata
+
+# Trailing legal-form words that do not distinguish one company from another
+LEGAL_SUFFIXES = {
+    'co', 'company', 'corp', 'corporation', 'inc', 'incorporated', 'limited',
+    'llc', 'llp', 'ltd', 'plc', 'pty',
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s&]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def clean_company_name(name):
+    """Trims and collapses whitespace for display; returns None for blank names."""
+    if not name:
+        return None
+    return _WHITESPACE.sub(' ', name).strip() or None
+
+
+def normalize_company_name(name):
+    """
+    Returns the matching key for a company name: case-folded, accents and
+    punctuation removed, whitespace collapsed and legal suffixes dropped, so
+    "KREP", "Krep " and "krep ltd." share one key. None for blank names.
+    """
+    name = clean_company_name(name)
+    if not name:
+        return None
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(char for char in name if not unicodedata.combining(char)).casefold()
+    words = _PUNCTUATION.sub(' ', name).split()
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return ' '.join(words) or None
@@ -0,0 +1,143 @@
+"""
+Streaming CSV exports.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` and encoded
+a batch at a time into a ``StreamingHttpResponse``, so an export holds one
+chunk of tuples in memory however many visitors it covers. ``?gzip=1``
+compresses the stream on the fly into a ``.csv.gz`` attachment.
+"""
+import csv
+import io
+import zlib
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from ..models import Visitor
+
+EXPORT_CHUNK_SIZE = getattr(settings, 'VISITOR_EXPORT_CHUNK_SIZE', 2000)
+TRUTHY = {'1', 'true', 'yes'}
+
+# The full visitor export: shared by ExportVisitorsView and export jobs
+VISITOR_EXPORT_HEADER = (
+    'Name', 'Company', 'Email', 'Phone',
+    'Host', 'Visitor Type',
+    'Check-in Time', 'Check-out Time', 'Status',
+    'Purpose', 'Notes'
+)
+VISITOR_EXPORT_FIELDS = (
+    'first_name', 'last_name', 'company', 'email', 'phone',
+    'host__first_name', 'host__last_name', 'visitor_type',
+    'check_in_time', 'check_out_time', 'status', 'purpose', 'notes'
+)
+
+
+def visitor_export_row(first_name, last_name, company, email, phone, host_first, host_last,
+                       visitor_type, check_in_time, check_out_time, status, purpose, notes):
+    return [
+        f"{first_name} {last_name}",
+        company,
+        email or '',
+        phone or '',
+        f"{host_first} {host_last}".strip() if host_first is not None else '',
+        visitor_type,
+        format_datetime(check_in_time),
+        format_datetime(check_out_time),
+        status,
+        purpose or '',
+        notes or ''
+    ]
+
+
+def filter_export_visitors(params, queryset=None):
+    """
+    Applies the export filters from query ``params``:
+    ``start_date``/``end_date`` (YYYY-MM-DD, inclusive, on check-in time),
+    ``branch`` (id) and ``status`` (comma-separated). Raises ``ValueError``
+    for a malformed value.
+    """
+    queryset = Visitor.objects.all() if queryset is None else queryset
+    start = _day_start(params.get('start_date'))
+    end = _day_start(params.get('end_date'), next_day=True)
+    if start:
+        queryset = queryset.filter(check_in_time__gte=start)
+    if end:
+        queryset = queryset.filter(check_in_time__lt=end)
+    if params.get('branch'):
+        if not params['branch'].isdigit():
+            raise ValueError("branch must be an integer id")
+        queryset = queryset.filter(branch_id=int(params['branch']))
+    if params.get('status'):
+        statuses = [value.strip() for value in params['status'].split(',') if value.strip()]
+        unknown = set(statuses) - set(Visitor.Status.values)
+        if unknown:
+            raise ValueError(f"Unknown status: {', '.join(sorted(unknown))}")
+        queryset = queryset.filter(status__in=statuses)
+    # Newest first over the (check_in_time, id) index
+    return queryset.order_by('-check_in_time', '-id')
+
+
+def _day_start(value, next_day=False):
+    if not value:
+        return None
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f"Invalid date: {value}")
+    if next_day:
+        day += timedelta(days=1)
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def format_datetime(value):
+    return value.strftime('%Y-%m-%d %H:%M') if value else ''
+
+
+def stream_csv(header, rows, batch_size=EXPORT_CHUNK_SIZE):
+    """Yields UTF-8 CSV bytes for ``header`` and ``rows``, a batch of rows per chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    pending = 1
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def csv_export_response(request, filename, header, rows):
+    """
+    Streams ``rows`` as a CSV attachment, gzip-compressed when the request
+    asks for ``?gzip=1``.
+    """
+    chunks = stream_csv(header, rows)
+    if request.query_params.get('gzip', '').lower() in TRUTHY:
+        response = StreamingHttpResponse(gzip_stream(chunks), content_type='application/gzip')
+        filename += '.gz'
+    else:
+        response = StreamingHttpResponse(chunks, content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def export_rows(queryset, fields, build_row):
+    """Reads ``fields`` in chunks and maps each tuple through ``build_row``."""
+    for values in queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield build_row(*values)
@@ -0,0 +1,52 @@
+from .snapshots import json_version
+from .versioned_cache import GenerationCache
+
+
+def split_options(options):
+    """Splits a comma-separated ``options`` value into a list of choices."""
+    return [option.strip() for option in (options or '').split(',') if option.strip()]
+
+
+class FormSchema:
+    """
+    Compiled, immutable schema of the active form fields.
+
+    Each field is serialised once with its ``options`` pre-split into
+    ``choices``, and the field list for every visitor type (unrestricted
+    fields plus the ones restricted to that type) is precomputed, so
+    rendering a kiosk form is a dictionary lookup.
+    """
+
+    def __init__(self, fields, visitor_types):
+        self.fields = fields
+        self.version = json_version(fields)
+        self._by_type = {
+            visitor_type: [
+                field for field in fields
+                if field['visitor_type'] in (None, '', visitor_type)
+            ]
+            for visitor_type in visitor_types
+        }
+
+    @classmethod
+    def build(cls):
+        from visitors.models import FormField, Visitor
+        from visitors.serializers import FormFieldSerializer
+
+        queryset = FormField.objects.filter(is_active=True).order_by('order', 'label', 'id')
+        fields = []
+        for field in FormFieldSerializer(queryset, many=True).data:
+            field = dict(field)
+            field['choices'] = split_options(field['options'])
+            fields.append(field)
+        return cls(fields, Visitor.VisitorType.values)
+
+    def fields_for(self, visitor_type=None):
+        """Active fields shown to ``visitor_type``; every active field when None."""
+        if visitor_type is None:
+            return self.fields
+        return self._by_type.get(visitor_type, [])
+
+
+# Shared per-process schema, invalidated by the FormField signals and reorders
+form_schema = GenerationCache('form-schema', FormSchema.build)
@@ -0,0 +1,99 @@
+import re
+from bisect import bisect_left
+
+from django.utils.text import slugify
+
+from .snapshots import json_version
+from .versioned_cache import GenerationCache
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _tokens(*values):
+    """Lowercase, accent-folded word tokens of the given strings."""
+    tokens = set()
+    for value in values:
+        if value:
+            tokens.update(_TOKEN.findall(slugify(value).replace('-', ' ')))
+            tokens.update(_TOKEN.findall(value.casefold()))
+    return tokens
+
+
+class HostDirectory:
+    """
+    Immutable, in-memory directory of active staff for kiosks.
+
+    Entries are sorted by name. Every word of a person's name, department
+    and job title is kept in one sorted token list, so a prefix
+    search is a ``bisect`` to the first candidate token followed by a short
+    forward scan.
+    """
+
+    FIELDS = ('id', 'first_name', 'last_name', 'email', 'department', 'job_title', 'role', 'branch_id')
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.version = json_version(entries)
+        tokens = []
+        for index, entry in enumerate(entries):
+            for token in _tokens(entry['name'], entry['department'], entry['job_title']):
+                tokens.append((token, index))
+        tokens.sort()
+        self._tokens = tokens
+        self._keys = [token for token, _ in tokens]
+
+    @classmethod
+    def build(cls):
+        from visitors.models import Branch, CustomUser
+
+        branches = dict(Branch.objects.values_list('id', 'name'))
+        entries = []
+        users = CustomUser.objects.filter(is_active=True).order_by('first_name', 'last_name', 'id')
+        for user in users.values(*cls.FIELDS):
+            # Kiosks are public, so email addresses are never exposed
+            name = f"{user['first_name']} {user['last_name']}".strip() or user['email'].split('@')[0]
+            entries.append({
+                'id': user['id'],
+                'name': name,
+                'department': user['department'],
+                'job_title': user['job_title'],
+                'role': user['role'],
+                'branch_id': user['branch_id'],
+                'branch': branches.get(user['branch_id']),
+            })
+        entries.sort(key=lambda entry: (entry['name'].casefold(), entry['id']))
+        return cls(entries)
+
+    def _prefix_matches(self, prefix):
+        matches = set()
+        position = bisect_left(self._keys, prefix)
+        while position < len(self._keys) and self._keys[position].startswith(prefix):
+            matches.add(self._tokens[position][1])
+            position += 1
+        return matches
+
+    def search(self, query=None, branch_id=None, role=None):
+        """
+        Returns entries whose words start with every term of ``query``,
+        optionally restricted to a branch and role, in name order.
+        """
+        indexes = None
+        for term in _tokens(query):
+            matches = self._prefix_matches(term)
+            indexes = matches if indexes is None else indexes & matches
+            if not indexes:
+                return []
+
+        candidates = (
+            self.entries if indexes is None
+            else [self.entries[index] for index in sorted(indexes)]
+        )
+        return [
+            entry for entry in candidates
+            if (branch_id is None or entry['branch_id'] == branch_id)
+            and (role is None or entry['role'] == role)
+        ]
+
+
+# Shared per-process directory, invalidated by the user/branch signals
+host_directory = GenerationCache('host-directory', HostDirectory.build)
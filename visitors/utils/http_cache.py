@@ -0,0 +1,53 @@
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(value, weak=False):
+    """Builds a quoted (optionally weak) entity tag from ``value``."""
+    etag = quote_etag(str(value))
+    return f"W/{etag}" if weak else etag
+
+
+def apply_validators(response, etag=None, last_modified=None, cache_control=None):
+    """Sets ETag, Last-Modified and Cache-Control headers on ``response``."""
+    if etag:
+        response.headers['ETag'] = etag
+    if last_modified:
+        response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+    if cache_control:
+        response.headers['Cache-Control'] = cache_control
+    return response
+
+
+def not_modified_response(request, etag=None, last_modified=None, cache_control=None):
+    """
+    Returns a 304 response carrying the validators when the client's cached
+    copy is still current (If-None-Match / If-Modified-Since), else None.
+    """
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        apply_validators(response, etag, last_modified, cache_control)
+    return response
+
+
+def version_stamp(value):
+    """Microsecond epoch of a datetime for use in ETags; 0 for None."""
+    return int(value.timestamp() * 1_000_000) if value else 0
+
+
+def conditional_response(request, respond, etag=None, last_modified=None, cache_control=None):
+    """
+    Answers 304 when the client's copy is current; otherwise calls
+    ``respond()`` and stamps the validators on a successful response.
+    """
+    response = not_modified_response(request, etag, last_modified, cache_control)
+    if response is not None:
+        return response
+    response = respond()
+    if response.status_code == 200:
+        apply_validators(response, etag, last_modified, cache_control)
+    return response
@@ -0,0 +1,70 @@
+import hashlib
+import hmac
+import re
+
+from django.conf import settings
+
+_NON_DIGITS = re.compile(r"\D")
+_NON_ALNUM = re.compile(r"[^0-9A-Za-z]")
+
+
+def normalize_phone(phone, country_code=None):
+    """
+    Returns ``phone`` in E.164 form (``+254712345678``), or None when it
+    cannot be a valid number. National numbers with a leading trunk ``0``
+    get ``country_code`` (DEFAULT_PHONE_COUNTRY_CODE by default).
+    """
+    if not phone:
+        return None
+    country_code = country_code or getattr(settings, 'DEFAULT_PHONE_COUNTRY_CODE', '254')
+    phone = phone.strip()
+    digits = _NON_DIGITS.sub('', phone)
+    if phone.startswith('+'):
+        pass
+    elif digits.startswith('00'):
+        digits = digits[2:]
+    elif digits.startswith('0'):
+        digits = country_code + digits[1:]
+    elif not digits.startswith(country_code):
+        digits = country_code + digits
+    if not 8 <= len(digits) <= 15:
+        return None
+    return f"+{digits}"
+
+
+def normalize_email(email):
+    """Lowercased, trimmed email address, or None when blank."""
+    if not email:
+        return None
+    return email.strip().lower() or None
+
+
+def hash_id_number(id_number):
+    """
+    Keyed hash of an ID/passport number (case, spaces and punctuation
+    ignored), so visitors can be matched by ID without indexing the number.
+    """
+    if not id_number:
+        return None
+    value = _NON_ALNUM.sub('', id_number).upper()
+    if not value:
+        return None
+    key = getattr(settings, 'VISITOR_ID_HASH_KEY', None) or settings.SECRET_KEY
+    return hmac.new(key.encode('utf-8'), value.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def mask_email(email):
+    """``jane.doe@example.com`` -> ``j***@example.com``, for display to unauthenticated kiosks."""
+    email = (email or '').strip()
+    if '@' not in email:
+        return None
+    local, domain = email.rsplit('@', 1)
+    return f"{local[:1]}***@{domain}"
+
+
+def mask_phone(phone):
+    """All but the last three digits hidden: ``*******678``."""
+    digits = _NON_DIGITS.sub('', phone or '')
+    if not digits:
+        return None
+    return '*' * max(len(digits) - 3, 0) + digits[-3:]
@@ -0,0 +1,96 @@
+import base64
+import io
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from PIL import Image
+
+# Roll-call thumbnails: small enough for hundreds on a phone over a poor link
+THUMBNAIL_SIZE = 96
+
+# Encoded images are small (badge photos, signatures, QR codes); this bounds
+# the cache to roughly a few tens of MB in the worst case.
+DATA_URI_CACHE_SIZE = 256
+
+
+def image_data_uri(path):
+    """
+    Returns the image at ``path`` as a ``data:`` URI, or None when it is
+    missing or unreadable. Results are cached per (path, mtime, size), so a
+    replaced file is re-encoded but an unchanged one is encoded only once.
+    """
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return None
+    return _encode_image(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=DATA_URI_CACHE_SIZE)
+def _encode_image(path, mtime_ns, size):
+    try:
+        with Image.open(path) as img:
+            # Convert to RGB if necessary
+            if img.mode in ('RGBA', 'LA'):
+                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
+                rgb_img.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+                img = rgb_img
+
+            # Determine format
+            img_format = img.format or 'JPEG'
+            if img_format.upper() == 'PNG':
+                mime_type = 'image/png'
+            elif img_format.upper() in ('JPG', 'JPEG'):
+                mime_type = 'image/jpeg'
+            else:
+                mime_type = f'image/{img_format.lower()}'
+
+            buffer = io.BytesIO()
+            img.save(buffer, format=img_format)
+            encoded_string = base64.b64encode(buffer.getvalue()).decode('utf-8')
+            return f"data:{mime_type};base64,{encoded_string}"
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def thumbnail_name(name, size=THUMBNAIL_SIZE):
+    """Media name of the JPEG thumbnail for the media file ``name``."""
+    root, _ = os.path.splitext(name)
+    return f"thumbnails/{size}/{root}.jpg"
+
+
+def ensure_thumbnail(name, size=THUMBNAIL_SIZE):
+    """
+    Writes a ``size``-pixel JPEG thumbnail of the media file ``name`` unless
+    a current one exists, and returns its media name (None when the source
+    is missing or unreadable). An unchanged photo costs two ``stat`` calls.
+    """
+    if not name:
+        return None
+    source = os.path.join(settings.MEDIA_ROOT, name)
+    thumb = thumbnail_name(name, size)
+    target = os.path.join(settings.MEDIA_ROOT, thumb)
+    try:
+        source_mtime = os.stat(source).st_mtime_ns
+    except (OSError, ValueError):
+        return None
+    try:
+        if os.stat(target).st_mtime_ns >= source_mtime:
+            return thumb
+    except OSError:
+        pass
+
+    try:
+        with Image.open(source) as img:
+            # JPEG sources are decoded at a reduced scale instead of in full
+            img.draft('RGB', (size * 2, size * 2))
+            img = img.convert('RGB')
+            img.thumbnail((size, size))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            img.save(tmp_path, format='JPEG', quality=80, optimize=True)
+        os.replace(tmp_path, target)
+    except (IOError, OSError, ValueError):
+        return None
+    return thumb
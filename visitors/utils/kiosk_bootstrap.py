@@ -0,0 +1,57 @@
+from .form_schema import form_schema
+from .host_directory import host_directory
+from .snapshots import json_version
+from .versioned_cache import GenerationCache
+
+SETTING_FIELDS = (
+    'require_photo', 'require_id', 'default_checkin_duration', 'enable_pre_registration',
+    'enable_health_check', 'enable_auto_checkout', 'auto_checkout_time',
+)
+
+
+class KioskBundle:
+    """
+    Visitor settings and active branches for kiosks. Form fields and hosts
+    come from the shared form schema and host directory, which have their
+    own generations.
+    """
+
+    def __init__(self, settings, branches):
+        self.settings = settings
+        self.branches = branches
+        self._branches_by_id = {branch['id']: branch for branch in branches}
+        self.version = json_version([settings, branches])
+
+    @classmethod
+    def build(cls):
+        from visitors.models import Branch, VisitorSetting
+
+        setting = VisitorSetting.current() or VisitorSetting()
+        settings = {name: getattr(setting, name) for name in SETTING_FIELDS}
+        settings['has_badge_template'] = bool(setting.badge_template)
+        branches = list(
+            Branch.objects.filter(is_active=True).order_by('name', 'id').values('id', 'name', 'address')
+        )
+        return cls(settings, branches)
+
+    def branch(self, branch_id):
+        return self._branches_by_id.get(branch_id)
+
+    def payload(self, branch_id=None):
+        """Returns (version, data) for a kiosk, optionally scoped to one branch."""
+        schema = form_schema.get()
+        directory = host_directory.get()
+        hosts = directory.search(branch_id=branch_id) if branch_id else directory.entries
+        version = json_version([self.version, schema.version, directory.version, branch_id])
+        return version, {
+            'version': version,
+            'branch': self.branch(branch_id) if branch_id else None,
+            'branches': self.branches,
+            'settings': self.settings,
+            'form_fields': schema.fields,
+            'hosts': hosts,
+        }
+
+
+# Shared per-process bundle, invalidated by the setting/branch signals
+kiosk_bundle = GenerationCache('kiosk-bundle', KioskBundle.build)
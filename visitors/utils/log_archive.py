@@ -0,0 +1,151 @@
+import gzip
+import json
+import os
+import tempfile
+
+import orjson
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import CustomUser, render_log_details
+
+MANIFEST_NAME = 'manifest.json'
+FORMAT_VERSION = 1
+LOG_FIELDS = (
+    'id', 'visitor_id', 'action', 'details', 'payload', 'device_id', 'branch_id', 'channel',
+    'user_id', 'timestamp',
+)
+
+
+class LogSegmentArchive:
+    """
+    Visitor log entries past retention, as gzip-compressed JSON Lines:
+
+        <root>/<YYYY-MM>/<first id>-<last id>.jsonl.gz
+        <root>/manifest.json
+
+    The manifest keeps a sparse index per segment (rows, time range,
+    visitor ids, actions and users), so a lookup only decompresses the
+    segments that can contain a match, and then streams them line by line.
+    Files are written to a temporary name, fsynced and renamed into place.
+    """
+
+    def __init__(self, root=None):
+        self.root = str(root or getattr(settings, 'VISITOR_LOG_ARCHIVE_ROOT'))
+
+    # ----- reading -----
+
+    def manifest(self):
+        path = os.path.join(self.root, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {'format': FORMAT_VERSION, 'segments': {}}
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def segments(self, start=None, end=None, visitor_id=None, action=None, user_id=None):
+        """
+        Returns (name, index) for segments whose sparse index can match,
+        oldest first. ``start``/``end`` are aware datetimes, end exclusive.
+        """
+        result = []
+        for name, index in sorted(self.manifest()['segments'].items(), key=lambda item: item[1]['first']):
+            if start and parse_datetime(index['last']) < start:
+                continue
+            if end and parse_datetime(index['first']) >= end:
+                continue
+            if visitor_id is not None and visitor_id not in index['visitor_ids']:
+                continue
+            if action is not None and action not in index['actions']:
+                continue
+            if user_id is not None and user_id not in index['user_ids']:
+                continue
+            result.append((name, index))
+        return result
+
+    def iter_entries(self, start=None, end=None, visitor_id=None, action=None, user_id=None, query=None):
+        """
+        Streams archived entries (dicts with ``LOG_FIELDS``) matching every
+        given filter, oldest segment first. ``details`` holds the rendered
+        display text, as in the API, and ``query`` is a case-insensitive
+        substring of it.
+        """
+        query = query.casefold() if query else None
+        emails = {}
+        for name, _ in self.segments(start, end, visitor_id, action, user_id):
+            for entry in self.read_segment(name):
+                if visitor_id is not None and entry['visitor_id'] != visitor_id:
+                    continue
+                if action is not None and entry['action'] != action:
+                    continue
+                if user_id is not None and entry['user_id'] != user_id:
+                    continue
+                if start or end:
+                    timestamp = parse_datetime(entry['timestamp'])
+                    if (start and timestamp < start) or (end and timestamp >= end):
+                        continue
+                entry_user_id = entry['user_id']
+                if entry_user_id is not None and entry_user_id not in emails:
+                    emails[entry_user_id] = (
+                        CustomUser.objects.filter(pk=entry_user_id).values_list('email', flat=True).first()
+                    )
+                entry['details'] = render_log_details(entry, user_email=emails.get(entry_user_id))
+                if query and query not in entry['details'].casefold():
+                    continue
+                yield entry
+
+    def read_segment(self, name):
+        with gzip.open(os.path.join(self.root, name), 'rb') as f:
+            for line in f:
+                yield orjson.loads(line)
+
+    # ----- writing -----
+
+    def write_segment(self, rows):
+        """
+        Writes ``rows`` (dicts with ``LOG_FIELDS``, in timestamp order) as one
+        segment and records its index. Rewriting the same rows, e.g. after
+        an interrupted run, replaces the segment instead of duplicating it.
+        """
+        ids = [row['id'] for row in rows]
+        first = timezone.localtime(rows[0]['timestamp'])
+        name = f"{first:%Y-%m}/{min(ids)}-{max(ids)}.jsonl.gz"
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                    for row in rows:
+                        f.write(orjson.dumps({field: row[field] for field in LOG_FIELDS}) + b'\n')
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        index = {
+            'rows': len(rows),
+            'first': min(row['timestamp'] for row in rows).isoformat(),
+            'last': max(row['timestamp'] for row in rows).isoformat(),
+            'visitor_ids': sorted({row['visitor_id'] for row in rows if row['visitor_id'] is not None}),
+            'actions': sorted({row['action'] for row in rows}),
+            'user_ids': sorted({row['user_id'] for row in rows if row['user_id'] is not None}),
+            'bytes': os.path.getsize(path),
+            'created_at': timezone.now().isoformat(),
+        }
+        manifest = self.manifest()
+        manifest['segments'][name] = index
+        self._write_json(os.path.join(self.root, MANIFEST_NAME), manifest)
+        return name, index
+
+    def _write_json(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
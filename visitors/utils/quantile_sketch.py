@@ -0,0 +1,117 @@
+import math
+
+
+class DurationSketch:
+    """
+    Mergeable DDSketch-style quantile sketch for visit durations (in seconds).
+
+    Values are mapped to logarithmically sized buckets, so every quantile
+    estimate is within ``relative_accuracy`` of the true value. Two sketches
+    built with the same accuracy are merged by adding their bucket counts,
+    which lets daily sketches be combined for any date range.
+    """
+
+    DEFAULT_RELATIVE_ACCURACY = 0.01
+    DEFAULT_MAX_BINS = 2048
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY, max_bins=DEFAULT_MAX_BINS):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _key(self, value):
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value, weight=1):
+        """Adds a duration; negative values (clock skew) are clamped to zero."""
+        value = max(float(value), 0.0)
+        if value == 0:
+            self.zero_count += weight
+        else:
+            key = self._key(value)
+            self.bins[key] = self.bins.get(key, 0) + weight
+            self._collapse()
+        self.count += weight
+        self.total += value * weight
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        """Merges another sketch with the same accuracy into this one."""
+        if not math.isclose(self.relative_accuracy, other.relative_accuracy):
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        if not other.count:
+            return self
+        for key, weight in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + weight
+        self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def _collapse(self):
+        """Folds the lowest buckets together so memory stays bounded."""
+        if len(self.bins) <= self.max_bins:
+            return
+        keys = sorted(self.bins)
+        overflow = keys[:len(keys) - self.max_bins + 1]
+        target = overflow[-1]
+        self.bins[target] = sum(self.bins.pop(key) for key in overflow[:-1]) + self.bins[target]
+
+    def quantile(self, q):
+        """Returns the estimated value at quantile ``q`` (0..1), or None when empty."""
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1")
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        running = self.zero_count
+        if rank < running:
+            return 0.0
+        for key in sorted(self.bins):
+            running += self.bins[key]
+            if running > rank:
+                return min(max(self._value(key), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'bins': {str(key): weight for key, weight in self.bins.items()},
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(relative_accuracy=data.get('relative_accuracy', cls.DEFAULT_RELATIVE_ACCURACY))
+        sketch.bins = {int(key): weight for key, weight in (data.get('bins') or {}).items()}
+        sketch.zero_count = data.get('zero_count', 0)
+        sketch.count = data.get('count', 0)
+        sketch.total = data.get('total', 0.0)
+        sketch.min = data.get('min')
+        sketch.max = data.get('max')
+        return sketch
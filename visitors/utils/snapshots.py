@@ -0,0 +1,108 @@
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    data: Any
+    version: str
+    generated_at: datetime
+    refreshed_at: datetime
+
+
+def json_version(data):
+    """Content hash of JSON-serialisable data, used as the snapshot version."""
+    payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class PeriodicSnapshot:
+    """
+    Keeps the latest result of ``builder`` in memory and rebuilds it on a
+    daemon thread every ``interval`` seconds.
+
+    Readers never wait for a rebuild: they get the current snapshot, and a
+    finished rebuild replaces it with a single reference assignment. Only the
+    very first read in a process builds synchronously (once, under a lock).
+    ``generated_at`` only moves when the content version changes, so it can be
+    used as Last-Modified.
+    """
+
+    def __init__(self, name: str, builder: Callable[[], Any], interval: float,
+                 version: Callable[[Any], str] = json_version):
+        self.name = name
+        self.builder = builder
+        self.interval = interval
+        self.version = version
+        self._current: Optional[Snapshot] = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self) -> Snapshot:
+        snapshot = self._current
+        if snapshot is None:
+            with self._lock:
+                if self._current is None:
+                    self.refresh()
+            snapshot = self._current
+        self.start()
+        return snapshot
+
+    def peek(self) -> Optional[Snapshot]:
+        """
+        Returns the current snapshot without ever building on the caller's
+        thread; None until the refresher has produced its first build.
+        """
+        self.start()
+        return self._current
+
+    def refresh(self) -> Snapshot:
+        data = self.builder()
+        version = self.version(data)
+        refreshed_at = timezone.now()
+        previous = self._current
+        generated_at = previous.generated_at if previous and previous.version == version else refreshed_at
+        self._current = Snapshot(data, version, generated_at, refreshed_at)
+        return self._current
+
+    def request_refresh(self):
+        """Wakes the refresher early, e.g. after a write that changes the data."""
+        self._wakeup.set()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"{self.name}-refresher",
+                daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        delay = 0 if self._current is None else self.interval
+        while True:
+            if self._wakeup.wait(delay):
+                self._wakeup.clear()
+            delay = self.interval
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh %s snapshot", self.name)
+            finally:
+                close_old_connections()
@@ -0,0 +1,57 @@
+import threading
+
+from django.core.cache import cache
+
+GENERATION_KEY = 'generation:{}'
+
+
+def get_generation(name):
+    """
+    Current generation of ``name``. Processes only see each other's bumps
+    when the default cache is shared (``CACHES`` uses the database cache).
+    """
+    generation = cache.get(GENERATION_KEY.format(name))
+    if generation is None:
+        cache.add(GENERATION_KEY.format(name), 1, timeout=None)
+        generation = cache.get(GENERATION_KEY.format(name), 1)
+    return generation
+
+
+def bump_generation(name):
+    """Invalidates every process's copy of ``name``."""
+    key = GENERATION_KEY.format(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 2, timeout=None)
+        return cache.get(key, 2)
+
+
+class GenerationCache:
+    """
+    Keeps one in-process value built by ``builder`` and rebuilds it only
+    when the generation counter for ``name`` has moved on, at the cost of
+    one cache read per access. With a shared cache backend (the database
+    cache in ``CACHES``) a write in any process invalidates all of them; a
+    per-process backend such as LocMemCache would only invalidate the
+    writer's own copy.
+    """
+
+    def __init__(self, name, builder):
+        self.name = name
+        self.builder = builder
+        self._value = None
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        generation = get_generation(self.name)
+        if self._generation != generation:
+            with self._lock:
+                if self._generation != generation:
+                    self._value = self.builder()
+                    self._generation = generation
+        return self._value
+
+    def invalidate(self):
+        bump_generation(self.name)
@@ -6,8 +6,10 @@ from .visitors import (
     CurrentVisitorsView,
     QRCheckInAPIView,
     kiosk_checkin_view,
+    kiosk_lookup_view,
     VisitorBadgePDFView,
     offline_checkin_view,
+    offline_sync_view,
     DashboardStatsView,
     PendingApprovalsView
 )
@@ -18,7 +20,10 @@ from .analytics import (
     ExportVisitorsCSVView,
     MonthlyTrendsView,
     PeakHoursView,
-    ExportVisitorsView
+    ExportVisitorsView,
+    VisitDurationPercentilesView,
+    AnalyticsQueryView,
+    VisitLeaderboardView
 )
 
 from .authentication import (
@@ -33,7 +38,12 @@ from .emergency import (
 
 from .forms import FormFieldViewSet
 from .landing import LandingStatsView
-from .logs import VisitorLogListView
+from .directory import HostDirectoryView
+from .kiosk import KioskBootstrapView
+from .sync import SyncView
+from .logs import VisitorLogListView, VisitorLogArchiveView
+from .exports import ExportJobListView, ExportJobDetailView, ExportJobDownloadView
+from .roll_call import RollCallListView, RollCallDetailView, RollCallEntryView, RollCallCloseView
 
 from notifications.notifier import (
     ManualNotificationView,
@@ -49,8 +59,10 @@ __all__ = [
     'CurrentVisitorsView',
     'QRCheckInAPIView',
     'kiosk_checkin_view',
+    'kiosk_lookup_view',
     'VisitorBadgePDFView',
     'offline_checkin_view',
+    'offline_sync_view',
     'DashboardStatsView',
     'PendingApprovalsView',
     
@@ -61,6 +73,9 @@ __all__ = [
     'MonthlyTrendsView',
     'PeakHoursView',
     'ExportVisitorsView',
+    'VisitDurationPercentilesView',
+    'AnalyticsQueryView',
+    'VisitLeaderboardView',
     
     # Authentication
     'LoginView',
@@ -75,9 +90,30 @@ __all__ = [
     
     # Landing
     'LandingStatsView',
+
+    # Host directory
+    'HostDirectoryView',
+
+    # Kiosk bootstrap
+    'KioskBootstrapView',
+
+    # Delta sync
+    'SyncView',
     
     # Logs
     'VisitorLogListView',
+    'VisitorLogArchiveView',
+
+    # Export jobs
+    'ExportJobListView',
+    'ExportJobDetailView',
+    'ExportJobDownloadView',
+
+    # Evacuation roll calls
+    'RollCallListView',
+    'RollCallDetailView',
+    'RollCallEntryView',
+    'RollCallCloseView',
     
     # Notifications
     'ManualNotificationView',
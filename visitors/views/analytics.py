@@ -19,8 +19,18 @@ import csv
 from reportlab.pdfgen import canvas
 from io import BytesIO
 
-from ..models import Visitor
+from django.conf import settings
+from django.utils.dateparse import parse_date
+
+from ..models import Company, HostVisitStats, Visitor, VisitDurationSketch
 from ..serializers import EmergencyVisitorSerializer
+from ..utils.columnar import VisitorFrame, DIMENSIONS as FRAME_DIMENSIONS, METRICS as FRAME_METRICS
+from ..utils.csv_export import (
+    VISITOR_EXPORT_FIELDS, VISITOR_EXPORT_HEADER, csv_export_response, export_rows,
+    filter_export_visitors, visitor_export_row,
+)
+from ..utils.quantile_sketch import DurationSketch
+from ..utils.snapshots import PeriodicSnapshot
 
 
 class VisitorAnalyticsBaseView(views.APIView):
@@ -85,6 +95,233 @@ class VisitorStatsView(VisitorAnalyticsBaseView):
                 .order_by('-count'))
 
 
+class VisitDurationPercentilesView(VisitorAnalyticsBaseView):
+    """
+    API endpoint for visit duration percentiles
+    GET /api/analytics/durations/?start=2025-01-01&end=2025-01-31&group_by=host&quantiles=0.5,0.9,0.99
+
+    Percentiles are read from the daily duration sketches maintained at
+    check-out and merged for the requested range, so every value is within
+    the sketch's relative accuracy of the exact percentile.
+    """
+    GROUP_FIELDS = {
+        'host': ('host_id', 'host__first_name', 'host__last_name'),
+        'branch': ('branch_id', 'branch__name'),
+        'visitor_type': ('visitor_type',),
+    }
+    FILTER_FIELDS = {
+        'branch': 'branch_id',
+        'host': 'host_id',
+        'visitor_type': 'visitor_type',
+    }
+    DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+    def get(self, request):
+        today = now().date()
+        try:
+            start = parse_date(request.query_params.get('start', '')) or today - timedelta(days=30)
+            end = parse_date(request.query_params.get('end', '')) or today
+        except ValueError:
+            # Well-formed but impossible dates, e.g. 2024-02-30
+            return Response({"error": "start and end must be valid YYYY-MM-DD dates"}, status=400)
+        group_by = request.query_params.get('group_by')
+
+        if group_by and group_by not in self.GROUP_FIELDS:
+            return Response(
+                {"error": f"group_by must be one of: {', '.join(self.GROUP_FIELDS)}"},
+                status=400
+            )
+        try:
+            quantiles = self._parse_quantiles(request.query_params.get('quantiles'))
+        except ValueError:
+            return Response(
+                {"error": "quantiles must be comma-separated numbers between 0 and 1"},
+                status=400
+            )
+
+        rows = VisitDurationSketch.objects.filter(day__gte=start, day__lte=end)
+        for param, field in self.FILTER_FIELDS.items():
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            if field.endswith('_id'):
+                try:
+                    value = int(value)
+                except ValueError:
+                    return Response({"error": f"{param} must be an integer id"}, status=400)
+            rows = rows.filter(**{field: value})
+
+        fields = self.GROUP_FIELDS.get(group_by, ())
+        groups = {}
+        for row in rows.values('sketch', *fields).iterator():
+            key = tuple(row[field] for field in fields)
+            groups.setdefault(key, []).append(row['sketch'])
+
+        results = []
+        for key, sketches in groups.items():
+            sketch = VisitDurationSketch.merge_rows(sketches)
+            result = {'count': sketch.count, 'mean_seconds': sketch.mean}
+            result.update({
+                self._quantile_label(q): sketch.quantile(q) for q in quantiles
+            })
+            if group_by:
+                result.update(self._group_label(group_by, key))
+            results.append(result)
+        results.sort(key=lambda item: item['count'], reverse=True)
+
+        return Response({
+            'start': start,
+            'end': end,
+            'group_by': group_by,
+            'relative_accuracy': DurationSketch.DEFAULT_RELATIVE_ACCURACY,
+            'results': results,
+        })
+
+    def _parse_quantiles(self, value):
+        if not value:
+            return self.DEFAULT_QUANTILES
+        quantiles = [float(part) for part in value.split(',') if part.strip()]
+        if not quantiles or any(not 0 <= q <= 1 for q in quantiles):
+            raise ValueError(value)
+        return quantiles
+
+    def _quantile_label(self, q):
+        return f"p{q * 100:g}"
+
+    def _group_label(self, group_by, key):
+        if group_by == 'host':
+            host_id, first_name, last_name = key
+            name = f"{first_name or ''} {last_name or ''}".strip()
+            return {'host_id': host_id, 'label': name or 'Unassigned'}
+        if group_by == 'branch':
+            branch_id, name = key
+            return {'branch_id': branch_id, 'label': name or 'Unassigned'}
+        return {'visitor_type': key[0], 'label': key[0]}
+
+
+class VisitLeaderboardView(VisitorAnalyticsBaseView):
+    """
+    Top companies and hosts by number of visits
+    GET /api/analytics/leaderboard/?kind=companies&limit=10
+
+    Reads the visit counters kept up to date at check-in, so each board is
+    an index scan rather than a GROUP BY over all visitors.
+    """
+    MAX_LIMIT = 100
+
+    def get(self, request):
+        kind = request.query_params.get('kind', 'companies')
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), self.MAX_LIMIT)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=400)
+
+        if kind == 'companies':
+            results = [
+                {
+                    'company_id': company.id,
+                    'company': company.name,
+                    'visits': company.visit_count,
+                    'last_visit': company.last_visit_at,
+                }
+                for company in Company.objects.filter(visit_count__gt=0).order_by('-visit_count', 'id')[:limit]
+            ]
+        elif kind == 'hosts':
+            results = [
+                {
+                    'host_id': stats.host_id,
+                    'host': stats.host.get_full_name(),
+                    'visits': stats.visit_count,
+                    'last_visit': stats.last_visit_at,
+                }
+                for stats in HostVisitStats.objects.select_related('host')
+                .filter(visit_count__gt=0).order_by('-visit_count', 'host')[:limit]
+            ]
+        else:
+            return Response({"error": "kind must be 'companies' or 'hosts'"}, status=400)
+
+        return Response({'kind': kind, 'results': results})
+
+
+visitor_frame_snapshot = PeriodicSnapshot(
+    'visitor-frame',
+    VisitorFrame.build,
+    interval=getattr(settings, 'ANALYTICS_FRAME_REFRESH_SECONDS', 300),
+    version=lambda frame: frame.version
+)
+
+
+class AnalyticsQueryView(VisitorAnalyticsBaseView):
+    """
+    Ad-hoc analytics over an in-memory columnar snapshot of visitors
+    GET /api/analytics/query/?group_by=weekday,hour&metrics=count,avg_duration&start=2025-01-01&end=2025-03-31
+
+    Dimensions: status, visitor_type, branch, host, company, weekday, hour, day, month
+    Metrics: count, completed, total_duration, avg_duration (seconds)
+    Filters: status, visitor_type, branch, host, company
+
+    The snapshot is rebuilt on a background thread, so queries never touch
+    the database; answers may lag writes by up to the refresh interval.
+    """
+    FILTERS = ('status', 'visitor_type', 'branch', 'host', 'company')
+    MAX_DIMENSIONS = 3
+
+    def get(self, request):
+        params = request.query_params
+        group_by = [name for name in params.get('group_by', '').split(',') if name]
+        metrics = [name for name in params.get('metrics', 'count').split(',') if name]
+
+        unknown = [name for name in group_by if name not in FRAME_DIMENSIONS]
+        unknown += [name for name in metrics if name not in FRAME_METRICS]
+        if unknown:
+            return Response(
+                {"error": f"Unknown dimensions or metrics: {', '.join(unknown)}"},
+                status=400
+            )
+        if len(group_by) > self.MAX_DIMENSIONS:
+            return Response(
+                {"error": f"At most {self.MAX_DIMENSIONS} group_by dimensions are supported"},
+                status=400
+            )
+
+        try:
+            start = parse_date(params.get('start', ''))
+            end = parse_date(params.get('end', ''))
+        except ValueError:
+            # Well-formed but impossible dates, e.g. 2024-02-30
+            return Response({"error": "start and end must be valid YYYY-MM-DD dates"}, status=400)
+
+        filters = {}
+        for name in self.FILTERS:
+            value = params.get(name)
+            if value:
+                filters[name] = int(value) if name in ('branch', 'host') and value.isdigit() else value
+
+        snapshot = visitor_frame_snapshot.peek()
+        if snapshot is None:
+            response = Response(
+                {"error": "Analytics snapshot is warming up, retry shortly"},
+                status=503
+            )
+            response['Retry-After'] = '5'
+            return response
+
+        rows = snapshot.data.query(
+            group_by=group_by,
+            metrics=metrics,
+            start=start,
+            end=end,
+            filters=filters
+        )
+        return Response({
+            'version': snapshot.version,
+            'generated_at': snapshot.generated_at,
+            'group_by': group_by,
+            'metrics': metrics,
+            'rows': rows,
+        })
+
+
 class VisitorTrendsView(VisitorAnalyticsBaseView):
     """
     API endpoint for visitor trend analysis
@@ -140,7 +377,7 @@ class ExportVisitorsView(VisitorAnalyticsBaseView):
     """
     def get(self, request, format='csv'):
         if format == 'csv':
-            return self._export_csv()
+            return self._export_csv(request)
         elif format == 'pdf':
             return self._export_pdf()
         return Response(
@@ -148,39 +385,14 @@ class ExportVisitorsView(VisitorAnalyticsBaseView):
             status=400
         )
 
-    def _export_csv(self):
-        visitors = (Visitor.objects
-                   .all()
-                   .select_related('host')
-                   .order_by('-check_in_time'))
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="visitors_export.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'Name', 'Company', 'Email', 'Phone',
-            'Host', 'Visitor Type',
-            'Check-in Time', 'Check-out Time', 'Status',
-            'Purpose', 'Notes'
-        ])
-        
-        for visitor in visitors:
-            writer.writerow([
-                visitor.full_name,
-                visitor.company,
-                visitor.email or '',
-                visitor.phone or '',
-                visitor.host.get_full_name() if visitor.host else '',
-                visitor.visitor_type,
-                visitor.check_in_time.strftime('%Y-%m-%d %H:%M'),
-                visitor.check_out_time.strftime('%Y-%m-%d %H:%M') if visitor.check_out_time else '',
-                visitor.status,
-                visitor.purpose or '',
-                visitor.notes or ''
-            ])
-        
-        return response
+    def _export_csv(self, request):
+        try:
+            visitors = filter_export_visitors(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        rows = export_rows(visitors, VISITOR_EXPORT_FIELDS, visitor_export_row)
+        return csv_export_response(request, 'visitors_export.csv', VISITOR_EXPORT_HEADER, rows)
 
     def _export_pdf(self):
         visitors = Visitor.objects.filter(status__in=['checked_in', 'in_meeting'])
@@ -229,24 +441,25 @@ class EmergencyReportView(VisitorAnalyticsBaseView):
         })
 
 class ExportVisitorsCSVView(APIView):
+    """
+    Streams visitors with their branch as CSV; takes the same
+    ?start_date=&end_date=&branch=&status=&gzip= filters as /api/analytics/export/csv/
+    """
     def get(self, request, *args, **kwargs):
-        response = HttpResponse(
-            content_type='text/csv',
-            headers={'Content-Disposition': 'attachment; filename="visitors.csv"'},
+        try:
+            visitors = filter_export_visitors(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        rows = export_rows(
+            visitors, ('first_name', 'last_name', 'phone', 'check_in_time', 'branch__name'),
+            lambda first_name, last_name, phone, check_in_time, branch: [
+                f"{first_name} {last_name}", phone, check_in_time, branch or ''
+            ]
+        )
+        return csv_export_response(
+            request, 'visitors.csv', ['Name', 'Phone', 'Check In Time', 'Branch'], rows
         )
-
-        writer = csv.writer(response)
-        writer.writerow(['Name', 'Phone', 'Check In Time', 'Branch'])
-
-        for visitor in Visitor.objects.all():
-            writer.writerow([
-                visitor.name,
-                visitor.phone_number,
-                visitor.check_in_time,
-                visitor.branch.name if visitor.branch else ''
-            ])
-
-        return response
 
 class PeakHoursView(APIView):
     def get(self, request):
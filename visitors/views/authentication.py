@@ -18,7 +18,7 @@ from django.contrib.auth.tokens import default_token_generator
 from django.urls import reverse
 from django.conf import settings
 
-from ..models import VisitorLog
+from ..audit import audit_log
 from ..serializers import (
     RegisterSerializer, 
     CustomTokenObtainPairSerializer,
@@ -70,9 +70,9 @@ class LoginView(TokenObtainPairView):
             )
 
     def _create_login_log(self, user):
-        VisitorLog.objects.create(
+        audit_log.log(
             action='USER_LOGIN',
-            details=f'User logged in: {user.email}',
+            payload={'email': user.email},
             user=user
         )
 
@@ -136,9 +136,9 @@ class RegisterView(views.APIView):
         )
 
     def _create_registration_log(self, user):
-        VisitorLog.objects.create(
+        audit_log.log(
             action='USER_REGISTER',
-            details=f'New user registered: {user.email}',
+            payload={'email': user.email},
             user=user
         )
 
@@ -196,9 +196,9 @@ class LogoutView(APIView):
             )
 
     def _create_logout_log(self, user):
-        VisitorLog.objects.create(
+        audit_log.log(
             action='USER_LOGOUT',
-            details=f'User logged out: {user.email}',
+            payload={'email': user.email},
             user=user
         )
 
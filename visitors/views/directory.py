@@ -0,0 +1,53 @@
+from rest_framework import views, status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from ..utils.host_directory import host_directory
+from ..utils.http_cache import apply_validators, make_etag, not_modified_response
+from ..utils.snapshots import json_version
+
+
+class HostDirectoryView(views.APIView):
+    """
+    Host directory for kiosks, with prefix search
+    GET /api/hosts/directory/?branch=1&role=host&q=ann%20k&limit=50&offset=0
+
+    Served from an in-process sorted index that is rebuilt only when users
+    or branches change. The ETag covers the directory version and the
+    query, so kiosks can revalidate with If-None-Match and get a 304.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    default_limit = 50
+    max_limit = 200
+    cache_control = 'public, max-age=0, must-revalidate'
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            branch_id = int(params['branch']) if params.get('branch') else None
+            limit = min(max(int(params.get('limit', self.default_limit)), 1), self.max_limit)
+            offset = max(int(params.get('offset', 0)), 0)
+        except ValueError:
+            return Response(
+                {"error": "branch, limit and offset must be integers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        query = params.get('q', '').strip()
+        role = params.get('role') or None
+
+        directory = host_directory.get()
+        etag = make_etag(json_version([directory.version, branch_id, role, query, limit, offset]))
+        response = not_modified_response(request, etag=etag, cache_control=self.cache_control)
+        if response is not None:
+            return response
+
+        matches = directory.search(query, branch_id=branch_id, role=role)
+        page = matches[offset:offset + limit]
+        response = Response({
+            'version': directory.version,
+            'count': len(matches),
+            'next_offset': offset + limit if offset + limit < len(matches) else None,
+            'results': page,
+        })
+        return apply_validators(response, etag=etag, cache_control=self.cache_control)
@@ -3,27 +3,17 @@ from rest_framework import views, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser
 from rest_framework.decorators import action
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, HttpResponse, JsonResponse
 from django.db.models import Q
 from django.utils.timezone import now
 from django.conf import settings
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import (
-    SimpleDocTemplate, 
-    Paragraph, 
-    Table, 
-    TableStyle, 
-    Spacer,
-    Image
-)
 from io import BytesIO
 import qrcode
 import logging
 
-from ..models import Visitor, VisitorLog, CustomUser
-from ..serializers import EmergencyVisitorSerializer
+from ..audit import audit_log
+from ..emergency_snapshot import emergency_snapshots
+from ..models import Branch, Visitor, CustomUser
 from notifications.notifier import  (
     send_email_notification,
     send_sms_notification,
@@ -43,11 +33,11 @@ class EmergencyBaseView(views.APIView):
             Q(status='checked_in') | Q(status='in_meeting')
         ).select_related('host', 'location').prefetch_related('custom_fields')
     
-    def _create_emergency_log(self, action, details, user):
+    def _create_emergency_log(self, action, payload, user):
         """Creates an audit log entry for emergency actions"""
-        VisitorLog.objects.create(
+        audit_log.log(
             action=action,
-            details=details,
+            payload=payload,
             user=user
         )
 
@@ -66,19 +56,19 @@ class EmergencyReportAPIView(EmergencyBaseView):
     
     def get(self, request):
         try:
-            visitors = self._get_current_visitors().order_by('-check_in_time')
-            serializer = EmergencyVisitorSerializer(visitors, many=True)
+            # Maintained on every movement; no per-request query or photo encoding
+            roll_call = emergency_snapshots.read_json(request.query_params.get('branch') or None)
             
             self._create_emergency_log(
                 action='EMERGENCY_REPORT_GENERATED',
-                details=f'Emergency report generated with {visitors.count()} visitors',
+                payload={'visitor_count': roll_call['count']},
                 user=request.user
             )
             
             response_data = {
-                'timestamp': now().isoformat(),
-                'total_visitors': visitors.count(),
-                'visitors': serializer.data,
+                'timestamp': roll_call['generated_at'],
+                'total_visitors': roll_call['count'],
+                'visitors': roll_call['visitors'],
                 'emergency_contacts': self._get_emergency_contacts(),
                 'building_status': self._get_building_status(),
                 'assembly_points': self._get_assembly_points()
@@ -86,6 +76,8 @@ class EmergencyReportAPIView(EmergencyBaseView):
             
             return Response(response_data)
             
+        except (ValueError, Branch.DoesNotExist):
+            return Response({"error": "Unknown branch"}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Emergency report error: {str(e)}")
             return Response(
@@ -146,141 +138,32 @@ class EmergencyReportPDFView(EmergencyBaseView):
     
     def get(self, request):
         try:
-            visitors = self._get_current_visitors()
-            buffer = BytesIO()
-            
-            doc = SimpleDocTemplate(
-                buffer,
-                pagesize=letter,
-                title="Emergency Visitor Report",
-                author="Visitor Management System"
-            )
-            
-            elements = []
-            
-            # Add report header
-            styles = self._get_pdf_styles()
-            elements.append(Paragraph("EMERGENCY VISITOR REPORT", styles['Title']))
-            elements.append(Paragraph(f"Generated: {now().strftime('%Y-%m-%d %H:%M')}", styles['Small']))
-            elements.append(Paragraph(f"Total Visitors: {visitors.count()}", styles['Small']))
-            elements.append(Spacer(1, 24))
-            
-            # Add emergency procedures
-            elements.append(Paragraph("EMERGENCY PROCEDURES", styles['Heading2']))
-            procedures = [
-                "1. Remain calm and follow evacuation routes",
-                "2. Assist visitors as needed",
-                "3. Account for all personnel at assembly points",
-                "4. Do not use elevators",
-                "5. Report to floor warden if present"
-            ]
-            for procedure in procedures:
-                elements.append(Paragraph(procedure, styles['Normal']))
-            elements.append(Spacer(1, 24))
-            
-            # Add emergency contacts table
-            elements.append(Paragraph("EMERGENCY CONTACTS", styles['Heading2']))
-            contacts = [
-                ["Security", settings.EMERGENCY_SECURITY_NUMBER],
-                ["Fire Department", settings.EMERGENCY_FIRE_NUMBER],
-                ["Medical", settings.EMERGENCY_MEDICAL_NUMBER],
-                ["Facility Manager", settings.EMERGENCY_MANAGER_EMAIL]
-            ]
-            contact_table = Table(contacts, colWidths=[150, 150])
-            contact_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOX', (0, 0), (-1, -1), 1, colors.black),
-            ]))
-            elements.append(contact_table)
-            elements.append(Spacer(1, 24))
-            
-            # Add visitor table
-            elements.append(Paragraph("CURRENT VISITORS", styles['Heading2']))
-            visitor_data = self._prepare_visitor_data(visitors)
-            visitor_table = Table(
-                visitor_data, 
-                colWidths=[100, 80, 80, 80, 60, 60],
-                repeatRows=1
-            )
-            visitor_table.setStyle(self._get_table_style())
-            elements.append(visitor_table)
-            
-            # Build PDF document
-            doc.build(elements)
+            # Pre-rendered in the background after every check-in/out
+            branch = request.query_params.get('branch') or None
+            path = emergency_snapshots.pdf_path(branch)
+            roll_call = emergency_snapshots.read_json(branch)
             
-            # Create log entry
             self._create_emergency_log(
                 action='EMERGENCY_PDF_GENERATED',
-                details=f'Generated PDF report with {visitors.count()} visitors',
+                payload={'visitor_count': roll_call['count']},
                 user=request.user
             )
             
-            # Return PDF response
-            buffer.seek(0)
-            response = HttpResponse(buffer, content_type='application/pdf')
-            response['Content-Disposition'] = 'attachment; filename="emergency_visitor_report.pdf"'
-            return response
+            return FileResponse(
+                open(path, 'rb'),
+                as_attachment=True,
+                filename='emergency_visitor_report.pdf',
+                content_type='application/pdf'
+            )
             
+        except (ValueError, Branch.DoesNotExist):
+            return Response({"error": "Unknown branch"}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"PDF generation error: {str(e)}")
             return Response(
                 {"error": "Failed to generate PDF report"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-    
-    def _get_pdf_styles(self):
-        """Returns configured PDF styles"""
-        styles = getSampleStyleSheet()
-        styles.add(ParagraphStyle(
-            name='Title',
-            fontSize=16,
-            leading=20,
-            alignment=1,  # Center aligned
-            fontName='Helvetica-Bold'
-        ))
-        styles.add(ParagraphStyle(
-            name='Heading2',
-            fontSize=12,
-            leading=15,
-            fontName='Helvetica-Bold',
-            spaceAfter=6
-        ))
-        return styles
-    
-    def _prepare_visitor_data(self, visitors):
-        """Prepares visitor data for PDF table"""
-        visitor_data = [
-            ["Name", "Company", "Host", "Location", "Check-In", "Badge #"]
-        ]
-        
-        for visitor in visitors:
-            visitor_data.append([
-                visitor.full_name,
-                visitor.company or "N/A",
-                visitor.host.get_full_name() if visitor.host else "N/A",
-                getattr(visitor.location, 'name', 'Main Lobby'),
-                visitor.check_in_time.strftime('%H:%M'),
-                visitor.badge_number or "N/A"
-            ])
-        
-        return visitor_data
-    
-    def _get_table_style(self):
-        """Returns table styling configuration"""
-        return TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#003366')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ])
 
 
 class EmergencyNotificationView(EmergencyBaseView):
@@ -354,10 +237,12 @@ class EmergencyNotificationView(EmergencyBaseView):
             # Log the notification event
             self._create_emergency_log(
                 action='EMERGENCY_NOTIFICATION_SENT',
-                details=(
-                    f'Sent {emergency_type} alert via {channels} to '
-                    f'{notification_results["successful"]}/{len(hosts)} hosts'
-                ),
+                payload={
+                    'emergency_type': emergency_type,
+                    'channels': channels,
+                    'successful': notification_results['successful'],
+                    'hosts': len(hosts),
+                },
                 user=request.user
             )
             
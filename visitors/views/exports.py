@@ -0,0 +1,84 @@
+from django.core import signing
+from django.http import FileResponse
+from rest_framework import status, views
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+
+from ..exports import ExportConflict, job_for_token, request_export
+from ..models import ExportJob
+from ..serializers import ExportJobSerializer
+
+
+class ExportJobListView(views.APIView):
+    """
+    Background visitor exports
+    GET /api/visitors/exports/ (your 20 most recent jobs; all jobs for staff)
+    POST /api/visitors/exports/ {"format": "xlsx", "start_date": "2022-01-01", "end_date": "2024-12-31", "branch": 2, "status": "checked_out"}
+
+    Returns 202 with the job while it is queued or running, and 200 when an
+    unchanged earlier export of yours is ready straight away. Progress is
+    pushed over /ws/notifications/<user_id>/; the download link is at
+    /api/visitors/exports/<id>/.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        jobs = ExportJob.objects.all()
+        if not request.user.is_staff:
+            jobs = jobs.filter(created_by=request.user)
+        serializer = ExportJobSerializer(jobs[:20], many=True, context={'request': request})
+        return Response(serializer.data)
+
+    def post(self, request):
+        export_format = str(request.data.get('format', ExportJob.Format.CSV)).lower()
+        try:
+            job, created = request_export(export_format, request.data, request.user)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except ExportConflict as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_409_CONFLICT)
+
+        data = ExportJobSerializer(job, context={'request': request}).data
+        data['reused'] = not created
+        done = job.status == ExportJob.Status.COMPLETED
+        return Response(data, status=status.HTTP_200_OK if done else status.HTTP_202_ACCEPTED)
+
+
+class ExportJobDetailView(views.APIView):
+    """
+    Status and progress of an export job
+    GET /api/visitors/exports/<id>/ (download_url is set once completed)
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        jobs = ExportJob.objects.all()
+        if not request.user.is_staff:
+            jobs = jobs.filter(created_by=request.user)
+        job = jobs.filter(pk=pk).first()
+        if job is None:
+            return Response({"error": "Export not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ExportJobSerializer(job, context={'request': request, 'download': True}).data)
+
+
+class ExportJobDownloadView(views.APIView):
+    """
+    Downloads a finished export through its signed, time-limited link
+    GET /api/visitors/exports/<id>/download/?token=...
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, pk):
+        try:
+            job = job_for_token(pk, request.query_params.get('token', ''))
+        except signing.SignatureExpired:
+            return Response({"error": "Download link has expired"}, status=status.HTTP_410_GONE)
+        except signing.BadSignature:
+            return Response({"error": "Invalid download link"}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            f = job.file.open('rb')
+        except FileNotFoundError:
+            return Response({"error": "Export file is no longer available"}, status=status.HTTP_410_GONE)
+        return FileResponse(f, as_attachment=True, filename=job.file.name.rsplit('/', 1)[-1])
@@ -4,9 +4,12 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
-from ..models import FormField
+from django.db.models import F
+from ..models import FormField, Visitor
 from ..serializers import FormFieldSerializer
 from ..permissions import IsAdminUser, IsReceptionistUser
+from ..utils.form_schema import form_schema
+from ..utils.http_cache import apply_validators, make_etag, not_modified_response
 
 class FormFieldViewSet(viewsets.ModelViewSet):
     """
@@ -22,23 +25,48 @@ class FormFieldViewSet(viewsets.ModelViewSet):
         """
         Returns only active form fields.
         Used by the frontend to display only relevant fields in the visitor form.
+        GET /api/form-fields/active_fields/?visitor_type=guest
+
+        Served from the compiled form schema (``options`` pre-split into
+        ``choices``), so it never queries the database; the ETag is the
+        schema version.
         """
-        fields = self.get_queryset().filter(is_active=True)
-        serializer = self.get_serializer(fields, many=True)
-        return Response(serializer.data)
+        visitor_type = request.query_params.get('visitor_type') or None
+        if visitor_type is not None and visitor_type not in Visitor.VisitorType.values:
+            return Response(
+                {'error': f"Unknown visitor_type '{visitor_type}'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        schema = form_schema.get()
+        etag = make_etag(f"{schema.version}-{visitor_type or 'all'}", weak=True)
+        response = not_modified_response(request, etag=etag)
+        if response is not None:
+            return response
+        return apply_validators(Response(schema.fields_for(visitor_type)), etag=etag)
     
     @action(detail=False, methods=['post'])
     def update_order(self, request):
         """
         Updates the order of form fields based on the provided list.
         Expects a list of objects with 'id' and 'order' properties.
+        Written with a single bulk update.
         """
         try:
+            orders = {int(item['id']): int(item['order']) for item in request.data}
+            if any(order < 0 for order in orders.values()):
+                raise ValueError("order must not be negative")
             with transaction.atomic():
-                for item in request.data:
-                    field = FormField.objects.get(id=item['id'])
-                    field.order = item['order']
-                    field.save()
+                fields = FormField.objects.select_for_update().in_bulk(list(orders))
+                missing = set(orders) - set(fields)
+                if missing:
+                    raise FormField.DoesNotExist(
+                        f"Form fields not found: {', '.join(map(str, sorted(missing)))}"
+                    )
+                for field_id, field in fields.items():
+                    field.order = orders[field_id]
+                FormField.objects.bulk_update(fields.values(), ['order'])
+                # bulk_update sends no signals
+                transaction.on_commit(form_schema.invalidate)
             return Response({'message': 'Order updated successfully'})
         except Exception as e:
             return Response(
@@ -62,4 +90,5 @@ class FormFieldViewSet(viewsets.ModelViewSet):
             # Reorder remaining fields after deletion
             instance.delete()
             fields = FormField.objects.filter(order__gt=instance.order)
-            fields.update(order=F('order') - 1)
\ No newline at end of file
+            fields.update(order=F('order') - 1)
+            transaction.on_commit(form_schema.invalidate)
\ No newline at end of file
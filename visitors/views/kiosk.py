@@ -0,0 +1,40 @@
+from rest_framework import views, status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from ..utils.http_cache import apply_validators, make_etag, not_modified_response
+from ..utils.kiosk_bootstrap import kiosk_bundle
+
+
+class KioskBootstrapView(views.APIView):
+    """
+    Everything a kiosk needs for a session in one response
+    GET /api/kiosk/bootstrap/?branch=1
+
+    Returns the active form fields, visitor settings, branches and the host
+    directory (limited to the branch when given), with a content hash as
+    ``version`` and ETag. The bundle is cached in-process and rebuilt only
+    after a form field, setting, branch or user changes, so a kiosk's
+    If-None-Match revalidation is normally a 304 without a query.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    cache_control = 'public, max-age=0, must-revalidate'
+
+    def get(self, request):
+        branch = request.query_params.get('branch')
+        try:
+            branch_id = int(branch) if branch else None
+        except ValueError:
+            return Response({"error": "branch must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        bundle = kiosk_bundle.get()
+        if branch_id is not None and bundle.branch(branch_id) is None:
+            return Response({"error": "Branch not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        version, data = bundle.payload(branch_id)
+        etag = make_etag(version)
+        response = not_modified_response(request, etag=etag, cache_control=self.cache_control)
+        if response is not None:
+            return response
+        return apply_validators(Response(data), etag=etag, cache_control=self.cache_control)
@@ -1,65 +1,37 @@
 # backend/visitors/views/landing.py
-from rest_framework import views
+from rest_framework import views, status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from django.conf import settings
 from django.utils.timezone import now
 from django.db.models import Count, Avg, ExpressionWrapper, DurationField, F
 from django.db.models.functions import TruncMonth, ExtractHour
-from ..models import Visitor, VisitorLog
+from ..models import Company, Visitor, VisitorLog
 from ..serializers import VisitorSerializer
+from ..utils.http_cache import apply_validators, make_etag, not_modified_response
+from ..utils.snapshots import PeriodicSnapshot
 import logging
 
 logger = logging.getLogger(__name__)
 
-class LandingStatsView(views.APIView):
+class LandingStatsBuilder:
     """
-    API endpoint for public landing page statistics.
-    Provides key metrics about visitor activity that can be displayed publicly.
+    Computes the public landing page metrics.
+    Runs on the snapshot refresher thread (and once per process on first use).
     """
-    permission_classes = [AllowAny]
 
-    def get(self, request):
-        """
-        Returns aggregated statistics about visitor activity:
-        - Total visits count
-        - Today's check-ins
-        - Average visit duration
-        - System uptime
-        - Trusted companies count
-        - Support availability
-        - Monthly visitor trends
-        - Peak hours analysis
-        """
-        try:
-            # Basic counts
-            total_visits = self._get_total_visits()
-            today_checkins = self._get_todays_checkins()
-            trusted_companies = self._get_trusted_companies_count()
-            current_visitors = self._get_current_visitors()
-
-            # Calculated metrics
-            avg_duration = self._calculate_average_duration()
-            monthly_trends = self._get_monthly_trends()
-            peak_hours = self._get_peak_hours()
-
-            return Response({
-                "uptime": self._get_system_uptime(),
-                "avg_checkin_time": avg_duration,
-                "trusted_companies": trusted_companies,
-                "support": "24/7",
-                "total_visits": total_visits,
-                "today_checkins": today_checkins,
-                "current_visitors": current_visitors,
-                "monthly_trends": monthly_trends,
-                "peak_hours": peak_hours,
-                "last_updated": now().isoformat()
-            })
-        except Exception as e:
-            logger.error(f"Error generating landing stats: {str(e)}", exc_info=True)
-            return Response(
-                {"error": "Could not generate statistics"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+    def build(self):
+        return {
+            "uptime": self._get_system_uptime(),
+            "avg_checkin_time": self._calculate_average_duration(),
+            "trusted_companies": self._get_trusted_companies_count(),
+            "support": "24/7",
+            "total_visits": self._get_total_visits(),
+            "today_checkins": self._get_todays_checkins(),
+            "current_visitors": self._get_current_visitors(),
+            "monthly_trends": self._get_monthly_trends(),
+            "peak_hours": self._get_peak_hours(),
+        }
 
     def _get_total_visits(self):
         """Returns total number of visitor check-ins"""
@@ -106,13 +78,9 @@ class LandingStatsView(views.APIView):
     def _get_trusted_companies_count(self):
         """
         Returns count of unique companies that have visited.
-        Enhanced with active company filtering.
+        Companies are normalized, so spelling variants count once.
         """
-        return Visitor.objects.exclude(
-            company__isnull=True
-        ).exclude(
-            company__exact=''
-        ).values('company').distinct().count()
+        return Company.objects.filter(visit_count__gt=0).count()
 
     def _get_system_uptime(self):
         """
@@ -126,7 +94,7 @@ class LandingStatsView(views.APIView):
         Returns visitor count by month for the last 12 months.
         Used for showing growth trends on landing page.
         """
-        monthly_data = (
+        monthly_data = list(
             Visitor.objects
             .annotate(month=TruncMonth('check_in_time'))
             .values('month')
@@ -137,9 +105,12 @@ class LandingStatsView(views.APIView):
             {
                 'month': item['month'].strftime('%Y-%m'),
                 'count': item['count'],
-                'growth_rate': self._calculate_growth_rate(monthly_data, item)
+                'growth_rate': self._calculate_growth_rate(
+                    item['count'],
+                    monthly_data[index + 1]['count'] if index + 1 < len(monthly_data) else None
+                )
             }
-            for item in monthly_data
+            for index, item in enumerate(monthly_data)
         ]
 
     def _get_peak_hours(self):
@@ -147,7 +118,7 @@ class LandingStatsView(views.APIView):
         Returns visitor distribution by hour of day.
         Helps identify busiest times.
         """
-        return (
+        return list(
             Visitor.objects
             .annotate(hour=ExtractHour('check_in_time'))
             .values('hour')
@@ -155,19 +126,68 @@ class LandingStatsView(views.APIView):
             .order_by('hour')
         )
 
-    def _calculate_growth_rate(self, monthly_data, current_item):
+    def _calculate_growth_rate(self, current_count, previous_count):
         """
         Helper method to calculate month-over-month growth rate.
         """
+        if previous_count:
+            return round((current_count - previous_count) / previous_count * 100, 1)
+        return 0
+
+
+landing_snapshot = PeriodicSnapshot(
+    'landing-stats',
+    LandingStatsBuilder().build,
+    interval=getattr(settings, 'LANDING_STATS_REFRESH_SECONDS', 60)
+)
+
+
+class LandingStatsView(views.APIView):
+    """
+    API endpoint for public landing page statistics.
+    Provides key metrics about visitor activity that can be displayed publicly.
+
+    Metrics are served from an in-memory snapshot that a background thread
+    refreshes periodically, so traffic on this public endpoint never reaches
+    the database. Responses carry ETag/Last-Modified for revalidation.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        """
+        Returns aggregated statistics about visitor activity:
+        - Total visits count
+        - Today's check-ins
+        - Average visit duration
+        - System uptime
+        - Trusted companies count
+        - Support availability
+        - Monthly visitor trends
+        - Peak hours analysis
+        """
         try:
-            current_index = list(monthly_data).index(current_item)
-            if current_index + 1 < len(monthly_data):
-                previous_count = monthly_data[current_index + 1]['count']
-                if previous_count > 0:
-                    return round(
-                        (current_item['count'] - previous_count) / previous_count * 100, 
-                        1
-                    )
-        except (ValueError, IndexError):
-            pass
-        return 0
\ No newline at end of file
+            snapshot = landing_snapshot.get()
+        except Exception as e:
+            logger.error(f"Error generating landing stats: {str(e)}", exc_info=True)
+            return Response(
+                {"error": "Could not generate statistics"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        etag = make_etag(snapshot.version)
+        cache_control = getattr(
+            settings,
+            'LANDING_STATS_CACHE_CONTROL',
+            'public, max-age=30, stale-while-revalidate=300'
+        )
+        not_modified = not_modified_response(request, etag, snapshot.generated_at, cache_control)
+        if not_modified is not None:
+            return not_modified
+
+        response = Response({
+            **snapshot.data,
+            "version": snapshot.version,
+            "last_updated": snapshot.generated_at.isoformat()
+        })
+        return apply_validators(response, etag, snapshot.generated_at, cache_control)
@@ -1,20 +1,46 @@
 # backend/visitors/views/logs.py
-from rest_framework import generics, filters
+from datetime import datetime, time, timedelta
+
+import orjson
+from rest_framework import generics, filters, status, views
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from ..models import VisitorLog
+from django.core.cache import cache
+from django.db.models import Count, Max, Min, Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from ..models import ChangeCounter, VisitorLog
 from ..serializers import VisitorLogSerializer
 from ..filters import VisitorLogFilter
-from rest_framework.pagination import PageNumberPagination
+from ..pagination import KeysetPagination
+from ..permissions import IsAdminUser
+from ..utils.log_archive import LogSegmentArchive
+from ..utils.snapshots import json_version
 import logging
 
 logger = logging.getLogger(__name__)
 
-class VisitorLogPagination(PageNumberPagination):
+# Upper bound on staleness from writes the change counter does not see (user edits)
+SUMMARY_CACHE_TIMEOUT = 300
+
+
+class VisitorLogPagination(KeysetPagination):
+    """Keyset pages over (timestamp, id), newest first unless ?ordering=timestamp."""
+    ordering = ('-timestamp', '-id')
+    orderings = {
+        '-timestamp': ('-timestamp', '-id'),
+        'timestamp': ('timestamp', 'id'),
+    }
+    ordering_query_param = 'ordering'
     page_size = 25
-    page_size_query_param = 'page_size'
     max_page_size = 100
 
+    def paginate_queryset(self, queryset, request, view=None):
+        self.ordering = self.orderings.get(request.query_params.get(self.ordering_query_param), self.ordering)
+        return super().paginate_queryset(queryset, request, view)
+
 class VisitorLogListView(generics.ListAPIView):
     """
     API endpoint that lists all visitor log entries with filtering and search capabilities.
@@ -23,10 +49,13 @@ class VisitorLogListView(generics.ListAPIView):
     - Date range
     - Visitor name
     - User who performed the action
+
+    Pages are cursor based (``next``/``previous`` links); ``?ordering=timestamp``
+    pages oldest first.
     """
     serializer_class = VisitorLogSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend, filters.OrderingFilter]
+    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     filterset_class = VisitorLogFilter
     pagination_class = VisitorLogPagination
     
@@ -40,14 +69,6 @@ class VisitorLogListView(generics.ListAPIView):
         'user__last_name'
     ]
     
-    ordering_fields = [
-        'timestamp',
-        'visitor__full_name',
-        'action'
-    ]
-    
-    ordering = ['-timestamp']  # Default ordering
-
     def get_queryset(self):
         """
         Returns filtered queryset of VisitorLog entries with select_related
@@ -75,15 +96,76 @@ class VisitorLogListView(generics.ListAPIView):
         # Add summary statistics to the response
         if response.data:
             try:
-                queryset = self.filter_queryset(self.get_queryset())
-                response.data['summary'] = {
-                    'total_entries': queryset.count(),
-                    'check_in_count': queryset.filter(action='check_in').count(),
-                    'check_out_count': queryset.filter(action='check_out').count(),
-                    'first_entry': queryset.last().timestamp if queryset.exists() else None,
-                    'last_entry': queryset.first().timestamp if queryset.exists() else None
-                }
+                response.data['summary'] = self.get_summary()
             except Exception as e:
                 logger.error(f"Error generating log summary: {str(e)}")
         
-        return response
\ No newline at end of file
+        return response
+
+    def get_summary(self):
+        """
+        Totals over the filtered logs in one aggregate query, cached per
+        filter signature. The key includes the change counter, which every
+        log, visitor and tombstone write moves, so paging through a stable
+        result set reuses one computation.
+        """
+        paginator = self.paginator
+        params = sorted(
+            (name, values) for name, values in self.request.query_params.lists()
+            if name not in (paginator.cursor_query_param, paginator.page_size_query_param)
+        )
+        key = f"visitor-log-summary:{json_version(params)}:{ChangeCounter.current()}"
+        summary = cache.get(key)
+        if summary is None:
+            summary = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+                total_entries=Count('id'),
+                check_in_count=Count('id', filter=Q(action='check_in')),
+                check_out_count=Count('id', filter=Q(action='check_out')),
+                first_entry=Min('timestamp'),
+                last_entry=Max('timestamp'),
+            )
+            cache.set(key, summary, SUMMARY_CACHE_TIMEOUT)
+        return summary
+
+
+class VisitorLogArchiveView(views.APIView):
+    """
+    Streams archived (past retention) log entries as JSON Lines
+    GET /api/visitors/logs/archive/?visitor=12&action=check_in&user=3&start_date=2024-01-01&end_date=2024-03-31&q=badge
+
+    Only segments whose sparse index can match are decompressed, and
+    entries are streamed as they are read, oldest first.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            visitor_id = int(params['visitor']) if params.get('visitor') else None
+            user_id = int(params['user']) if params.get('user') else None
+            start = self._day(params.get('start_date'))
+            end = self._day(params.get('end_date'), next_day=True)
+        except ValueError:
+            return Response(
+                {"error": "visitor and user must be integers, dates YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        entries = LogSegmentArchive().iter_entries(
+            start=start, end=end, visitor_id=visitor_id, user_id=user_id,
+            action=params.get('action') or None, query=params.get('q') or None
+        )
+        return StreamingHttpResponse(
+            (orjson.dumps(entry) + b'\n' for entry in entries),
+            content_type='application/x-ndjson'
+        )
+
+    def _day(self, value, next_day=False):
+        if not value:
+            return None
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        if next_day:
+            day += timedelta(days=1)
+        return timezone.make_aware(datetime.combine(day, time.min))
@@ -0,0 +1,172 @@
+from django.db.models import Count, Max
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from ..utils.http_cache import conditional_response, make_etag, version_stamp
+
+# Clients may keep a copy but must revalidate it, which is a cheap 304
+CONDITIONAL_CACHE_CONTROL = 'private, no-cache'
+
+
+class SparseFieldsetMixin:
+    """
+    ``?fields=id,first_name,status`` narrows both the serializer output and
+    the SELECT (through ``.only()``); ``?expand=host,branch`` nests those
+    relations and joins them only when asked. Without ``?fields`` every
+    field is returned, as before.
+
+    ``sparse_field_sources`` maps computed serializer fields to the model
+    fields they read; ``expandable_relations`` maps relations to the fields
+    loaded for their nested representation.
+    """
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+    sparse_field_sources = {}
+    expandable_relations = {}
+    sparse_fieldset_actions = ('list', 'retrieve')
+
+    def _uses_sparse_fieldset(self):
+        return getattr(self, 'action', 'list') in self.sparse_fieldset_actions
+
+    def _query_list(self, param):
+        value = self.request.query_params.get(param, '')
+        return [name.strip() for name in value.split(',') if name.strip()]
+
+    def get_expand(self):
+        if not self._uses_sparse_fieldset():
+            return []
+        expand = self._query_list(self.expand_query_param)
+        unknown = set(expand) - set(self.expandable_relations)
+        if unknown:
+            raise ValidationError({
+                self.expand_query_param: f"Cannot expand: {', '.join(sorted(unknown))}. "
+                                         f"Expandable: {', '.join(self.expandable_relations)}"
+            })
+        return expand
+
+    def get_sparse_fields(self):
+        """Returns the requested serializer field names, or None for all fields."""
+        if not self._uses_sparse_fieldset():
+            return None
+        fields = self._query_list(self.fields_query_param)
+        if not fields:
+            return None
+        available = self.get_serializer_class()().fields
+        unknown = [name for name in fields if name not in available]
+        if unknown:
+            raise ValidationError({
+                self.fields_query_param: f"Unknown fields: {', '.join(unknown)}"
+            })
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        if self._uses_sparse_fieldset():
+            kwargs.setdefault('fields', self.get_sparse_fields())
+            kwargs.setdefault('expand', self.get_expand())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self._uses_sparse_fieldset():
+            return queryset
+
+        expand = self.get_expand()
+        if expand:
+            queryset = queryset.select_related(*expand)
+
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+
+        model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+        only = {'pk'}
+        ordering = getattr(self.paginator, 'ordering', None) or ()
+        only.update(name.lstrip('-') for name in ordering)
+        for name in fields:
+            if name in self.sparse_field_sources:
+                only.update(self.sparse_field_sources[name])
+            elif name in model_fields:
+                only.add(name)
+            else:
+                # A computed field with unknown sources: load everything
+                return queryset
+        for relation in expand:
+            only.add(relation)
+            only.update(f'{relation}__{name}' for name in self.expandable_relations[relation])
+        only.discard('pk')
+        return queryset.only(queryset.model._meta.pk.name, *only)
+
+
+class ProjectionListMixin(SparseFieldsetMixin):
+    """
+    Serves ``list`` through a compiled ``projection`` (see
+    ``visitors.fast_serializers``) over ``.values()`` rows instead of
+    building model instances and DRF fields per row. The output, including
+    ``?fields=``/``?expand=`` and pagination, is unchanged.
+    """
+    projection = None
+
+    def list(self, request, *args, **kwargs):
+        fields, expand = self.get_sparse_fields(), self.get_expand()
+        columns = set(self.projection.columns(fields, expand))
+        ordering = getattr(self.paginator, 'ordering', None) or ()
+        columns.update(name.lstrip('-') for name in ordering)
+        rows = self.filter_queryset(self.get_queryset()).values(*columns)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.projection.serialize(page, request, fields, expand))
+        return Response(self.projection.serialize(rows, request, fields, expand))
+
+
+class ConditionalGetMixin:
+    """
+    Conditional GET for ``list`` and ``retrieve`` driven by ``updated_at``,
+    answered without loading or serializing rows:
+
+    * lists get a weak ETag from COUNT(*) and MAX(updated_at) of the
+      filtered queryset, and that MAX as Last-Modified (deletions only
+      change the ETag);
+    * details get a weak ETag and Last-Modified from the row's updated_at.
+
+    A matching If-None-Match (or If-Modified-Since) is answered with 304.
+    Other detail actions can go through ``conditional_detail``.
+    """
+    last_modified_field = 'updated_at'
+    conditional_cache_control = CONDITIONAL_CACHE_CONTROL
+
+    def list(self, request, *args, **kwargs):
+        stats = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            count=Count('pk'), last_modified=Max(self.last_modified_field)
+        )
+        return self._conditional(
+            'list', f"{stats['count']}-{version_stamp(stats['last_modified'])}",
+            stats['last_modified'],
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_detail(
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        )
+
+    def conditional_detail(self, respond):
+        """Wraps ``respond`` (a detail action body) with the row's validators."""
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        last_modified = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: lookup}
+        ).values_list(self.last_modified_field, flat=True).first()
+        if last_modified is None:
+            # Unknown row: let the action produce its 404
+            return respond()
+        return self._conditional(
+            getattr(self, 'action', 'retrieve'), f"{lookup}-{version_stamp(last_modified)}", last_modified, respond
+        )
+
+    def _conditional(self, kind, version, last_modified, respond):
+        # The action and negotiated format keep JSON, MessagePack and the
+        # badge view of a row from sharing a tag
+        etag = make_etag(f"{kind}-{version}-{self.request.accepted_renderer.format}", weak=True)
+        return conditional_response(
+            self.request, respond, etag, last_modified, self.conditional_cache_control
+        )
@@ -0,0 +1,136 @@
+from rest_framework import status, views
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from ..models import Branch, RollCall, RollCallEntry
+from ..roll_call import close_roll_call, mark_entry, roll_call_counts, start_roll_call
+from ..serializers import RollCallEntrySerializer, RollCallSerializer
+from ..utils.http_cache import make_etag, not_modified_response
+
+ROLL_CALL_CACHE_CONTROL = 'private, no-cache'
+
+
+class RollCallListView(views.APIView):
+    """
+    Evacuation roll calls
+    GET /api/emergency/rollcalls/ (20 most recent)
+    POST /api/emergency/rollcalls/ {"branch": 2, "reason": "Fire alarm"}
+
+    Starting takes everyone on site (in the branch, or everywhere) at that
+    moment. While a roll call for the branch is open, POST returns it (200)
+    instead of starting another.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        roll_calls = RollCall.objects.all()[:20]
+        return Response(RollCallSerializer(roll_calls, many=True).data)
+
+    def post(self, request):
+        branch = request.data.get('branch')
+        try:
+            branch_id = int(branch) if branch not in (None, '') else None
+        except (TypeError, ValueError):
+            return Response({"error": "branch must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        if branch_id is not None and not Branch.objects.filter(pk=branch_id).exists():
+            return Response({"error": "Branch not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        roll_call, created = start_roll_call(
+            branch_id, str(request.data.get('reason', ''))[:100], request.user
+        )
+        return Response(
+            RollCallSerializer(roll_call).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+
+class RollCallDetailView(views.APIView):
+    """
+    A roll call with its counts and entries
+    GET /api/emergency/rollcalls/<id>/?since=<version>&status=unaccounted
+
+    With ``since``, only entries marked after that version are returned, so a
+    device that reconnects fetches just what it missed (live deltas arrive on
+    ws/rollcall/<id>/?token=<access token>). The ETag follows the roll call's
+    version, so polling an unchanged roll call is a 304.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        since = request.query_params.get('since', '0')
+        entry_status = request.query_params.get('status')
+        if not since.isdigit():
+            return Response({"error": "since must be a version number"}, status=status.HTTP_400_BAD_REQUEST)
+        if entry_status and entry_status not in RollCallEntry.Status.values:
+            return Response({"error": f"Unknown status: {entry_status}"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            counts = roll_call_counts(pk)
+        except RollCall.DoesNotExist:
+            return Response({"error": "Roll call not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        etag = make_etag(f"rollcall-{pk}-{counts['version']}-{since}-{entry_status or ''}", weak=True)
+        response = not_modified_response(request, etag, cache_control=ROLL_CALL_CACHE_CONTROL)
+        if response is not None:
+            return response
+
+        entries = RollCallEntry.objects.filter(roll_call_id=pk)
+        if int(since):
+            entries = entries.filter(version__gt=int(since))
+        if entry_status:
+            entries = entries.filter(status=entry_status)
+        response = Response({
+            'id': pk,
+            **counts,
+            'entries': RollCallEntrySerializer(entries, many=True).data,
+        })
+        response['ETag'] = etag
+        response['Cache-Control'] = ROLL_CALL_CACHE_CONTROL
+        return response
+
+
+class RollCallEntryView(views.APIView):
+    """
+    Marks a person accounted at an assembly point, or unaccounted again
+    POST /api/emergency/rollcalls/<id>/entries/<entry_id>/ {"accounted": true, "assembly_point": "North Parking Lot"}
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk, entry_id):
+        accounted = request.data.get('accounted', True)
+        if not isinstance(accounted, bool):
+            return Response({"error": "accounted must be true or false"}, status=status.HTTP_400_BAD_REQUEST)
+        assembly_point = str(request.data.get('assembly_point') or '')
+        if accounted and not assembly_point.strip():
+            return Response({"error": "assembly_point is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(assembly_point) > 100:
+            return Response({"error": "assembly_point is too long"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            entry = mark_entry(pk, entry_id, accounted, assembly_point, request.user)
+        except RollCallEntry.DoesNotExist:
+            return Response({"error": "Entry not found"}, status=status.HTTP_404_NOT_FOUND)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_409_CONFLICT)
+
+        if entry is None:
+            entry = RollCallEntry.objects.get(pk=entry_id)
+        return Response({
+            'entry': RollCallEntrySerializer(entry).data,
+            'counts': roll_call_counts(pk),
+        })
+
+
+class RollCallCloseView(views.APIView):
+    """
+    Closes a roll call; its entries can no longer be marked
+    POST /api/emergency/rollcalls/<id>/close/
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        roll_call = RollCall.objects.filter(pk=pk).first()
+        if roll_call is None:
+            return Response({"error": "Roll call not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not close_roll_call(roll_call, request.user):
+            return Response({"error": "Roll call is already closed"}, status=status.HTTP_409_CONFLICT)
+        return Response(RollCallSerializer(roll_call).data)
@@ -0,0 +1,46 @@
+from rest_framework import views, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from ..sync import CursorExpired, changes_since, get_feeds
+
+
+class SyncView(views.APIView):
+    """
+    Delta sync of visitors, visitor logs and the user's notifications
+    GET /api/sync/?since=<cursor>&limit=500&kinds=visitors,logs
+
+    Returns rows created or updated after ``since`` and the ids of rows
+    deleted since then, in change order. Apply the page, store ``cursor``
+    and ask again while ``has_more`` is true. ``since=0`` is a full resync.
+    """
+    permission_classes = [IsAuthenticated]
+    default_limit = 500
+    max_limit = 2000
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            since = max(int(params.get('since', 0)), 0)
+            limit = min(max(int(params.get('limit', self.default_limit)), 1), self.max_limit)
+        except ValueError:
+            return Response(
+                {"error": "since and limit must be integers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        kinds = [kind.strip() for kind in params.get('kinds', '').split(',') if kind.strip()]
+        unknown = set(kinds) - set(get_feeds())
+        if unknown:
+            return Response(
+                {"error": f"Unknown kinds: {', '.join(sorted(unknown))}. "
+                          f"Available: {', '.join(get_feeds())}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            return Response(changes_since(request.user, since, limit, kinds or None, request))
+        except CursorExpired:
+            return Response(
+                {"error": "Cursor is older than the retained deletions; resync with since=0"},
+                status=status.HTTP_410_GONE
+            )
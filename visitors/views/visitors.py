@@ -1,15 +1,19 @@
 # backend/visitors/views/visitors.py
 from rest_framework import viewsets, generics, views, status
 from rest_framework.response import Response
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework import filters
 from django.utils.timezone import now
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse
 from rest_framework import status, permissions
-from visitors.models import Visitor,CustomUser
+from visitors.models import Branch, Visitor, CustomUser, Company, HostVisitStats
 from rest_framework.views import APIView
 from visitors.serializers import VisitorSerializer 
+from visitors.pagination import KeysetPagination
+from visitors.utils.csv_export import csv_export_response, export_rows, filter_export_visitors
+from .mixins import CONDITIONAL_CACHE_CONTROL, ConditionalGetMixin, ProjectionListMixin
+from ..fast_serializers import visitor_projection
 from django.shortcuts import get_object_or_404
 from io import BytesIO
 from notifications.notifier import send_notification
@@ -47,19 +51,31 @@ from reportlab.lib.pagesizes import A6
 from reportlab.lib import colors
 import qrcode
 import io
+import os
 import csv
 import logging
 
-from ..models import Visitor, VisitorLog, CustomUser
+from ..audit import audit_log
+from ..models import Visitor, CustomUser, VisitDurationSketch
 from ..serializers import (
     VisitorSerializer,
     VisitorCheckInSerializer,
     VisitorCheckOutSerializer,
     EmergencyVisitorSerializer,
-    VisitorBadgeSerializer
+    VisitorBadgeSerializer,
+    KioskLookupSerializer,
+    OfflineSyncBatchSerializer
 )
 from ..permissions import IsAdminUser, IsReceptionistUser
-from ..filters import VisitorFilter
+from ..filters import VisitorFilter, VisitorSearchFilter
+from ..search import get_search_backend
+from ..throttles import KioskLookupThrottle, KioskSyncThrottle
+from ..offline_sync import apply_offline_events
+from ..emergency_snapshot import emergency_snapshots
+from ..utils.http_cache import (
+    apply_validators, conditional_response, make_etag, not_modified_response, version_stamp,
+)
+from ..utils.identity import mask_email, mask_phone, normalize_phone
 from notifications.notifier import (
     send_email_notification,
     trigger_host_notification,
@@ -140,26 +156,43 @@ class DashboardStatsView(APIView):
         except Exception:
             return "00:00:00"
 
-class VisitorViewSet(viewsets.ModelViewSet):
+VISITOR_SPARSE_FIELD_SOURCES = {
+    'duration': ('check_in_time', 'check_out_time'),
+}
+VISITOR_EXPANDABLE_RELATIONS = {
+    'host': ('first_name', 'last_name', 'email'),
+    'branch': ('name',),
+}
+
+
+class VisitorViewSet(ConditionalGetMixin, ProjectionListMixin, viewsets.ModelViewSet):
     """
     Comprehensive API endpoint for visitor management including:
     - Check-in/out functionality
     - Visitor tracking
     - Host notifications
     - QR code generation
+
+    Lists are keyset-paginated (?cursor=, ?page_size=) and accept
+    ?fields= and ?expand=host,branch. List, detail and badge responses
+    carry weak ETags and answer If-None-Match with 304.
     """
     queryset = Visitor.objects.all().order_by('-check_in_time')
     serializer_class = VisitorSerializer
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
-    search_fields = [
-        'first_name', 
-        'last_name', 
-        'company', 
-        'email', 
-        'phone',
-        'badge_number'
-    ]
+    projection = visitor_projection
+    pagination_class = KeysetPagination
+    sparse_field_sources = VISITOR_SPARSE_FIELD_SOURCES
+    expandable_relations = VISITOR_EXPANDABLE_RELATIONS
+    filter_backends = [VisitorSearchFilter, DjangoFilterBackend]
     filterset_class = VisitorFilter
+    # Numeric ids only, so the router's detail route does not swallow the
+    # visitors/<name>/ endpoints registered after it (kiosk-lookup, logs...)
+    lookup_value_regex = r'\d+'
+    search_result_fields = [
+        'id', 'first_name', 'last_name', 'company', 'phone',
+        'badge_number', 'status', 'check_in_time', 'host'
+    ]
+    max_search_results = 50
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
 
     def get_serializer_class(self):
@@ -180,7 +213,7 @@ class VisitorViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated(), IsReceptionistUser()]
         elif self.action == 'destroy':
             return [IsAuthenticated(), IsAdminUser()]
-        elif self.action in ['badge', 'list', 'retrieve']:
+        elif self.action in ['badge', 'list', 'retrieve', 'search']:
             return [IsAuthenticated()]
         return super().get_permissions()
 
@@ -208,20 +241,47 @@ class VisitorViewSet(viewsets.ModelViewSet):
             
             # Update visitor duration statistics
             if visitor.check_out_time:
-                visitor.duration = (visitor.check_out_time - visitor.check_in_time).total_seconds()
-                visitor.save()
+                VisitDurationSketch.record_visit(visitor)
 
         return Response(
             {'message': 'Checked out successfully'}, 
             status=status.HTTP_200_OK
         )
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Ranked search-as-you-type for reception
+        GET /api/visitors/search/?q=ann%20kam&limit=10
+
+        Every word is prefix-matched against names, company, email, phone,
+        badge number and host name; best matches come first.
+        """
+        query = request.query_params.get('q', '').strip()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), self.max_search_results)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = get_search_backend().ranked_ids(query, limit) if query else []
+        visitors = Visitor.objects.filter(id__in=ids).select_related('host').only(
+            *[name for name in self.search_result_fields if name != 'host'],
+            'host', *(f'host__{name}' for name in VISITOR_EXPANDABLE_RELATIONS['host'])
+        ).in_bulk()
+        serializer = VisitorSerializer(
+            [visitors[pk] for pk in ids if pk in visitors],
+            many=True,
+            fields=self.search_result_fields,
+            expand=['host']
+        )
+        return Response({'query': query, 'results': serializer.data})
+
     @action(detail=True, methods=['get'])
     def badge(self, request, pk=None):
         """Generate visitor badge data (not PDF)."""
-        visitor = self.get_object()
-        serializer = self.get_serializer(visitor)
-        return Response(serializer.data)
+        return self.conditional_detail(
+            lambda: Response(self.get_serializer(self.get_object()).data)
+        )
 
     @action(detail=False, methods=['post'], url_path='kiosk-checkin')
     def kiosk_checkin(self, request):
@@ -267,11 +327,10 @@ class VisitorViewSet(viewsets.ModelViewSet):
 
     def _log_visitor_action(self, visitor, action):
         """Log visitor activity."""
-        user_email = getattr(self.request.user, 'email', None)
-        VisitorLog.objects.create(
+        audit_log.log(
             visitor=visitor,
             action=action,
-            details=f'{action} at {now()} by {user_email if user_email else "system"}',
+            channel='kiosk' if action == 'KIOSK_CHECK_IN' else 'api',
             user=self.request.user if self.request.user.is_authenticated else None
         )
 
@@ -325,24 +384,30 @@ class VisitorBadgePDFView(views.APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, id):
-        try:
-            visitor = Visitor.objects.select_related('host').get(id=id)
-        except Visitor.DoesNotExist:
+        last_modified = Visitor.objects.filter(id=id).values_list('updated_at', flat=True).first()
+        if last_modified is None:
             return Response(
                 {'error': 'Visitor not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        # Rendering the badge is the expensive part; skip it for unchanged visitors
+        return conditional_response(
+            request,
+            lambda: self._render_badge(id),
+            make_etag(f"badge-file-{id}-{version_stamp(last_modified)}", weak=True),
+            last_modified,
+            CONDITIONAL_CACHE_CONTROL
+        )
 
-        buffer = BytesIO()
+    def _render_badge(self, id):
+        visitor = Visitor.objects.select_related('host').get(id=id)
+        # design_visitor_badge renders a PNG image
         badge = design_visitor_badge(visitor)
-        badge.save(buffer)
-        
-        buffer.seek(0)
         response = HttpResponse(
-            buffer,
-            content_type='application/pdf'
+            badge.read(),
+            content_type='image/png'
         )
-        response['Content-Disposition'] = f'attachment; filename="badge_{visitor.badge_number}.pdf"'
+        response['Content-Disposition'] = f'attachment; filename="badge_{visitor.badge_number}.png"'
         return response
 
 
@@ -376,10 +441,11 @@ class QRCheckInAPIView(views.APIView):
             visitor.check_in_device = request.data['device_id']
             visitor.save()
 
-            VisitorLog.objects.create(
+            audit_log.log(
                 visitor=visitor,
                 action="QR_CHECK_IN",
-                details=f"Checked in via QR at {now()} from device {request.data['device_id']}",
+                device_id=request.data['device_id'],
+                channel='qr',
                 user=None
             )
 
@@ -397,30 +463,100 @@ class QRCheckInAPIView(views.APIView):
         })
 
 
-class EmergencyReportAPIView(views.APIView):
-    """Real-time emergency status reporting."""
+class EmergencySnapshotMixin:
+    """Serves the pre-built emergency roll call for ``?branch=`` (all branches by default)."""
+
+    def _snapshot_path(self, request, getter):
+        branch = request.query_params.get('branch')
+        if branch and not branch.isdigit():
+            return None, Response({"error": "branch must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return getter(int(branch) if branch else None), None
+        except Branch.DoesNotExist:
+            return None, Response({"error": "Branch not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    def _file_etag(self, path):
+        stat = os.stat(path)
+        return make_etag(f"{stat.st_mtime_ns}-{stat.st_size}")
+
+
+class EmergencyReportAPIView(EmergencySnapshotMixin, views.APIView):
+    """
+    Real-time emergency status reporting
+    GET /api/emergency/report/?branch=2
+
+    Returns the roll call kept current on every check-in and check-out
+    (see visitors.emergency_snapshot): a file read, with no photos inlined.
+    """
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     def get(self, request):
-        current_visitors = Visitor.objects.filter(
-            Q(status='checked_in') | Q(status='in_meeting')
-        ).select_related('host')
+        path, error = self._snapshot_path(request, emergency_snapshots.json_path)
+        if error:
+            return error
+        etag = self._file_etag(path)
+        response = not_modified_response(request, etag, cache_control='private, no-cache')
+        if response is not None:
+            return response
+        with open(path, 'rb') as f:
+            response = HttpResponse(f.read(), content_type='application/json')
+        return apply_validators(response, etag, cache_control='private, no-cache')
 
-        serializer = EmergencyVisitorSerializer(current_visitors, many=True)
-        
-        return Response({
-            'timestamp': now().isoformat(),
-            'count': current_visitors.count(),
-            'visitors': serializer.data,
-            'locations': self._get_location_distribution(current_visitors)
-        })
 
-    def _get_location_distribution(self, visitors):
-        return (
-            visitors.values('location')
-                   .annotate(count=Count('id'))
-                   .order_by('-count')
-        )
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@throttle_classes([KioskLookupThrottle])
+def kiosk_lookup_view(request):
+    """
+    Kiosk "find me": returns the latest visit of a returning visitor for prefill
+    POST /api/visitors/kiosk-lookup/ {"last_name": "Otieno", "phone": "0712 345 678"} (or "email" / "id_number")
+
+    The lookup is one index seek on the normalized phone, email or hashed ID
+    number, and only matches when the last name matches too. Email and
+    phone come back masked; the visitor confirms or re-enters them. The
+    returned ``returning_visitor_id`` can be sent with the kiosk check-in to
+    reuse the stored photo instead of uploading a new one.
+    """
+    serializer = KioskLookupSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    data = serializer.validated_data
+
+    visitor = Visitor.find_returning(
+        phone=data.get('phone'), email=data.get('email'), id_number=data.get('id_number'),
+        last_name=data['last_name']
+    )
+    if visitor is None or visitor.status == Visitor.Status.BLACKLISTED:
+        return Response({"error": "No previous visit found"}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        'returning_visitor_id': visitor.id,
+        'first_name': visitor.first_name,
+        'last_name': visitor.last_name,
+        'email': mask_email(visitor.email),
+        'phone': mask_phone(visitor.phone),
+        'company': visitor.company,
+        'id_type': visitor.id_type,
+        'visitor_type': visitor.visitor_type,
+        'host_id': visitor.host_id,
+        'has_photo': bool(visitor.photo),
+        'last_visit': visitor.check_in_time,
+    })
+
+
+def _returning_visitor(data):
+    """
+    Returns the earlier visit named by ``returning_visitor_id`` when its
+    phone matches the one being checked in, so its assets can be reused.
+    """
+    try:
+        previous_id = int(data.get('returning_visitor_id') or 0)
+    except (TypeError, ValueError):
+        return None
+    phone = normalize_phone(data.get('phone'))
+    if not previous_id or not phone:
+        return None
+    return Visitor.objects.filter(id=previous_id, phone_normalized=phone).only('id', 'photo').first()
 
 
 @api_view(['POST'])
@@ -438,6 +574,11 @@ def kiosk_checkin_view(request):
         'plate'  
     ]
 
+    # A returning visitor's stored photo stands in for a new upload
+    previous = _returning_visitor(request.data)
+    if previous and previous.photo:
+        required_fields.remove('photo_data')
+
     missing_fields = [field for field in required_fields if not request.data.get(field)]
     if missing_fields:
         return Response(
@@ -481,7 +622,10 @@ def kiosk_checkin_view(request):
 
             # Handle photo_data (file or base64)
             photo_data = request.data.get('photo_data')
-            if photo_data:
+            if not photo_data and previous and previous.photo:
+                visitor.photo.name = previous.photo.name
+                visitor.save(update_fields=['photo', 'updated_at'])
+            elif photo_data:
                 if hasattr(photo_data, 'read'):  # file upload
                     visitor.photo.save(
                         f"visitor_{visitor.id}_photo.jpg",
@@ -516,7 +660,7 @@ def kiosk_checkin_view(request):
                     )
 
             _generate_visitor_assets(visitor)
-            _log_visitor_action(visitor, 'KIOSK_CHECK_IN')
+            _log_visitor_action(visitor, 'KIOSK_CHECK_IN', device_id=request.data.get('device_id'))
             _notify_related_parties(visitor, 'check_in')
 
             return Response({
@@ -553,12 +697,13 @@ def _generate_visitor_assets(visitor):
     visitor.save()
 
 
-def _log_visitor_action(visitor, action):
+def _log_visitor_action(visitor, action, device_id=None):
     """Log visitor activity."""
-    VisitorLog.objects.create(
+    audit_log.log(
         visitor=visitor,
         action=action,
-        details=f'{action} via kiosk at {now()}',
+        device_id=device_id,
+        channel='kiosk',
         user=None
     )
 
@@ -613,10 +758,11 @@ def offline_checkin_view(request):
         visitor.offline_checkin = True
         visitor.save()
 
-        VisitorLog.objects.create(
+        audit_log.log(
             visitor=visitor,
             action='OFFLINE_CHECKIN',
-            details="Synchronized from offline kiosk",
+            device_id=request.data.get('device_id'),
+            channel='offline',
             user=None
         )
 
@@ -624,40 +770,96 @@ def offline_checkin_view(request):
         "status": "success",
         "visitor_id": visitor.id
     })
-class CurrentVisitorsView(APIView):
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@throttle_classes([KioskSyncThrottle])
+def offline_sync_view(request):
+    """
+    Batch upload of events a kiosk recorded while offline
+    POST /api/visitors/offline-sync/
+    {"device_id": "kiosk-3", "events": [
+        {"key": "<uuid>", "type": "check_in", "occurred_at": "...", "qr_code": "KREP-1A2B3C4D"},
+        {"key": "<uuid>", "type": "walk_in", "occurred_at": "...", "visitor": {...}},
+        {"key": "<uuid>", "type": "check_out", "occurred_at": "...", "walk_in_key": "<uuid>"}
+    ]}
+
+    Events are applied in order in one transaction and get one result each.
+    Uploading the same keys again is safe: their first results are replayed.
+    """
+    serializer = OfflineSyncBatchSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    device_id = serializer.validated_data['device_id']
+    results = apply_offline_events(device_id, serializer.validated_data['events'])
+
+    summary = {'applied': 0, 'rejected': 0, 'invalid': 0, 'replayed': 0}
+    for result in results:
+        summary['replayed' if result.get('replayed') else result['status']] += 1
+    if summary['applied']:
+        transaction.on_commit(lambda: send_realtime_notification(
+            user=None,
+            channel='reception',
+            event='offline_sync',
+            data={'device_id': device_id, **summary},
+            message=f"Kiosk {device_id} synced {summary['applied']} offline events"
+        ))
+    return Response({'device_id': device_id, **summary, 'results': results})
+
+
+class CurrentVisitorsView(ConditionalGetMixin, ProjectionListMixin, generics.ListAPIView):
     """
     API endpoint that returns currently checked-in visitors.
+    Keyset-paginated; accepts ?fields= and ?expand=host,branch; 304 on If-None-Match.
     """
     permission_classes = [permissions.IsAuthenticated]
-
-    def get(self, request, format=None):
-        current_visitors = Visitor.objects.filter(status='checked_in')
-        serializer = VisitorSerializer(current_visitors, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    queryset = Visitor.objects.filter(status='checked_in')
+    serializer_class = VisitorSerializer
+    projection = visitor_projection
+    pagination_class = KeysetPagination
+    filter_backends = []
+    sparse_field_sources = VISITOR_SPARSE_FIELD_SOURCES
+    expandable_relations = VISITOR_EXPANDABLE_RELATIONS
 
 class VisitorDetailView(APIView):
     """
     API endpoint to get a single visitor by ID.
+    GET /api/visitors/<id>/detail/ (weak ETag from updated_at; 304 when unchanged)
     """
     permission_classes = [permissions.IsAuthenticated]
 
-    def get(self, request, pk, format=None):
-        visitor = get_object_or_404(Visitor, pk=pk)
-        serializer = VisitorSerializer(visitor)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def get(self, request, id, format=None):
+        last_modified = Visitor.objects.filter(pk=id).values_list('updated_at', flat=True).first()
+        if last_modified is None:
+            return Response({'error': 'Visitor not found'}, status=status.HTTP_404_NOT_FOUND)
 
-class ExportVisitorsCSVView(APIView):
-    def get(self, request, *args, **kwargs):
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="visitors.csv"'
+        def respond():
+            serializer = VisitorSerializer(get_object_or_404(Visitor, pk=id))
+            return Response(serializer.data, status=status.HTTP_200_OK)
 
-        writer = csv.writer(response)
-        writer.writerow(['Name', 'Company', 'Phone'])
+        etag = make_etag(
+            f"detail-{id}-{version_stamp(last_modified)}-{request.accepted_renderer.format}", weak=True
+        )
+        return conditional_response(request, respond, etag, last_modified, CONDITIONAL_CACHE_CONTROL)
 
-        for visitor in Visitor.objects.all():
-            writer.writerow([visitor.name, visitor.company, visitor.phone])
+class ExportVisitorsCSVView(APIView):
+    """
+    Streams visitors as CSV
+    GET /api/analytics/export/csv/?start_date=2024-01-01&end_date=2024-01-31&branch=2&status=checked_in,checked_out&gzip=1
+    """
+    def get(self, request, *args, **kwargs):
+        try:
+            visitors = filter_export_visitors(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-        return response
+        rows = export_rows(
+            visitors, ('first_name', 'last_name', 'company', 'phone'),
+            lambda first_name, last_name, company, phone: [f"{first_name} {last_name}", company, phone]
+        )
+        return csv_export_response(request, 'visitors.csv', ['Name', 'Company', 'Phone'], rows)
 from django.db.models.functions import ExtractHour, TruncMonth
 from django.db.models import Count
 from rest_framework.views import APIView
@@ -768,111 +970,47 @@ class NotificationPreferencesView(APIView):
             return Response({'message': 'Preferences updated'})
         except Visitor.DoesNotExist:
             return Response({'error': 'Visitor not found'}, status=status.HTTP_404_NOT_FOUND)
-class PendingApprovalsView(APIView):
+class PendingApprovalsView(ConditionalGetMixin, ProjectionListMixin, generics.ListAPIView):
+    """
+    Visitors awaiting approval; hosts only see their own.
+    Keyset-paginated; accepts ?fields= and ?expand=host,branch; 304 on If-None-Match.
+    """
     permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        queryset = Visitor.objects.filter(status='pending_approval')
-        
-        if request.user.role == 'host':
-            queryset = queryset.filter(host=request.user)
-            
-        serializer = VisitorSerializer(queryset, many=True)
-        return Response(serializer.data)
-
-class EmergencyReportPDFView(APIView):
+    queryset = Visitor.objects.filter(status='pending_approval')
+    serializer_class = VisitorSerializer
+    projection = visitor_projection
+    pagination_class = KeysetPagination
+    filter_backends = []
+    sparse_field_sources = VISITOR_SPARSE_FIELD_SOURCES
+    expandable_relations = VISITOR_EXPANDABLE_RELATIONS
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.user.role == 'host':
+            queryset = queryset.filter(host=self.request.user)
+        return queryset
+
+class EmergencyReportPDFView(EmergencySnapshotMixin, APIView):
     """
-    Generates a PDF emergency report listing all currently checked-in visitors
-    with their contact details and host information.
+    PDF emergency report listing all currently checked-in visitors with
+    their contact details and host information
+    GET /api/emergency/report/pdf/?branch=2
+
+    The PDF is pre-rendered in the background after every movement, so
+    this streams a file.
     """
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     def get(self, request):
-        # Get current visitors
-        current_visitors = Visitor.objects.filter(
-            Q(status='checked_in') | Q(status='in_meeting')
-        ).select_related('host')
-
-        # Create PDF buffer
-        buffer = BytesIO()
-        pdf = canvas.Canvas(buffer, pagesize=letter)
-        
-        # Set up styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'Title',
-            parent=styles['Heading1'],
-            alignment=1,
-            spaceAfter=20
-        )
-        
-        # Add title
-        title = Paragraph(
-            f"Emergency Visitor Report - {now().strftime('%Y-%m-%d %H:%M')}",
-            title_style
+        path, error = self._snapshot_path(request, emergency_snapshots.pdf_path)
+        if error:
+            return error
+        return FileResponse(
+            open(path, 'rb'),
+            as_attachment=True,
+            filename=f"emergency_visitor_report_{now().strftime('%Y%m%d_%H%M')}.pdf",
+            content_type='application/pdf',
         )
-        title.wrapOn(pdf, 500, 50)
-        title.drawOn(pdf, 50, 750)
-        
-        # Create table data
-        table_data = [
-            [
-                'Visitor Name', 
-                'Company', 
-                'Phone', 
-                'Email', 
-                'Host', 
-                'Check-in Time',
-                'Location'
-            ]
-        ]
-        
-        for visitor in current_visitors:
-            table_data.append([
-                visitor.full_name,
-                visitor.company or 'N/A',
-                visitor.phone or 'N/A',
-                visitor.email or 'N/A',
-                visitor.host.get_full_name() if visitor.host else 'N/A',
-                visitor.check_in_time.strftime('%H:%M'),
-                visitor.location or 'N/A'
-            ])
-        
-        # Create table
-        table = Table(table_data, colWidths=[100, 80, 80, 120, 100, 60, 80])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ]))
-        
-        # Draw table
-        table.wrapOn(pdf, 500, 600)
-        table.drawOn(pdf, 50, 650 - len(current_visitors)*20)
-        
-        # Add footer
-        pdf.setFont('Helvetica', 8)
-        pdf.drawString(50, 30, f"Generated at: {now().strftime('%Y-%m-%d %H:%M:%S')}")
-        pdf.drawRightString(550, 30, f"Total Visitors: {len(current_visitors)}")
-        
-        # Finalize PDF
-        pdf.showPage()
-        pdf.save()
-        
-        # Prepare response
-        buffer.seek(0)
-        response = HttpResponse(buffer, content_type='application/pdf')
-        response['Content-Disposition'] = (
-            'attachment; '
-            f'filename="emergency_visitor_report_{now().strftime("%Y%m%d_%H%M")}.pdf"'
-        )
-        return response
     
 
 class VisitorStatsView(APIView):
@@ -905,11 +1043,14 @@ class VisitorStatsView(APIView):
         avg_duration = self._get_avg_duration()
 
         # Host statistics
-        top_hosts = (
-            Visitor.objects.values('host__first_name', 'host__last_name')
-            .annotate(total=Count('id'))
-            .order_by('-total')[:5]
-        )
+        top_hosts = [
+            {
+                'host__first_name': stats.host.first_name,
+                'host__last_name': stats.host.last_name,
+                'total': stats.visit_count,
+            }
+            for stats in HostVisitStats.objects.select_related('host').order_by('-visit_count', 'host')[:5]
+        ]
 
         return Response({
             'summary': {
@@ -1054,15 +1195,12 @@ class VisitorReportsAPIView(APIView):
             })
 
         # Company frequency
-        companies = Visitor.objects.values('company').annotate(
-            visits=Count('id'),
-            lastVisit=Max('check_in_time')
-        ).order_by('-visits')[:10]
+        companies = Company.objects.filter(visit_count__gt=0).order_by('-visit_count', 'id')[:10]
         company_frequency = [
             {
-                'company': c['company'],
-                'visits': c['visits'],
-                'lastVisit': c['lastVisit'].strftime('%Y-%m-%d') if c['lastVisit'] else ''
+                'company': c.name,
+                'visits': c.visit_count,
+                'lastVisit': c.last_visit_at.strftime('%Y-%m-%d') if c.last_visit_at else ''
             }
             for c in companies
         ]